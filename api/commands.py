@@ -21,7 +21,15 @@ from libs.helper import email as email_validate
 from libs.password import hash_password, password_pattern, valid_password
 from libs.rsa import generate_key_pair
 from models import Tenant
-from models.dataset import Dataset, DatasetCollectionBinding, DatasetMetadata, DatasetMetadataBinding, DocumentSegment
+from models.dataset import (
+    Dataset,
+    DatasetCollectionBinding,
+    DatasetKeywordTable,
+    DatasetMetadata,
+    DatasetMetadataBinding,
+    DocumentSegment,
+    Embedding,
+)
 from models.dataset import Document as DatasetDocument
 from models.model import Account, App, AppAnnotationSetting, AppMode, Conversation, MessageAnnotation
 from models.provider import Provider, ProviderModel
@@ -815,3 +823,108 @@ def clear_free_plan_tenant_expired_logs(days: int, batch: int, tenant_ids: list[
     ClearFreePlanTenantExpiredLogs.process(days, batch, tenant_ids)
 
     click.echo(click.style("Clear free plan tenant expired logs completed.", fg="green"))
+
+
+@click.command("migrate-embedding-cache-format", help="Rewrite pickled embedding cache rows in the compact format.")
+@click.option("--batch-size", default=500, show_default=True, help="Number of embedding rows rewritten per commit.")
+@click.option(
+    "--dtype",
+    type=click.Choice(["float32", "float16"]),
+    default=dify_config.EMBEDDING_CACHE_STORAGE_DTYPE,
+    show_default=True,
+    help="Float precision of the rewritten rows.",
+)
+def migrate_embedding_cache_format(batch_size: int, dtype: str):
+    """
+    Migrate embedding cache rows from pickled lists to the compact binary format.
+    Rows are walked by primary key and committed in batches, so the migration can run while the service is online.
+    """
+    click.echo(click.style("Starting embedding cache format migration.", fg="green"))
+
+    last_id = None
+    scanned_count = 0
+    migrated_count = 0
+    while True:
+        query = db.session.query(Embedding)
+        if last_id is not None:
+            query = query.filter(Embedding.id > last_id)
+        embeddings = query.order_by(Embedding.id).limit(batch_size).all()
+        if not embeddings:
+            break
+        for embedding in embeddings:
+            if not embedding.is_compact:
+                try:
+                    embedding.set_embedding(embedding.get_embedding_array(), dtype)
+                    migrated_count += 1
+                except Exception as e:
+                    click.echo(click.style(f"Failed to migrate embedding {embedding.id}: {str(e)}", fg="red"))
+        db.session.commit()
+        scanned_count += len(embeddings)
+        last_id = embeddings[-1].id
+        click.echo(f"Scanned {scanned_count} embeddings, migrated {migrated_count}.")
+
+    click.echo(click.style(f"Embedding cache format migration completed. Migrated {migrated_count} rows.", fg="green"))
+
+
+@click.command("migrate-keyword-index", help="Migrate dataset keyword tables to the inverted keyword index.")
+@click.option("--batch-size", default=100, show_default=True, help="Number of keyword tables loaded per batch.")
+@click.option(
+    "--drop-keyword-tables",
+    is_flag=True,
+    default=False,
+    help="Drop the migrated keyword tables instead of migrating them, once KEYWORD_STORE is jieba_inverted_index.",
+)
+def migrate_keyword_index(batch_size: int, drop_keyword_tables: bool):
+    """
+    Migrate the JSON keyword table of every dataset into per-segment keyword postings,
+    used by the jieba_inverted_index keyword store.
+    The keyword tables are kept, so KEYWORD_STORE can be switched back, until they are dropped in a second run
+    with --drop-keyword-tables.
+    """
+    from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+    from core.rag.datasource.keyword.keyword_type import KeyWordType
+
+    if drop_keyword_tables and dify_config.KEYWORD_STORE != KeyWordType.JIEBA_INVERTED_INDEX:
+        click.echo(
+            click.style(
+                f"KEYWORD_STORE is {dify_config.KEYWORD_STORE}, switch it to {KeyWordType.JIEBA_INVERTED_INDEX}"
+                " before dropping the keyword tables.",
+                fg="red",
+            )
+        )
+        return
+
+    action = "drop" if drop_keyword_tables else "migrate"
+    click.echo(click.style(f"Starting keyword index migration ({action} keyword tables).", fg="green"))
+
+    last_id = None
+    migrated_count = 0
+    while True:
+        query = db.session.query(DatasetKeywordTable.id, DatasetKeywordTable.dataset_id)
+        if last_id is not None:
+            query = query.filter(DatasetKeywordTable.id > last_id)
+        keyword_tables = query.order_by(DatasetKeywordTable.id).limit(batch_size).all()
+        if not keyword_tables:
+            break
+        last_id = keyword_tables[-1].id
+        for keyword_table in keyword_tables:
+            dataset = db.session.query(Dataset).filter(Dataset.id == keyword_table.dataset_id).first()
+            if not dataset:
+                continue
+            try:
+                if drop_keyword_tables:
+                    if not JiebaInvertedIndex(dataset).drop_keyword_table():
+                        click.echo(
+                            click.style(f"Skipped dataset {dataset.id}, its keyword table is not migrated.", fg="red")
+                        )
+                        continue
+                    click.echo(f"Dropped keyword table of dataset {dataset.id}.")
+                else:
+                    posting_count = JiebaInvertedIndex(dataset).migrate_from_keyword_table()
+                    click.echo(f"Migrated keyword table of dataset {dataset.id} into {posting_count} postings.")
+                migrated_count += 1
+            except Exception as e:
+                db.session.rollback()
+                click.echo(click.style(f"Failed to {action} keyword table of dataset {dataset.id}: {str(e)}", fg="red"))
+
+    click.echo(click.style(f"Keyword index migration completed. Processed {migrated_count} datasets.", fg="green"))
@@ -5,6 +5,7 @@ from pydantic import (
     Field,
     HttpUrl,
     NegativeInt,
+    NonNegativeFloat,
     NonNegativeInt,
     PositiveFloat,
     PositiveInt,
@@ -65,6 +66,29 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of requests per app per day",
         default=5000,
     )
+    APP_GENERATE_MAX_WORKERS: NonNegativeInt = Field(
+        description="Maximum number of app generations running at once per process, further requests wait for a"
+        " worker (0 to run every generation on its own thread)",
+        default=0,
+    )
+    APP_QUEUE_STOP_FLAG_CHECK_INTERVAL: NonNegativeFloat = Field(
+        description="Minimum interval in seconds between checks of the stop flag of a running app"
+        " (0 to check on every event)",
+        default=0.5,
+    )
+    APP_QUEUE_STOP_SIGNAL_PUBSUB_ENABLED: bool = Field(
+        description="Deliver stop requests of running apps through Redis pub/sub instead of polling the stop flag",
+        default=True,
+    )
+    APP_QUEUE_STOP_FLAG_FALLBACK_CHECK_INTERVAL: NonNegativeFloat = Field(
+        description="Minimum interval in seconds between checks of the stop flag"
+        " while stop requests are delivered through Redis pub/sub",
+        default=10.0,
+    )
+    APP_QUEUE_CHUNK_COALESCING_ENABLED: bool = Field(
+        description="Merge consecutive text chunk events that are already queued into one event before streaming them",
+        default=False,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -97,6 +121,47 @@ class CodeExecutionSandboxConfig(BaseSettings):
         default=10.0,
     )
 
+    CODE_EXECUTION_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of concurrent connections to the code execution service per process",
+        default=100,
+    )
+
+    CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of idle keep-alive connections to the code execution service per process",
+        default=20,
+    )
+
+    CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Time in seconds an idle connection to the code execution service is kept alive",
+        default=5.0,
+    )
+
+    CODE_EXECUTION_HTTP2_ENABLED: bool = Field(
+        description="Use HTTP/2 for requests to the code execution service, requires the h2 package",
+        default=False,
+    )
+
+    CODE_EXECUTION_NATIVE_JINJA2_ENABLED: bool = Field(
+        description="Render Jinja2 templates in-process with a sandboxed environment instead of the code sandbox,"
+        " templates that fail the safety check still go to the code sandbox",
+        default=False,
+    )
+
+    CODE_EXECUTION_NATIVE_JINJA2_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled Jinja2 templates cached per process (0 to disable)",
+        default=512,
+    )
+
+    CODE_EXECUTION_NATIVE_JINJA2_MAX_OUTPUT_LENGTH: PositiveInt = Field(
+        description="Maximum length in characters of the output of an in-process Jinja2 render",
+        default=1000000,
+    )
+
+    CODE_EXECUTION_NATIVE_JINJA2_TIMEOUT: PositiveFloat = Field(
+        description="Maximum time in seconds of an in-process Jinja2 render",
+        default=5.0,
+    )
+
     CODE_MAX_NUMBER: PositiveInt = Field(
         description="Maximum allowed numeric value in code execution",
         default=9223372036854775807,
@@ -336,6 +401,12 @@ class HttpConfig(BaseSettings):
         default=1 * 1024 * 1024,
     )
 
+    HTTP_REQUEST_NODE_STREAM_RESPONSE_ENABLED: bool = Field(
+        description="Read HTTP request node responses incrementally, enforcing the size limits while reading"
+        " and writing file responses straight to storage",
+        default=False,
+    )
+
     HTTP_REQUEST_NODE_SSL_VERIFY: bool = Field(
         description="Enable or disable SSL verification for HTTP requests",
         default=True,
@@ -381,6 +452,31 @@ class HttpConfig(BaseSettings):
         default=5,
     )
 
+    SSRF_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of concurrent connections of each pooled network client (SSRF)",
+        default=100,
+    )
+
+    SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of idle keep-alive connections of each pooled network client (SSRF)",
+        default=20,
+    )
+
+    SSRF_POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Time in seconds an idle connection of a pooled network client is kept alive (SSRF)",
+        default=5.0,
+    )
+
+    SSRF_POOL_MAX_CONNECTIONS_PER_HOST: NonNegativeInt = Field(
+        description="Maximum number of concurrent requests to a single host per process (SSRF, 0 for unlimited)",
+        default=0,
+    )
+
+    SSRF_HTTP2_ENABLED: bool = Field(
+        description="Negotiate HTTP/2 for network requests (SSRF), requires the h2 package",
+        default=False,
+    )
+
     RESPECT_XFORWARD_HEADERS_ENABLED: bool = Field(
         description="Enable handling of X-Forwarded-For, X-Forwarded-Proto, and X-Forwarded-Port headers"
         " when the app is behind a single trusted reverse proxy.",
@@ -455,6 +551,17 @@ class ModelLoadBalanceConfig(BaseSettings):
         default=False,
     )
 
+    PROVIDER_CONFIGURATIONS_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of workspaces whose provider configurations are cached per process, 0 to disable",
+        default=512,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of provider configurations cached per process. Changes made outside"
+        " the model provider and plugin services, e.g. directly in the plugin daemon, show up after at most this long",
+        default=300,
+    )
+
 
 class BillingConfig(BaseSettings):
     """
@@ -508,6 +615,11 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_GRAPH_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled workflow graphs kept in memory per process, 0 to disable the cache",
+        default=256,
+    )
+
 
 class WorkflowNodeExecutionConfig(BaseSettings):
     """
@@ -519,11 +631,52 @@ class WorkflowNodeExecutionConfig(BaseSettings):
         default=100,
     )
 
+    GRAPH_ENGINE_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of worker threads shared by parallel branches and iterations of all workflow runs",
+        default=100,
+    )
+
+    GRAPH_ENGINE_MAX_WORKERS_PER_TENANT: PositiveInt = Field(
+        description="Maximum number of shared worker threads the workflow runs of a single tenant may occupy",
+        default=50,
+    )
+
+    GRAPH_ENGINE_MAX_WORKERS_PER_RUN: PositiveInt = Field(
+        description="Maximum number of shared worker threads a single workflow run may occupy",
+        default=20,
+    )
+
+    GRAPH_ENGINE_MAX_QUEUE_SIZE: PositiveInt = Field(
+        description="Maximum number of parallel tasks waiting for a shared worker thread",
+        default=1000,
+    )
+
+    GRAPH_ENGINE_QUEUE_TIMEOUT: PositiveFloat = Field(
+        description="Maximum time in seconds to wait for room in a full worker queue before failing the run",
+        default=30.0,
+    )
+
     WORKFLOW_NODE_EXECUTION_STORAGE: str = Field(
         default="rdbms",
         description="Storage backend for WorkflowNodeExecution. Options: 'rdbms', 'hybrid'",
     )
 
+    WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED: bool = Field(
+        description="Buffer WorkflowNodeExecution writes in memory and persist them in bulk batches"
+        " instead of committing every node start and finish",
+        default=False,
+    )
+
+    WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_BATCH_SIZE: PositiveInt = Field(
+        description="Number of buffered WorkflowNodeExecution writes that triggers a flush",
+        default=100,
+    )
+
+    WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Maximum time in seconds WorkflowNodeExecution writes stay buffered",
+        default=1.0,
+    )
+
 
 class AuthConfig(BaseSettings):
     """
@@ -727,6 +880,17 @@ class DataSetConfig(BaseSettings):
         default=30,
     )
 
+    DATASET_DOCSTORE_BULK_INSERT_ENABLED: bool = Field(
+        description="Insert the segments and child chunks of a split document in bulk batches within one transaction"
+        " instead of committing every segment",
+        default=False,
+    )
+
+    DATASET_DOCSTORE_BULK_INSERT_BATCH_SIZE: PositiveInt = Field(
+        description="Number of rows per query when segments and child chunks are inserted in bulk",
+        default=500,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -754,6 +918,88 @@ class IndexingConfig(BaseSettings):
         default=50,
     )
 
+    EMBEDDING_CACHE_QUERY_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum number of text hashes looked up or inserted per query against the embedding cache table",
+        default=1000,
+    )
+
+    EMBEDDING_CACHE_STORAGE_DTYPE: Literal["float32", "float16"] = Field(
+        description="Float precision used to store vectors in the embedding cache table, 'float16' halves its size",
+        default="float32",
+    )
+
+    EMBEDDING_QUERY_L1_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of query embeddings kept in the per-process cache in front of Redis, 0 to disable",
+        default=1024,
+    )
+
+    EMBEDDING_QUERY_L1_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of query embeddings kept in the per-process cache",
+        default=300,
+    )
+
+    EMBEDDING_QUERY_SINGLE_FLIGHT_REDIS_LOCK_ENABLED: bool = Field(
+        description="Use a Redis lock so only one worker process embeds the same query text at a time",
+        default=False,
+    )
+
+    EMBEDDING_QUERY_SINGLE_FLIGHT_LOCK_WAIT_TIMEOUT: PositiveFloat = Field(
+        description="Seconds to wait for another worker's in-flight query embedding before calling the model anyway",
+        default=10,
+    )
+
+    TOKEN_COUNTER_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of token counts kept in the per-process cache keyed by model and text hash,"
+        " 0 to disable",
+        default=10000,
+    )
+
+    TOKEN_COUNTER_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of token counts kept in the per-process cache",
+        default=3600,
+    )
+
+    TOKEN_COUNTER_BATCH_SIZE: PositiveInt = Field(
+        description="Maximum number of texts sent to the embedding model per token counting request",
+        default=500,
+    )
+
+    TOKEN_COUNTER_PROCESS_POOL_SIZE: NonNegativeInt = Field(
+        description="Number of processes counting tokens with the local GPT-2 tokenizer for large jobs, 0 to disable",
+        default=0,
+    )
+
+    TOKEN_COUNTER_PROCESS_POOL_MIN_TEXTS: PositiveInt = Field(
+        description="Minimum number of texts in a local GPT-2 token counting job to use the process pool",
+        default=1000,
+    )
+
+    INDEXING_PIPELINE_ENABLED: bool = Field(
+        description="Split, save, embed and write the chunks of high quality paragraph documents in concurrent"
+        " pipeline stages instead of one stage after the other",
+        default=False,
+    )
+
+    INDEXING_PIPELINE_BATCH_SIZE: PositiveInt = Field(
+        description="Number of chunks saved, embedded and written together by the indexing pipeline",
+        default=100,
+    )
+
+    INDEXING_PIPELINE_QUEUE_SIZE: PositiveInt = Field(
+        description="Maximum number of batches waiting between two stages of the indexing pipeline",
+        default=4,
+    )
+
+    INDEXING_PIPELINE_EMBEDDING_CONCURRENCY: PositiveInt = Field(
+        description="Maximum number of concurrent embedding requests per model provider in a worker process",
+        default=4,
+    )
+
+    INDEXING_PIPELINE_WRITE_CONCURRENCY: PositiveInt = Field(
+        description="Number of threads writing embedded batches to the vector store per indexed document",
+        default=2,
+    )
+
 
 class MultiModalTransferConfig(BaseSettings):
     MULTIMODAL_SEND_FORMAT: Literal["base64", "url"] = Field(
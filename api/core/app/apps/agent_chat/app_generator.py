@@ -1,6 +1,5 @@
 import contextvars
 import logging
-import threading
 import uuid
 from collections.abc import Generator, Mapping
 from typing import Any, Literal, Union, overload
@@ -15,6 +14,7 @@ from core.app.app_config.features.file_upload.manager import FileUploadConfigMan
 from core.app.apps.agent_chat.app_config_manager import AgentChatAppConfigManager
 from core.app.apps.agent_chat.app_runner import AgentChatAppRunner
 from core.app.apps.agent_chat.generate_response_converter import AgentChatAppGenerateResponseConverter
+from core.app.apps.app_generate_worker_pool import app_generate_worker_pool
 from core.app.apps.base_app_queue_manager import AppQueueManager, GenerateTaskStoppedError, PublishFrom
 from core.app.apps.message_based_app_generator import MessageBasedAppGenerator
 from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
@@ -179,21 +179,17 @@ class AgentChatAppGenerator(MessageBasedAppGenerator):
             message_id=message.id,
         )
 
-        # new thread
-        worker_thread = threading.Thread(
-            target=self._generate_worker,
-            kwargs={
-                "flask_app": current_app._get_current_object(),  # type: ignore
-                "context": contextvars.copy_context(),
-                "application_generate_entity": application_generate_entity,
-                "queue_manager": queue_manager,
-                "conversation_id": conversation.id,
-                "message_id": message.id,
-            },
+        # run generate worker
+        app_generate_worker_pool.submit(
+            self._generate_worker,
+            flask_app=current_app._get_current_object(),  # type: ignore
+            context=contextvars.copy_context(),
+            application_generate_entity=application_generate_entity,
+            queue_manager=queue_manager,
+            conversation_id=conversation.id,
+            message_id=message.id,
         )
 
-        worker_thread.start()
-
         # return response or stream generator
         response = self._handle_response(
             application_generate_entity=application_generate_entity,
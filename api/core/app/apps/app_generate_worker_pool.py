@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+# set while an app generation runs, generators copy it into the threads they start along with the other context
+_in_app_generation: ContextVar[bool] = ContextVar("in_app_generation", default=False)
+
+
+@contextmanager
+def nested_app_generation() -> Iterator[None]:
+    """
+    Treat the generations submitted inside as nested in a running one, for callers the context can't follow,
+    such as apps invoked by plugins on behalf of a workflow.
+    """
+    token = _in_app_generation.set(True)
+    try:
+        yield
+    finally:
+        _in_app_generation.reset(token)
+
+
+class AppGenerateWorkerPool:
+    """
+    Process-wide pool running the generate workers of app generators.
+
+    With max_workers 0 every generation gets a dedicated thread, otherwise at most max_workers generations run at
+    once and the rest wait in FIFO order. Queued streams keep receiving ping events from the queue manager, so the
+    SSE connection stays open while the generation waits for a worker.
+
+    Generations submitted from inside another one, e.g. by a workflow tool, get a dedicated thread instead of
+    queueing, since their parent holds a worker while it waits for them and a saturated pool would deadlock.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._pending = 0
+        self._active = 0
+
+    @property
+    def active_workers(self) -> int:
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def submit(self, target: Callable[..., Any], **kwargs: Any) -> None:
+        """
+        Run target(**kwargs) on a pool worker, or on a new thread if the pool is unbounded or the generation is
+        nested in another one.
+        """
+        if self.max_workers <= 0 or _in_app_generation.get():
+            threading.Thread(target=self._run_dedicated, args=(target, kwargs)).start()
+            return
+
+        with self._lock:
+            self._pending += 1
+        future = self._get_executor().submit(self._run, target, kwargs)
+        future.add_done_callback(self._log_exception)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # worker threads don't survive a fork, so a forked process builds its own executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="app_generate_worker"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    @staticmethod
+    def _run_dedicated(target: Callable[..., Any], kwargs: dict[str, Any]) -> None:
+        _in_app_generation.set(True)
+        target(**kwargs)
+
+    def _run(self, target: Callable[..., Any], kwargs: dict[str, Any]) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._active += 1
+        _in_app_generation.set(True)
+        try:
+            target(**kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    @staticmethod
+    def _log_exception(future: Future) -> None:
+        exception = future.exception()
+        if exception is not None:
+            logger.error("App generate worker failed", exc_info=exception)
+
+
+app_generate_worker_pool = AppGenerateWorkerPool(max_workers=dify_config.APP_GENERATE_MAX_WORKERS)
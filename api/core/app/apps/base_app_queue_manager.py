@@ -1,4 +1,5 @@
 import queue
+import threading
 import time
 from abc import abstractmethod
 from enum import Enum
@@ -7,17 +8,30 @@ from typing import Any, Optional
 from sqlalchemy.orm import DeclarativeMeta
 
 from configs import dify_config
+from core.app.apps.task_stop_listener import task_stop_listener
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
     MessageQueueMessage,
+    QueueAgentMessageEvent,
     QueueErrorEvent,
+    QueueLLMChunkEvent,
     QueuePingEvent,
     QueueStopEvent,
+    QueueTextChunkEvent,
     WorkflowQueueMessage,
 )
 from extensions.ext_redis import redis_client
 
+# 流式分块事件的字段均为带类型的pydantic模型，构造时已校验，不可能携带SQLAlchemy模型实例
+_CHUNK_EVENT_TYPES = (QueueLLMChunkEvent, QueueAgentMessageEvent, QueueTextChunkEvent)
+
+# 合并分块事件时一次最多合并的消息数
+_MAX_COALESCED_CHUNKS = 64
+
+# listen中表示没有暂存消息（None为停止信号）
+_NO_MESSAGE: Any = object()
+
 
 class PublishFrom(Enum):
     APPLICATION_MANAGER = 1
@@ -56,6 +70,14 @@ class AppQueueManager:
         q: queue.Queue[WorkflowQueueMessage | MessageQueueMessage | None] = queue.Queue()
         self._q = q
 
+        # 停止标志的本地缓存，避免每个事件都查询Redis
+        self._stopped = False
+        self._stopped_checked_at = float("-inf")
+        # 通过Redis订阅接收停止信号，订阅正常时停止标志只作为低频兜底检查
+        self._stop_event: Optional[threading.Event] = None
+        if dify_config.APP_QUEUE_STOP_SIGNAL_PUBSUB_ENABLED:
+            self._stop_event = task_stop_listener.register(self._task_id)
+
     def listen(self):
         """监听队列消息的生成器方法
         持续从队列中获取消息，支持超时自动停止和手动停止两种方式
@@ -69,16 +91,24 @@ class AppQueueManager:
         """
         # 获取应用最大执行时间配置
         listen_timeout = dify_config.APP_MAX_EXECUTION_TIME
+        coalesce_chunks = dify_config.APP_QUEUE_CHUNK_COALESCING_ENABLED
         start_time = time.time()
         last_ping_time: int | float = 0
+        pending = _NO_MESSAGE
 
         while True:
             try:
-                # 带超时的队列获取（1秒）
-                message = self._q.get(timeout=1)
+                # 先处理合并分块时取出但未合并的消息，否则带超时的队列获取（1秒）
+                if pending is not _NO_MESSAGE:
+                    message, pending = pending, _NO_MESSAGE
+                else:
+                    message = self._q.get(timeout=1)
                 if message is None:  # 收到停止信号
                     break
 
+                if coalesce_chunks:
+                    message, pending = self._coalesce_chunk_messages(message)
+
                 yield message  # 生成消息
             except queue.Empty:
                 continue
@@ -118,7 +148,9 @@ class AppQueueManager:
             event: 队列事件对象
             pub_from: 发布来源枚举
         """
-        self._check_for_sqlalchemy_models(event.model_dump())  # 安全检查
+        # 安全检查，分块事件按类型即可判定安全，无需逐个序列化检查
+        if not isinstance(event, _CHUNK_EVENT_TYPES):
+            self._check_for_sqlalchemy_models(event.model_dump())
         self._publish(event, pub_from)  # 调用抽象方法
 
     @abstractmethod
@@ -150,20 +182,111 @@ class AppQueueManager:
         if result.decode("utf-8") != f"{user_prefix}-{user_id}":
             return
 
-        # 设置停止标志（有效期10分钟）
+        # 设置停止标志（有效期10分钟），供未收到停止信号的进程兜底检查
         stopped_cache_key = cls._generate_stopped_cache_key(task_id)
         redis_client.setex(stopped_cache_key, 600, 1)
 
+        # 广播停止信号
+        if dify_config.APP_QUEUE_STOP_SIGNAL_PUBSUB_ENABLED:
+            task_stop_listener.notify(task_id)
+
     def _is_stopped(self) -> bool:
         """内部方法：检查任务是否被停止
-        通过查询Redis停止标志判断
+        优先使用订阅收到的停止信号，再查询Redis停止标志兜底。两次查询至少间隔
+        APP_QUEUE_STOP_FLAG_CHECK_INTERVAL秒，订阅正常时间隔APP_QUEUE_STOP_FLAG_FALLBACK_CHECK_INTERVAL秒，
+        已停止的结果不再查询
 
         Returns:
             bool: 是否已停止
         """
+        if self._stopped:
+            return True
+
+        if self._stop_event is not None and self._stop_event.is_set():
+            self._stopped = True
+            return True
+
+        check_interval = dify_config.APP_QUEUE_STOP_FLAG_CHECK_INTERVAL
+        if self._stop_event is not None and task_stop_listener.subscribed:
+            check_interval = max(check_interval, dify_config.APP_QUEUE_STOP_FLAG_FALLBACK_CHECK_INTERVAL)
+
+        now = time.monotonic()
+        if now - self._stopped_checked_at < check_interval:
+            return False
+        self._stopped_checked_at = now
+
         stopped_cache_key = AppQueueManager._generate_stopped_cache_key(self._task_id)
         result = redis_client.get(stopped_cache_key)
-        return result is not None  # 存在标志即表示已停止
+        self._stopped = result is not None  # 存在标志即表示已停止
+        return self._stopped
+
+    def _coalesce_chunk_messages(self, message: Any) -> tuple[Any, Any]:
+        """内部方法：将队列中已就绪的连续分块消息合并为一条
+        只取出已在队列中的消息，不等待新消息，因此不会增加延迟
+
+        Args:
+            message: 当前消息
+
+        Returns:
+            (合并后的消息, 取出但无法合并的消息，没有时为_NO_MESSAGE)
+        """
+        for _ in range(_MAX_COALESCED_CHUNKS):
+            try:
+                next_message = self._q.get_nowait()
+            except queue.Empty:
+                break
+
+            merged_event = self._merge_chunk_events(message.event, next_message.event) if next_message else None
+            if merged_event is None:
+                return message, next_message
+            message = message.model_copy(update={"event": merged_event})
+
+        return message, _NO_MESSAGE
+
+    @staticmethod
+    def _merge_chunk_events(event: AppQueueEvent, next_event: AppQueueEvent) -> Optional[AppQueueEvent]:
+        """内部方法：合并两个连续的分块事件，无法合并时返回None
+
+        Args:
+            event: 先发布的事件
+            next_event: 后发布的事件
+
+        Returns:
+            合并后的事件
+        """
+        if type(event) is not type(next_event):
+            return None
+
+        if isinstance(event, QueueTextChunkEvent) and isinstance(next_event, QueueTextChunkEvent):
+            if (
+                event.from_variable_selector != next_event.from_variable_selector
+                or event.in_iteration_id != next_event.in_iteration_id
+                or event.in_loop_id != next_event.in_loop_id
+            ):
+                return None
+            return next_event.model_copy(update={"text": event.text + next_event.text})
+
+        if isinstance(event, QueueLLMChunkEvent | QueueAgentMessageEvent) and isinstance(
+            next_event, QueueLLMChunkEvent | QueueAgentMessageEvent
+        ):
+            delta, next_delta = event.chunk.delta, next_event.chunk.delta
+            # 只合并纯文本内容，且先发布的分块不能带有用量或结束原因
+            if (
+                not isinstance(delta.message.content, str)
+                or not isinstance(next_delta.message.content, str)
+                or delta.message.tool_calls
+                or next_delta.message.tool_calls
+                or delta.usage is not None
+                or delta.finish_reason is not None
+            ):
+                return None
+            message = next_delta.message.model_copy(
+                update={"content": delta.message.content + next_delta.message.content}
+            )
+            chunk = next_event.chunk.model_copy(update={"delta": next_delta.model_copy(update={"message": message})})
+            return next_event.model_copy(update={"chunk": chunk})
+
+        return None
 
     @classmethod
     def _generate_task_belong_cache_key(cls, task_id: str) -> str:
@@ -0,0 +1,113 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStopListener:
+    """任务停止信号监听器
+    每个进程一个订阅线程，监听Redis停止频道，收到停止消息时设置本进程内对应任务的停止事件，
+    避免每个任务轮询Redis停止标志
+    """
+
+    CHANNEL = "generate_task_stopped"
+
+    def __init__(self, reconnect_interval: float = 1.0) -> None:
+        """初始化监听器
+
+        Args:
+            reconnect_interval: 订阅断开后重连的间隔（秒）
+        """
+        self._reconnect_interval = reconnect_interval
+        self._lock = threading.Lock()
+        # 任务ID到停止事件的映射，队列管理器被回收后自动移除
+        self._events: weakref.WeakValueDictionary[str, threading.Event] = weakref.WeakValueDictionary()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._subscribed = False
+
+    @property
+    def subscribed(self) -> bool:
+        """订阅线程当前是否已订阅停止频道，未订阅时调用方需要轮询停止标志"""
+        return self._subscribed and self._pid == os.getpid()
+
+    def register(self, task_id: str) -> threading.Event:
+        """注册本进程内的任务，必要时启动订阅线程
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            收到停止信号时被设置的事件，调用方需持有该事件的引用
+        """
+        with self._lock:
+            self._ensure_started()
+            event = self._events.get(task_id)
+            if event is None:
+                event = threading.Event()
+                self._events[task_id] = event
+            return event
+
+    def notify(self, task_id: str) -> None:
+        """向所有进程广播任务停止信号
+
+        Args:
+            task_id: 任务ID
+        """
+        redis_client.publish(self.CHANNEL, task_id)
+
+    def _ensure_started(self) -> None:
+        """启动订阅线程，进程fork后重新启动"""
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+
+        self._pid = pid
+        self._subscribed = False
+        self._events = weakref.WeakValueDictionary()
+        self._thread = threading.Thread(target=self._run, name="task-stop-listener", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """订阅线程主循环，连接异常时重连"""
+        while True:
+            pubsub: Any = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                self._subscribed = True
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._handle_message(message["data"])
+            except Exception:
+                logger.exception("Task stop listener disconnected, polling stop flags until reconnected")
+            finally:
+                self._subscribed = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(self._reconnect_interval)
+
+    def _handle_message(self, data: Any) -> None:
+        """设置本进程内对应任务的停止事件
+
+        Args:
+            data: 消息内容（任务ID）
+        """
+        task_id = data.decode("utf-8") if isinstance(data, bytes) else str(data)
+        event = self._events.get(task_id)
+        if event is not None:
+            event.set()
+
+
+# 进程级共享的停止信号监听器
+task_stop_listener = TaskStopListener()
@@ -60,6 +60,7 @@ from core.workflow.graph_engine.entities.event import (
     ParallelBranchRunSucceededEvent,
 )
 from core.workflow.graph_engine.entities.graph import Graph
+from core.workflow.graph_engine.graph_cache import workflow_graph_cache
 from core.workflow.nodes import NodeType
 from core.workflow.nodes.node_mapping import NODE_TYPE_CLASSES_MAPPING
 from core.workflow.workflow_entry import WorkflowEntry
@@ -72,9 +73,16 @@ class WorkflowBasedAppRunner(AppRunner):
     def __init__(self, queue_manager: AppQueueManager):
         self.queue_manager = queue_manager
 
-    def _init_graph(self, graph_config: Mapping[str, Any]) -> Graph:
+    def _init_graph(self, workflow: Workflow) -> Graph:
         """
-        Init graph
+        Init graph, reusing the compiled graph of the workflow when it is cached
+        """
+        return workflow_graph_cache.get_or_init(workflow, lambda: self._build_graph(graph_config=workflow.graph_dict))
+
+    @staticmethod
+    def _build_graph(graph_config: Mapping[str, Any]) -> Graph:
+        """
+        Build graph from the workflow graph config
         """
         if "nodes" not in graph_config or "edges" not in graph_config:
             raise ValueError("nodes or edges not found in workflow graph")
@@ -178,6 +178,8 @@ class WorkflowCycleManage:
         :param conversation_id: conversation id
         :return:
         """
+        # Persist buffered node executions before the final status of the run is committed
+        self._workflow_node_execution_repository.flush()
         workflow_run = self._get_workflow_run(session=session, workflow_run_id=workflow_run_id)
 
         outputs = WorkflowEntry.handle_special_values(outputs)
@@ -214,6 +216,8 @@ class WorkflowCycleManage:
         conversation_id: Optional[str] = None,
         trace_manager: Optional[TraceQueueManager] = None,
     ) -> WorkflowRun:
+        # Persist buffered node executions before the final status of the run is committed
+        self._workflow_node_execution_repository.flush()
         workflow_run = self._get_workflow_run(session=session, workflow_run_id=workflow_run_id)
         outputs = WorkflowEntry.handle_special_values(dict(outputs) if outputs else None)
 
@@ -261,6 +265,8 @@ class WorkflowCycleManage:
         :param error: error message
         :return:
         """
+        # Persist buffered node executions before the final status of the run is committed
+        self._workflow_node_execution_repository.flush()
         workflow_run = self._get_workflow_run(session=session, workflow_run_id=workflow_run_id)
 
         workflow_run.status = status.value
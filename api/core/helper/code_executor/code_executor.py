@@ -1,15 +1,18 @@
+import importlib.util
 import logging
+import os
 from collections.abc import Mapping
 from enum import StrEnum
 from threading import Lock
 from typing import Any, Optional
 
-from httpx import Timeout, post
+from httpx import Client, Limits, Timeout
 from pydantic import BaseModel
 from yarl import URL
 
 from configs import dify_config
 from core.helper.code_executor.javascript.javascript_transformer import NodeJsTemplateTransformer
+from core.helper.code_executor.jinja2.jinja2_native_renderer import Jinja2RenderError, jinja2_native_renderer
 from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
 from core.helper.code_executor.python3.python3_transformer import Python3TemplateTransformer
 from core.helper.code_executor.template_transformer import TemplateTransformer
@@ -55,6 +58,39 @@ class CodeExecutor:
 
     supported_dependencies_languages: set[CodeLanguage] = {CodeLanguage.PYTHON3}
 
+    _http_client: Optional[Client] = None
+    _http_client_pid: Optional[int] = None
+    _http_client_lock = Lock()
+
+    @classmethod
+    def get_http_client(cls) -> Client:
+        """
+        Get the process-wide keep-alive client of the code execution service
+        :return: http client
+        """
+        # connections must not be shared with a forked worker, so each process builds its own client
+        pid = os.getpid()
+        if cls._http_client is not None and cls._http_client_pid == pid:
+            return cls._http_client
+
+        with cls._http_client_lock:
+            if cls._http_client is None or cls._http_client_pid != pid:
+                http2 = dify_config.CODE_EXECUTION_HTTP2_ENABLED
+                if http2 and importlib.util.find_spec("h2") is None:
+                    logger.warning("CODE_EXECUTION_HTTP2_ENABLED is set but h2 is not installed, using HTTP/1.1")
+                    http2 = False
+
+                cls._http_client = Client(
+                    http2=http2,
+                    limits=Limits(
+                        max_connections=dify_config.CODE_EXECUTION_POOL_MAX_CONNECTIONS,
+                        max_keepalive_connections=dify_config.CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=dify_config.CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY,
+                    ),
+                )
+                cls._http_client_pid = pid
+            return cls._http_client
+
     @classmethod
     def execute_code(cls, language: CodeLanguage, preload: str, code: str) -> str:
         """
@@ -76,7 +112,7 @@ class CodeExecutor:
         }
 
         try:
-            response = post(
+            response = cls.get_http_client().post(
                 str(url),
                 json=data,
                 headers=headers,
@@ -131,6 +167,14 @@ class CodeExecutor:
         if not template_transformer:
             raise CodeExecutionError(f"Unsupported language {language}")
 
+        if language == CodeLanguage.JINJA2 and dify_config.CODE_EXECUTION_NATIVE_JINJA2_ENABLED:
+            try:
+                result = jinja2_native_renderer.render(code, inputs)
+            except Jinja2RenderError as e:
+                raise CodeExecutionError(str(e))
+            if result is not None:
+                return {"result": result}
+
         runner, preload = template_transformer.transform_caller(code, inputs)
 
         try:
@@ -0,0 +1,400 @@
+import functools
+import inspect
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextvars import ContextVar
+from string import Formatter
+from typing import Any, Optional
+
+from jinja2 import TemplateError, nodes
+from jinja2.environment import Template
+from jinja2.runtime import Context
+from jinja2.sandbox import SandboxedEnvironment, SecurityError
+from jinja2.utils import Namespace
+from jinja2.visitor import NodeTransformer
+
+from configs import dify_config
+from libs.helper import generate_text_hash
+
+# tags that load other templates or define callables, which are the usual ways to recurse or escape a render
+_UNSAFE_NODES: tuple[type[nodes.Node], ...] = (
+    nodes.Extends,
+    nodes.Include,
+    nodes.Import,
+    nodes.FromImport,
+    nodes.Macro,
+    nodes.CallBlock,
+)
+
+
+# largest integer power computed in-process, in bits of the result
+MAX_POWER_BITS = 4096
+
+# filter wrapped around the iterable of every for loop, so loops stop at the render deadline
+_DEADLINE_FILTER = "_until_render_deadline"
+# filter replacing the ~ operator, so concatenations are bounded like the other operators
+_CONCAT_FILTER = "_bounded_concat"
+
+# printf-style conversion specifier of the % operator and the format filter
+_PERCENT_SPECIFIER = re.compile(r"%(?:\([^)]*\))?[#0 +\-]*(\*|\d+)?(?:\.(\*|\d+))?[hlL]?[a-zA-Z%]")
+# size estimated for results that can't be bounded up front
+_UNBOUNDED = sys.maxsize
+
+_render_deadline: ContextVar[float] = ContextVar("jinja2_render_deadline", default=float("inf"))
+
+
+class Jinja2RenderError(Exception):
+    pass
+
+
+class _RenderTimeoutError(Exception):
+    pass
+
+
+def _until_render_deadline(iterable: Iterable[Any]) -> Iterator[Any]:
+    deadline = _render_deadline.get()
+    for item in iterable:
+        if time.monotonic() > deadline:
+            raise _RenderTimeoutError()
+        yield item
+
+
+def _text_size(value: Any, limit: int) -> int:
+    """
+    Estimate the length of the text of a value without building it, stopping once the estimate exceeds limit.
+    """
+    size = 0
+    stack = [value]
+    while stack and size <= limit:
+        value = stack.pop()
+        if isinstance(value, str):
+            size += len(value)
+        elif isinstance(value, bool | float | None):
+            size += 24
+        elif isinstance(value, int):
+            size += value.bit_length() // 3 + 2
+        elif isinstance(value, Mapping):
+            size += 2 + 4 * len(value)
+            if size <= limit:
+                stack.extend(value.keys())
+                stack.extend(value.values())
+        elif isinstance(value, list | tuple | set | frozenset):
+            size += 2 + 2 * len(value)
+            if size <= limit:
+                stack.extend(value)
+        elif isinstance(value, Namespace):
+            size += 12
+            stack.append(value._Namespace__attrs)
+        else:
+            size += 24
+    return size
+
+
+class BoundedSandboxedEnvironment(SandboxedEnvironment):
+    """
+    SandboxedEnvironment that refuses operations whose result would be longer than max_length characters or
+    items, and integer powers larger than MAX_POWER_BITS, which would otherwise allocate unbounded memory before
+    any output is produced. Operators, string and list methods, filters and globals that can build a result
+    much larger than their arguments estimate its size before running, and so does the output of every
+    expression. Intercepting the operators also keeps the compiler from folding them at parse time.
+    """
+
+    intercepted_binops = frozenset(["+", "*", "**", "%"])
+
+    def __init__(self, max_length: int):
+        super().__init__(finalize=self._finalize_output)
+        self.max_length = max_length
+        self.filters[_DEADLINE_FILTER] = _until_render_deadline
+        self.filters[_CONCAT_FILTER] = self._concat
+        filter_sizes: dict[str, Callable[..., int]] = {
+            "center": lambda value, width, **_: max(self._text_size(value), width),
+            "indent": lambda s, width, **_: (
+                self._text_size(s)
+                + ((s.count("\n") if isinstance(s, str) else self._text_size(s)) + 1)
+                * (width if isinstance(width, int) else len(width))
+            ),
+            "wordwrap": lambda s, wrapstring, **_: self._text_size(s) * (1 + len(wrapstring or "\n")),
+            "join": lambda value, d, **_: self._text_size(value) + len(d) * len(value),
+            "replace": lambda s, old, new, count, **_: self._replace_size(s, old, new, count),
+            "format": lambda value, args, kwargs, **_: self._percent_format_size(value, args or kwargs),
+            "string": lambda s, **_: self._text_size(s),
+            "pprint": lambda value, **_: 2 * self._text_size(value),
+            "tojson": lambda value, **_: 6 * self._text_size(value),
+            "batch": lambda linecount, **_: linecount,
+            "slice": lambda slices, **_: slices,
+            "sum": lambda iterable, start, **_: (
+                sum(len(item) for item in iterable) if isinstance(start, list | tuple) else 0
+            ),
+        }
+        for name, size in filter_sizes.items():
+            self.filters[name] = self._bounded_filter(self.filters[name], size)
+        lipsum = self.globals["lipsum"]
+        self.globals["lipsum"] = self._bounded_filter(lipsum, lambda n, max, **_: n * max * 16)
+
+    def call_binop(self, context: Context, operator: str, left: Any, right: Any) -> Any:
+        if operator == "+":
+            if isinstance(left, str | list | tuple) and isinstance(right, str | list | tuple):
+                self._check_size(len(left) + len(right))
+        elif operator == "*":
+            for sequence, count in ((left, right), (right, left)):
+                if isinstance(sequence, str | list | tuple) and isinstance(count, int):
+                    self._check_size(len(sequence) * count)
+        elif operator == "**":
+            if (
+                isinstance(left, int)
+                and isinstance(right, int)
+                and right > 0
+                and abs(left) > 1
+                and abs(left).bit_length() * right > MAX_POWER_BITS
+            ):
+                raise SecurityError(f"Integer power larger than {MAX_POWER_BITS} bits")
+        elif operator == "%":
+            if isinstance(left, str):
+                self._check_size(self._percent_format_size(left, right))
+        return super().call_binop(context, operator, left, right)
+
+    def call(__self, __context: Context, __obj: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: N805
+        # str.format and str.format_map are wrapped by the sandbox
+        method = getattr(__obj, "__wrapped__", __obj)
+        owner = getattr(method, "__self__", None)
+        if isinstance(owner, str | list) and isinstance(getattr(method, "__name__", None), str):
+            args = tuple(list(arg) if isinstance(arg, Iterator) else arg for arg in args)
+            __self._check_size(__self._method_size(owner, method.__name__, args, kwargs))
+        return super().call(__context, __obj, *args, **kwargs)
+
+    def _method_size(self, owner: str | list, name: str, args: tuple, kwargs: dict) -> int:
+        """Estimate the size of the result of a str or list method, 0 if it can't grow beyond its arguments."""
+        try:
+            if isinstance(owner, list):
+                if name in {"append", "insert"}:
+                    return len(owner) + 1
+                if name == "extend":
+                    return len(owner) + len(args[0])
+            elif name in {"center", "ljust", "rjust", "zfill"}:
+                return max(len(owner), args[0])
+            elif name == "expandtabs":
+                return len(owner) + owner.count("\t") * (args[0] if args else kwargs.get("tabsize", 8))
+            elif name == "replace":
+                return self._replace_size(owner, *args, **kwargs)
+            elif name == "join":
+                return self._text_size(args[0]) + len(owner) * len(args[0])
+            elif name == "translate":
+                return len(owner) * max(1, self._text_size(list(args[0].values())))
+            elif name == "format":
+                return self._format_size(owner, list(args) + list(kwargs.values()))
+            elif name == "format_map":
+                return self._format_size(owner, args[0])
+        except (TypeError, ValueError, AttributeError, IndexError):
+            # invalid arguments, the call itself raises the error
+            pass
+        return 0
+
+    def _bounded_filter(self, func: Callable[..., Any], size: Callable[..., int]) -> Callable[..., Any]:
+        # the environment isn't async, and async variants take an argument their signature doesn't show
+        if getattr(func, "jinja_async_variant", False):
+            func = func.__wrapped__  # type: ignore[attr-defined]
+        signature = inspect.signature(func)
+        unknown = {name for name in inspect.signature(size).parameters if name != "_"} - set(signature.parameters)
+        if unknown:
+            raise ValueError(f"{func.__name__} has no arguments {unknown}")
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                arguments = signature.bind(*args, **kwargs)
+            except TypeError:
+                return func(*args, **kwargs)
+            arguments.apply_defaults()
+            for name, value in arguments.arguments.items():
+                if isinstance(value, Iterator):
+                    arguments.arguments[name] = list(value)
+            try:
+                estimate = size(**arguments.arguments)
+            except (TypeError, ValueError, AttributeError):
+                # invalid arguments, the filter itself raises the error
+                estimate = 0
+            self._check_size(estimate)
+            return func(*arguments.args, **arguments.kwargs)
+
+        return wrapper
+
+    def _concat(self, values: list[Any]) -> str:
+        self._check_size(self._text_size(values))
+        return "".join(map(str, values))
+
+    def _finalize_output(self, value: Any) -> Any:
+        if self._text_size(value) > self.max_length:
+            raise Jinja2RenderError(f"Output length exceeds {self.max_length} characters")
+        return value
+
+    def _check_size(self, size: int) -> None:
+        if size > self.max_length:
+            raise SecurityError(f"Result longer than {self.max_length} characters or items")
+
+    def _text_size(self, value: Any) -> int:
+        return _text_size(value, self.max_length)
+
+    def _replace_size(self, s: Any, old: Any, new: Any, count: Optional[int] = -1) -> int:
+        size = self._text_size(s)
+        if not isinstance(s, str) or not isinstance(old, str) or not isinstance(new, str):
+            return size * max(1, self._text_size(new))
+        if len(new) <= len(old):
+            return size
+        replacements = s.count(old) if old else len(s) + 1
+        if count is not None and count >= 0:
+            replacements = min(replacements, count)
+        return size + replacements * (len(new) - len(old))
+
+    def _format_size(self, template: str, values: Any) -> int:
+        size = len(template)
+        values_size = self._text_size(values)
+        for _, field, spec, _ in Formatter().parse(template):
+            if field is None:
+                continue
+            if spec and "{" in spec:
+                return _UNBOUNDED
+            size += values_size + sum(int(number) for number in re.findall(r"\d+", spec or ""))
+        return size
+
+    def _percent_format_size(self, template: str, values: Any) -> int:
+        size = len(template)
+        values_size = self._text_size(values)
+        for width, precision in _PERCENT_SPECIFIER.findall(template):
+            if width == "*" or precision == "*":
+                return _UNBOUNDED
+            size += values_size + int(width or 0) + int(precision or 0)
+        return size
+
+
+class _BoundingTransformer(NodeTransformer):
+    """Wraps the iterable of every for loop in the deadline filter and replaces ~ with the bounded concat."""
+
+    def visit_For(self, node: nodes.For) -> nodes.Node:  # noqa: N802
+        node = self.generic_visit(node)
+        node.iter = nodes.Filter(node.iter, _DEADLINE_FILTER, [], [], None, None, lineno=node.iter.lineno)
+        return node
+
+    def visit_Concat(self, node: nodes.Concat) -> nodes.Node:  # noqa: N802
+        node = self.generic_visit(node)
+        return nodes.Filter(
+            nodes.List(node.nodes, lineno=node.lineno), _CONCAT_FILTER, [], [], None, None, lineno=node.lineno
+        )
+
+
+class Jinja2NativeRenderer:
+    """
+    In-process Jinja2 renderer with an LRU cache of compiled templates.
+
+    Templates run in a BoundedSandboxedEnvironment under an output length and time limit. Without macros and
+    recursive loops, for loops are the only way a template can run for long, so every loop checks the time limit
+    on each iteration, whether or not it produces output. A template the safety check rejects is cached as
+    unsupported and render returns None for it, so the caller falls back to the code sandbox, the same way it
+    does when the sandboxed environment blocks an unsafe attribute access or operation at render time.
+    """
+
+    def __init__(self, capacity: int, max_output_length: int, timeout: float):
+        self._environment = BoundedSandboxedEnvironment(max_length=max_output_length)
+        self._cache: OrderedDict[str, Optional[Template]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.capacity = capacity
+        self.max_output_length = max_output_length
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, template: str, inputs: Mapping[str, Any]) -> Optional[str]:
+        """
+        Render template
+        :param template: template
+        :param inputs: inputs
+        :return: rendered text, None if the template has to be rendered by the code sandbox
+        """
+        compiled = self._get_template(template)
+        if compiled is None:
+            return None
+
+        # the sandbox receives the inputs as JSON, so render with the same values
+        inputs = json.loads(json.dumps(inputs, ensure_ascii=False))
+
+        deadline = time.monotonic() + self.timeout
+        deadline_token = _render_deadline.set(deadline)
+        output_length = 0
+        chunks = []
+        try:
+            for chunk in compiled.generate(**inputs):
+                output_length += len(chunk)
+                if output_length > self.max_output_length:
+                    raise Jinja2RenderError(f"Output length exceeds {self.max_output_length} characters")
+                if time.monotonic() > deadline:
+                    raise _RenderTimeoutError()
+                chunks.append(chunk)
+        except SecurityError:
+            return None
+        except _RenderTimeoutError:
+            raise Jinja2RenderError(f"Template rendering exceeded {self.timeout} seconds")
+        except RecursionError:
+            raise Jinja2RenderError("Template rendering exceeded the maximum recursion depth")
+        except Jinja2RenderError:
+            raise
+        except Exception as e:
+            raise Jinja2RenderError(str(e))
+        finally:
+            _render_deadline.reset(deadline_token)
+
+        return "".join(chunks)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def _get_template(self, template: str) -> Optional[Template]:
+        key = generate_text_hash(template)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        compiled = self._compile(template)
+        if self.capacity > 0:
+            with self._lock:
+                self._cache[key] = compiled
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.capacity:
+                    self._cache.popitem(last=False)
+        return compiled
+
+    def _compile(self, template: str) -> Optional[Template]:
+        # the sandbox runner embeds the template in a python string literal, which reinterprets backslash escapes
+        if "\\" in template or "'''" in template:
+            return None
+
+        try:
+            ast = self._environment.parse(template)
+            if any(True for _ in ast.find_all(_UNSAFE_NODES)):
+                return None
+            if any(loop.recursive for loop in ast.find_all(nodes.For)):
+                return None
+            return self._environment.from_string(_BoundingTransformer().visit(ast))
+        except TemplateError:
+            # leave syntax errors to the sandbox so they are reported the same way as before
+            return None
+
+
+jinja2_native_renderer = Jinja2NativeRenderer(
+    capacity=dify_config.CODE_EXECUTION_NATIVE_JINJA2_CACHE_SIZE,
+    max_output_length=dify_config.CODE_EXECUTION_NATIVE_JINJA2_MAX_OUTPUT_LENGTH,
+    timeout=dify_config.CODE_EXECUTION_NATIVE_JINJA2_TIMEOUT,
+)
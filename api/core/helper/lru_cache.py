@@ -1,3 +1,5 @@
+import threading
+import time
 from collections import OrderedDict
 from typing import Any
 
@@ -20,3 +22,56 @@ class LRUCache:
         self.cache[key] = value
         if len(self.cache) > self.capacity:
             self.cache.popitem(last=False)  # pop the first item
+
+
+class TTLLRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a fixed time-to-live.
+    Keeps hit and miss counters so callers can report cache effectiveness.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self._cache: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._cache[key]
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
@@ -0,0 +1,76 @@
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from configs import dify_config
+from core.helper.lru_cache import TTLLRUCache
+from extensions.ext_redis import redis_client
+
+if TYPE_CHECKING:
+    from core.entities.provider_configuration import ProviderConfigurations
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderConfigurationsCache:
+    """
+    Per-process cache of the provider configurations of each workspace.
+
+    Entries are tagged with a per-workspace version counter kept in Redis, so a change of provider, model,
+    credential or load balancing records in any process invalidates the cached configurations of all processes.
+    A lookup costs one Redis GET and no database queries.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self._cache = TTLLRUCache(capacity=capacity, ttl=ttl)
+
+    @staticmethod
+    def _version_key(tenant_id: str) -> str:
+        return f"provider_configurations_version:tenant_id:{tenant_id}"
+
+    def _get_version(self, tenant_id: str) -> str | None:
+        try:
+            version = redis_client.get(self._version_key(tenant_id))
+        except Exception:
+            logger.exception(f"Failed to get provider configurations version of tenant {tenant_id}")
+            return None
+        return version.decode() if isinstance(version, bytes) else str(version or 0)
+
+    def get_or_load(self, tenant_id: str, load: Callable[[], "ProviderConfigurations"]) -> "ProviderConfigurations":
+        """
+        Get the provider configurations of the workspace, loading them on a miss
+        :param tenant_id: workspace id
+        :param load: loads the provider configurations from the database
+        :return: provider configurations, shared with other callers and not to be modified
+        """
+        # read the version before loading, a change during the load then only makes the entry stale
+        version = self._get_version(tenant_id)
+        if version is None:
+            return load()
+
+        entry = self._cache.get(tenant_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        provider_configurations = load()
+        self._cache.put(tenant_id, (version, provider_configurations))
+        return provider_configurations
+
+    def invalidate(self, tenant_id: str) -> None:
+        """
+        Invalidate the cached provider configurations of the workspace in all processes
+        :param tenant_id: workspace id
+        """
+        self._cache.delete(tenant_id)
+        try:
+            redis_client.incr(self._version_key(tenant_id))
+        except Exception:
+            logger.exception(f"Failed to invalidate provider configurations of tenant {tenant_id}")
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+provider_configurations_cache = ProviderConfigurationsCache(
+    capacity=dify_config.PROVIDER_CONFIGURATIONS_CACHE_SIZE, ttl=dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL
+)
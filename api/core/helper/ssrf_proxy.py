@@ -2,10 +2,19 @@
 Proxy requests to avoid SSRF
 """
 
+import asyncio
+import importlib.util
 import logging
+import os
+import threading
 import time
+import weakref
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any, Optional
 
 import httpx
+from httpx._utils import get_environment_proxies
 
 from configs import dify_config
 
@@ -34,7 +43,150 @@ class MaxRetriesExceededError(ValueError):
     pass
 
 
-def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+# proxy urls (all, http, https) and ssl verify
+ClientKey = tuple[Optional[str], Optional[str], Optional[str], bool]
+# default transport and the transports mounted for url patterns, None mounts the default transport
+Transports = tuple[Any, dict[str, Optional[Any]]]
+
+_transports: dict[ClientKey, Transports] = {}
+_transports_pid: Optional[int] = None
+_async_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[ClientKey, Transports]]" = (
+    weakref.WeakKeyDictionary()
+)
+_host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_async_host_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def _client_key(ssl_verify: bool) -> ClientKey:
+    return (
+        dify_config.SSRF_PROXY_ALL_URL,
+        dify_config.SSRF_PROXY_HTTP_URL,
+        dify_config.SSRF_PROXY_HTTPS_URL,
+        ssl_verify,
+    )
+
+
+def _create_transports(key: ClientKey, transport_cls: type) -> Transports:
+    proxy_all_url, proxy_http_url, proxy_https_url, ssl_verify = key
+
+    http2 = dify_config.SSRF_HTTP2_ENABLED
+    if http2 and importlib.util.find_spec("h2") is None:
+        logging.warning("SSRF_HTTP2_ENABLED is set but h2 is not installed, using HTTP/1.1")
+        http2 = False
+
+    options = {
+        "verify": ssl_verify,
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=dify_config.SSRF_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=dify_config.SSRF_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=dify_config.SSRF_POOL_KEEPALIVE_EXPIRY,
+        ),
+    }
+    if proxy_all_url:
+        return transport_cls(proxy=proxy_all_url, **options), {}
+    elif proxy_http_url and proxy_https_url:
+        https_transport = transport_cls(proxy=proxy_https_url, **options)
+        return https_transport, {
+            "http://": transport_cls(proxy=proxy_http_url, **options),
+            "https://": https_transport,
+        }
+
+    # without SSRF proxies, honour the HTTP(S)_PROXY, ALL_PROXY and NO_PROXY environment variables the way a
+    # client without a transport does
+    proxy_transports: dict[str, Any] = {}
+    mounts: dict[str, Optional[Any]] = {}
+    for pattern, proxy_url in get_environment_proxies().items():
+        if proxy_url and proxy_url not in proxy_transports:
+            proxy_transports[proxy_url] = transport_cls(proxy=proxy_url, **options)
+        mounts[pattern] = proxy_transports[proxy_url] if proxy_url else None
+    return transport_cls(**options), mounts
+
+
+def _reset_after_fork() -> None:
+    """Drop the pools of the parent process, connections must not be shared with a forked worker. Call with _lock."""
+    global _transports_pid
+
+    if _transports_pid != os.getpid():
+        _transports.clear()
+        _async_transports.clear()
+        _host_semaphores.clear()
+        _async_host_semaphores.clear()
+        _transports_pid = os.getpid()
+
+
+def get_client(ssl_verify: bool = True) -> httpx.Client:
+    """
+    Get a client using the connection pool of the current proxy config.
+    The pool is shared by the process, while the client and its cookies only live for a single request,
+    so cookies set on redirects are kept within the request without leaking into other requests.
+    The client must not be closed, closing it closes the shared pool.
+    :param ssl_verify: verify ssl certificates
+    :return: http client for a single request
+    """
+    key = _client_key(ssl_verify)
+    with _lock:
+        _reset_after_fork()
+        transports = _transports.get(key)
+        if transports is None:
+            transports = _transports[key] = _create_transports(key, httpx.HTTPTransport)
+    transport, mounts = transports
+    return httpx.Client(transport=transport, mounts=mounts)
+
+
+def get_async_client(ssl_verify: bool = True) -> httpx.AsyncClient:
+    """
+    Get a client using the connection pool of the current proxy config for the running event loop.
+    Like get_client, the client only lives for a single request and must not be closed.
+    :param ssl_verify: verify ssl certificates
+    :return: http client for a single request
+    """
+    key = _client_key(ssl_verify)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _reset_after_fork()
+        loop_transports = _async_transports.setdefault(loop, {})
+        transports = loop_transports.get(key)
+        if transports is None:
+            transports = loop_transports[key] = _create_transports(key, httpx.AsyncHTTPTransport)
+    transport, mounts = transports
+    return httpx.AsyncClient(transport=transport, mounts=mounts)
+
+
+def _host_semaphore(url) -> Optional[threading.BoundedSemaphore]:
+    max_connections_per_host = dify_config.SSRF_POOL_MAX_CONNECTIONS_PER_HOST
+    if not max_connections_per_host:
+        return None
+    host = httpx.URL(url).host
+    with _lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = _host_semaphores[host] = threading.BoundedSemaphore(max_connections_per_host)
+        return semaphore
+
+
+def _async_host_semaphore(url) -> Optional[asyncio.Semaphore]:
+    max_connections_per_host = dify_config.SSRF_POOL_MAX_CONNECTIONS_PER_HOST
+    if not max_connections_per_host:
+        return None
+    host = httpx.URL(url).host
+    loop = asyncio.get_running_loop()
+    with _lock:
+        semaphores = _async_host_semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(host)
+        if semaphore is None:
+            semaphore = semaphores[host] = asyncio.Semaphore(max_connections_per_host)
+        return semaphore
+
+
+def _prepare_kwargs(kwargs: dict) -> bool:
+    """
+    Normalize request kwargs in place
+    :return: ssl verify
+    """
     if "allow_redirects" in kwargs:
         allow_redirects = kwargs.pop("allow_redirects")
         if "follow_redirects" not in kwargs:
@@ -48,26 +200,21 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
             write=dify_config.SSRF_DEFAULT_WRITE_TIME_OUT,
         )
 
-    if "ssl_verify" not in kwargs:
-        kwargs["ssl_verify"] = HTTP_REQUEST_NODE_SSL_VERIFY
+    return kwargs.pop("ssl_verify", HTTP_REQUEST_NODE_SSL_VERIFY)
 
-    ssl_verify = kwargs.pop("ssl_verify")
+
+def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    ssl_verify = _prepare_kwargs(kwargs)
+    client = get_client(ssl_verify)
+    semaphore = _host_semaphore(url)
 
     retries = 0
     while retries <= max_retries:
         try:
-            if dify_config.SSRF_PROXY_ALL_URL:
-                with httpx.Client(proxy=dify_config.SSRF_PROXY_ALL_URL, verify=ssl_verify) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            elif dify_config.SSRF_PROXY_HTTP_URL and dify_config.SSRF_PROXY_HTTPS_URL:
-                proxy_mounts = {
-                    "http://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTP_URL, verify=ssl_verify),
-                    "https://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTPS_URL, verify=ssl_verify),
-                }
-                with httpx.Client(mounts=proxy_mounts, verify=ssl_verify) as client:
-                    response = client.request(method=method, url=url, **kwargs)
+            if semaphore is None:
+                response = client.request(method=method, url=url, **kwargs)
             else:
-                with httpx.Client(verify=ssl_verify) as client:
+                with semaphore:
                     response = client.request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
@@ -86,6 +233,84 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     raise MaxRetriesExceededError(f"Reached maximum retries ({max_retries}) for URL {url}")
 
 
+@contextmanager
+def stream_request(
+    method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs
+) -> Generator[httpx.Response, None, None]:
+    """
+    Make a request whose response body is read from the open connection by the caller
+    :param method: http method
+    :param url: url
+    :param max_retries: retries before the response is handed out, reading the body is never retried
+    :return: response with an unread body
+    """
+    ssl_verify = _prepare_kwargs(kwargs)
+    client = get_client(ssl_verify)
+    semaphore = _host_semaphore(url)
+
+    retries = 0
+    while retries <= max_retries:
+        streamed = False
+        try:
+            if semaphore is not None:
+                semaphore.acquire()
+            try:
+                with client.stream(method=method, url=url, **kwargs) as response:
+                    if response.status_code not in STATUS_FORCELIST:
+                        streamed = True
+                        yield response
+                        return
+                    else:
+                        logging.warning(
+                            f"Received status code {response.status_code} for URL {url} which is in the force list"
+                        )
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+        except httpx.RequestError as e:
+            if streamed:
+                raise
+            logging.warning(f"Request to URL {url} failed on attempt {retries + 1}: {e}")
+            if max_retries == 0:
+                raise
+
+        retries += 1
+        if retries <= max_retries:
+            time.sleep(BACKOFF_FACTOR * (2 ** (retries - 1)))
+    raise MaxRetriesExceededError(f"Reached maximum retries ({max_retries}) for URL {url}")
+
+
+async def make_request_async(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    ssl_verify = _prepare_kwargs(kwargs)
+    client = get_async_client(ssl_verify)
+    semaphore = _async_host_semaphore(url)
+
+    retries = 0
+    while retries <= max_retries:
+        try:
+            if semaphore is None:
+                response = await client.request(method=method, url=url, **kwargs)
+            else:
+                async with semaphore:
+                    response = await client.request(method=method, url=url, **kwargs)
+
+            if response.status_code not in STATUS_FORCELIST:
+                return response
+            else:
+                logging.warning(f"Received status code {response.status_code} for URL {url} which is in the force list")
+
+        except httpx.RequestError as e:
+            logging.warning(f"Request to URL {url} failed on attempt {retries + 1}: {e}")
+            if max_retries == 0:
+                raise
+
+        retries += 1
+        if retries <= max_retries:
+            await asyncio.sleep(BACKOFF_FACTOR * (2 ** (retries - 1)))
+    raise MaxRetriesExceededError(f"Reached maximum retries ({max_retries}) for URL {url}")
+
+
 def get(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     return make_request("GET", url, max_retries=max_retries, **kwargs)
 
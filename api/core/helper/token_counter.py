@@ -0,0 +1,129 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from configs import dify_config
+from core.helper.lru_cache import TTLLRUCache
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+from libs.helper import generate_text_hash
+
+if TYPE_CHECKING:
+    from core.model_manager import ModelInstance
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCounter:
+    """
+    Count the tokens of texts with a cache keyed by model and text hash in front of the tokenizer.
+    Texts missing from the cache are deduplicated and sent to the embedding model in batches, large local
+    GPT-2 jobs can be spread over a process pool.
+    """
+
+    def __init__(
+        self,
+        cache_size: int,
+        cache_ttl: float,
+        batch_size: int,
+        process_pool_size: int = 0,
+        process_pool_min_texts: int = 1000,
+    ):
+        self.cache = TTLLRUCache(capacity=cache_size, ttl=cache_ttl)
+        self.batch_size = batch_size
+        self.process_pool_size = process_pool_size
+        self.process_pool_min_texts = process_pool_min_texts
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
+
+    def get_text_embedding_num_tokens(self, model_instance: "ModelInstance", texts: list[str]) -> list[int]:
+        """
+        Count the tokens of each text with the tokenizer of an embedding model.
+        """
+        namespace = (
+            model_instance.provider_model_bundle.configuration.tenant_id,
+            model_instance.provider,
+            model_instance.model,
+        )
+        return self._count(
+            namespace=namespace,
+            texts=texts,
+            count_texts=lambda batch: model_instance.get_text_embedding_num_tokens(texts=batch),
+            batch_size=self.batch_size,
+        )
+
+    def get_gpt2_num_tokens(self, texts: list[str]) -> list[int]:
+        """
+        Count the tokens of each text with the local GPT-2 tokenizer.
+        """
+        return self._count(namespace=("gpt2",), texts=texts, count_texts=self._count_gpt2_tokens)
+
+    def _count(
+        self,
+        namespace: tuple[Hashable, ...],
+        texts: list[str],
+        count_texts: Callable[[list[str]], list[int]],
+        batch_size: Optional[int] = None,
+    ) -> list[int]:
+        if not texts:
+            return []
+
+        keys = [(*namespace, generate_text_hash(text)) for text in texts]
+        counts: list[Optional[int]] = [self.cache.get(key) for key in keys]
+
+        # chunks of a document repeat often, count every distinct text once
+        missing: dict[tuple, str] = {}
+        for key, text, count in zip(keys, texts, counts):
+            if count is None and key not in missing:
+                missing[key] = text
+
+        if missing:
+            missing_keys = list(missing)
+            missing_texts = list(missing.values())
+            batch_size = batch_size or len(missing_texts)
+            counted: dict[tuple, int] = {}
+            for i in range(0, len(missing_texts), batch_size):
+                batch_counts = count_texts(missing_texts[i : i + batch_size])
+                for key, count in zip(missing_keys[i : i + batch_size], batch_counts):
+                    self.cache.put(key, count)
+                    counted[key] = count
+            counts = [counted[key] if count is None else count for key, count in zip(keys, counts)]
+
+        return [count or 0 for count in counts]
+
+    def _count_gpt2_tokens(self, texts: list[str]) -> list[int]:
+        if self.process_pool_size > 0 and len(texts) >= self.process_pool_min_texts:
+            pool = self._get_process_pool()
+            if pool is not None:
+                chunksize = max(1, len(texts) // (self.process_pool_size * 4))
+                return list(pool.map(GPT2Tokenizer.get_num_tokens, texts, chunksize=chunksize))
+
+        return [GPT2Tokenizer.get_num_tokens(text) for text in texts]
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        # daemonic processes, such as celery prefork workers, are not allowed to have children
+        if multiprocessing.current_process().daemon:
+            return None
+
+        with self._pool_lock:
+            # a forked process can't use the pool of its parent
+            if self._pool is None or self._pool_pid != os.getpid():
+                logger.info("Starting token counter process pool with %s processes", self.process_pool_size)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.process_pool_size, mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+
+token_counter = TokenCounter(
+    cache_size=dify_config.TOKEN_COUNTER_CACHE_SIZE,
+    cache_ttl=dify_config.TOKEN_COUNTER_CACHE_TTL,
+    batch_size=dify_config.TOKEN_COUNTER_BATCH_SIZE,
+    process_pool_size=dify_config.TOKEN_COUNTER_PROCESS_POOL_SIZE,
+    process_pool_min_texts=dify_config.TOKEN_COUNTER_PROCESS_POOL_MIN_TEXTS,
+)
@@ -0,0 +1,221 @@
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any, Optional
+
+from core.rag.models.document import Document
+
+_END = object()
+
+_provider_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_provider_semaphores_lock = threading.Lock()
+
+
+def get_provider_semaphore(provider: str, concurrency: int) -> threading.BoundedSemaphore:
+    """
+    Process-wide limit of concurrent embedding requests to a provider, shared by all documents being indexed.
+    """
+    with _provider_semaphores_lock:
+        semaphore = _provider_semaphores.get(provider)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(concurrency)
+            _provider_semaphores[provider] = semaphore
+        return semaphore
+
+
+class PipelineStoppedError(Exception):
+    pass
+
+
+class PipelineStageMetrics:
+    """
+    Chunks processed by a pipeline stage and the time its workers spent processing them.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.batches = 0
+        self.busy_time = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items: int, elapsed: float) -> None:
+        with self._lock:
+            self.items += items
+            self.batches += 1
+            self.busy_time += elapsed
+
+    @property
+    def throughput(self) -> float:
+        """Chunks per busy second of a single worker."""
+        return self.items / self.busy_time if self.busy_time else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.items} chunks in {self.batches} batches,"
+            f" {self.busy_time:.2f}s busy, {self.throughput:.1f} chunks/s"
+        )
+
+
+class IndexingPipeline:
+    """
+    Index the pages of a document in concurrent stages.
+
+    A single thread cleans and splits the pages and saves the chunks in batches, in order, so segment positions
+    stay sequential. Saved batches go through a bounded queue to embedding workers, which share a semaphore
+    limiting the concurrent requests to the embedding provider, and embedded batches go through a second
+    bounded queue to vector writers. This way the embedding provider and the vector database work while later
+    pages are still being split, and a slow stage holds back the stages before it instead of buffering the
+    whole document.
+
+    The first error of any stage stops the pipeline and is raised by run(). A pipeline runs once.
+    """
+
+    def __init__(
+        self,
+        split: Callable[[Document], list[Document]],
+        save: Callable[[list[Document]], None],
+        embed: Callable[[list[Document]], list[list[float]]],
+        write: Callable[[list[Document], list[list[float]]], None],
+        batch_size: int = 100,
+        queue_size: int = 4,
+        embedding_concurrency: int = 4,
+        write_concurrency: int = 2,
+        embedding_semaphore: Optional[threading.BoundedSemaphore] = None,
+        split_completed: Optional[Callable[[], None]] = None,
+    ):
+        self._split = split
+        self._save = save
+        self._embed = embed
+        self._write = write
+        self._batch_size = batch_size
+        self._embedding_concurrency = embedding_concurrency
+        self._write_concurrency = write_concurrency
+        self._embedding_semaphore = embedding_semaphore
+        self._split_completed = split_completed
+        self._embed_queue: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+        self._write_queue: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._running_embedding_workers = embedding_concurrency
+        self.metrics = {name: PipelineStageMetrics(name) for name in ("split", "save", "embed", "write")}
+        self.elapsed = 0.0
+
+    def run(self, pages: Iterable[Document]) -> None:
+        """
+        Run all stages over the pages and wait until every chunk is written.
+        """
+        threads = [threading.Thread(target=self._run_stage, args=(self._split_pages, pages), name="indexing-split")]
+        threads.extend(
+            threading.Thread(target=self._run_stage, args=(self._embed_batches,), name=f"indexing-embed-{i}")
+            for i in range(self._embedding_concurrency)
+        )
+        threads.extend(
+            threading.Thread(target=self._run_stage, args=(self._write_batches,), name=f"indexing-write-{i}")
+            for i in range(self._write_concurrency)
+        )
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+
+        if self._error is not None:
+            raise self._error
+
+    def _run_stage(self, target: Callable[..., None], *args: Any) -> None:
+        try:
+            target(*args)
+        except PipelineStoppedError:
+            pass
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            self._stopped.set()
+
+    def _split_pages(self, pages: Iterable[Document]) -> None:
+        batch: list[Document] = []
+        for page in pages:
+            self._check_stopped()
+            start = time.perf_counter()
+            documents = self._split(page)
+            self.metrics["split"].record(len(documents), time.perf_counter() - start)
+
+            batch.extend(documents)
+            while len(batch) >= self._batch_size:
+                self._save_batch(batch[: self._batch_size])
+                batch = batch[self._batch_size :]
+        if batch:
+            self._save_batch(batch)
+
+        if self._split_completed:
+            self._split_completed()
+        for _ in range(self._embedding_concurrency):
+            self._put(self._embed_queue, _END)
+
+    def _save_batch(self, batch: list[Document]) -> None:
+        start = time.perf_counter()
+        self._save(batch)
+        self.metrics["save"].record(len(batch), time.perf_counter() - start)
+        self._put(self._embed_queue, batch)
+
+    def _embed_batches(self) -> None:
+        while True:
+            batch = self._get(self._embed_queue)
+            if batch is _END:
+                break
+
+            if self._embedding_semaphore is not None:
+                with self._embedding_semaphore:
+                    start = time.perf_counter()
+                    embeddings = self._embed(batch)
+            else:
+                start = time.perf_counter()
+                embeddings = self._embed(batch)
+            self.metrics["embed"].record(len(batch), time.perf_counter() - start)
+            self._put(self._write_queue, (batch, embeddings))
+
+        # the last embedding worker to finish ends the write stage
+        with self._lock:
+            self._running_embedding_workers -= 1
+            is_last = self._running_embedding_workers == 0
+        if is_last:
+            for _ in range(self._write_concurrency):
+                self._put(self._write_queue, _END)
+
+    def _write_batches(self) -> None:
+        while True:
+            item = self._get(self._write_queue)
+            if item is _END:
+                break
+
+            batch, embeddings = item
+            start = time.perf_counter()
+            self._write(batch, embeddings)
+            self.metrics["write"].record(len(batch), time.perf_counter() - start)
+
+    def _check_stopped(self) -> None:
+        if self._stopped.is_set():
+            raise PipelineStoppedError()
+
+    def _put(self, q: queue.Queue, item: Any) -> None:
+        while True:
+            self._check_stopped()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue) -> Any:
+        while True:
+            self._check_stopped()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
@@ -15,10 +15,13 @@ from sqlalchemy.orm.exc import ObjectDeletedError
 from configs import dify_config
 from core.entities.knowledge_entities import IndexingEstimate, PreviewDetail, QAPreviewDetail
 from core.errors.error import ProviderTokenNotInitError
+from core.helper.token_counter import token_counter
+from core.indexing_pipeline import IndexingPipeline, get_provider_semaphore
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from core.rag.cleaner.clean_processor import CleanProcessor
 from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.docstore.dataset_docstore import DatasetDocumentStore
 from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.index_processor.constant.index_type import IndexType
@@ -69,6 +72,11 @@ class IndexingRunner:
                 # extract
                 text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
 
+                if self._is_pipeline_enabled(dataset, dataset_document):
+                    # transform, save segment and load in concurrent stages
+                    self._run_pipeline(index_processor, dataset, dataset_document, text_docs, processing_rule.to_dict())
+                    continue
+
                 # transform
                 documents = self._transform(
                     index_processor, dataset, text_docs, dataset_document.doc_language, processing_rule.to_dict()
@@ -133,6 +141,11 @@ class IndexingRunner:
             # extract
             text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
 
+            if self._is_pipeline_enabled(dataset, dataset_document):
+                # transform, save segment and load in concurrent stages
+                self._run_pipeline(index_processor, dataset, dataset_document, text_docs, processing_rule.to_dict())
+                return
+
             # transform
             documents = self._transform(
                 index_processor, dataset, text_docs, dataset_document.doc_language, processing_rule.to_dict()
@@ -619,29 +632,174 @@ class IndexingRunner:
             tokens = 0
             if embedding_model_instance:
                 page_content_list = [document.page_content for document in chunk_documents]
-                tokens += sum(embedding_model_instance.get_text_embedding_num_tokens(page_content_list))
+                # the docstore counted the same chunks when saving them, so these counts come from the cache
+                tokens += sum(token_counter.get_text_embedding_num_tokens(embedding_model_instance, page_content_list))
 
             # load index
             index_processor.load(dataset, chunk_documents, with_keywords=False)
 
-            document_ids = [document.metadata["doc_id"] for document in chunk_documents]
-            db.session.query(DocumentSegment).filter(
-                DocumentSegment.document_id == dataset_document.id,
-                DocumentSegment.dataset_id == dataset.id,
-                DocumentSegment.index_node_id.in_(document_ids),
-                DocumentSegment.status == "indexing",
-            ).update(
-                {
-                    DocumentSegment.status: "completed",
-                    DocumentSegment.enabled: True,
-                    DocumentSegment.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
-                }
-            )
-
-            db.session.commit()
+            self._complete_segments(dataset.id, dataset_document.id, chunk_documents)
 
             return tokens
 
+    @staticmethod
+    def _complete_segments(dataset_id: str, document_id: str, documents: list[Document]) -> None:
+        document_ids = [document.metadata["doc_id"] for document in documents if document.metadata]
+        db.session.query(DocumentSegment).filter(
+            DocumentSegment.document_id == document_id,
+            DocumentSegment.dataset_id == dataset_id,
+            DocumentSegment.index_node_id.in_(document_ids),
+            DocumentSegment.status == "indexing",
+        ).update(
+            {
+                DocumentSegment.status: "completed",
+                DocumentSegment.enabled: True,
+                DocumentSegment.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+            }
+        )
+
+        db.session.commit()
+
+    @staticmethod
+    def _is_pipeline_enabled(dataset: Dataset, dataset_document: DatasetDocument) -> bool:
+        # parent-child and QA documents are split or generated from the whole document, not page by page
+        return (
+            dify_config.INDEXING_PIPELINE_ENABLED
+            and dataset.indexing_technique == "high_quality"
+            and bool(dataset.embedding_model_provider)
+            and dataset_document.doc_form == IndexType.PARAGRAPH_INDEX
+        )
+
+    def _run_pipeline(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        text_docs: list[Document],
+        process_rule: dict,
+    ) -> None:
+        """
+        Split, save, embed and write the chunks of a document in concurrent stages, see IndexingPipeline.
+        """
+        flask_app = current_app._get_current_object()  # type: ignore
+        embedding_model_instance = self.model_manager.get_model_instance(
+            tenant_id=dataset.tenant_id,
+            provider=dataset.embedding_model_provider,
+            model_type=ModelType.TEXT_EMBEDDING,
+            model=dataset.embedding_model,
+        )
+        vector = Vector(dataset)
+        doc_store = DatasetDocumentStore(
+            dataset=dataset, user_id=dataset_document.created_by, document_id=dataset_document.id
+        )
+        documents: list[Document] = []
+        token_counts: list[int] = []
+        keyword_threads: list[threading.Thread] = []
+        # vector store clients are not shared between writer threads
+        writer_local = threading.local()
+
+        def split(page: Document) -> list[Document]:
+            with flask_app.app_context():
+                self._check_document_paused_status(dataset_document.id)
+                return index_processor.transform(
+                    [page],
+                    embedding_model_instance=embedding_model_instance,
+                    process_rule=process_rule,
+                    tenant_id=dataset.tenant_id,
+                    doc_language=dataset_document.doc_language,
+                )
+
+        def save(batch: list[Document]) -> None:
+            with flask_app.app_context():
+                doc_store.add_documents(docs=batch, save_child=False)
+                document_ids = [document.metadata["doc_id"] for document in batch if document.metadata]
+                db.session.query(DocumentSegment).filter(
+                    DocumentSegment.document_id == dataset_document.id,
+                    DocumentSegment.dataset_id == dataset.id,
+                    DocumentSegment.index_node_id.in_(document_ids),
+                ).update(
+                    {
+                        DocumentSegment.status: "indexing",
+                        DocumentSegment.indexing_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                    }
+                )
+                db.session.commit()
+            documents.extend(batch)
+
+        def split_completed() -> None:
+            with flask_app.app_context():
+                cur_time = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+                self._update_document_index_status(
+                    document_id=dataset_document.id,
+                    after_indexing_status="indexing",
+                    extra_update_params={
+                        DatasetDocument.cleaning_completed_at: cur_time,
+                        DatasetDocument.splitting_completed_at: cur_time,
+                    },
+                )
+            # the keyword index is built from all chunks at once, while the last batches are embedded
+            keyword_thread = threading.Thread(
+                target=self._process_keyword_index,
+                args=(flask_app, dataset.id, dataset_document.id, documents),
+            )
+            keyword_thread.start()
+            keyword_threads.append(keyword_thread)
+
+        def embed(batch: list[Document]) -> list[list[float]]:
+            with flask_app.app_context():
+                self._check_document_paused_status(dataset_document.id)
+                page_content_list = [document.page_content for document in batch]
+                token_counts.append(
+                    sum(token_counter.get_text_embedding_num_tokens(embedding_model_instance, page_content_list))
+                )
+                return vector.embed_documents(batch)
+
+        def write(batch: list[Document], embeddings: list[list[float]]) -> None:
+            with flask_app.app_context():
+                if not hasattr(writer_local, "vector"):
+                    writer_local.vector = Vector(dataset)
+                writer_local.vector.create_with_embeddings(batch, embeddings)
+                self._complete_segments(dataset.id, dataset_document.id, batch)
+
+        pipeline = IndexingPipeline(
+            split=split,
+            save=save,
+            embed=embed,
+            write=write,
+            batch_size=dify_config.INDEXING_PIPELINE_BATCH_SIZE,
+            queue_size=dify_config.INDEXING_PIPELINE_QUEUE_SIZE,
+            embedding_concurrency=dify_config.INDEXING_PIPELINE_EMBEDDING_CONCURRENCY,
+            write_concurrency=dify_config.INDEXING_PIPELINE_WRITE_CONCURRENCY,
+            embedding_semaphore=get_provider_semaphore(
+                dataset.embedding_model_provider, dify_config.INDEXING_PIPELINE_EMBEDDING_CONCURRENCY
+            ),
+            split_completed=split_completed,
+        )
+        try:
+            pipeline.run(text_docs)
+        finally:
+            for keyword_thread in keyword_threads:
+                keyword_thread.join()
+
+        logging.info(
+            "Indexed document %s in %.2fs: %s",
+            dataset_document.id,
+            pipeline.elapsed,
+            "; ".join(str(metrics) for metrics in pipeline.metrics.values()),
+        )
+
+        # update document status to completed
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="completed",
+            extra_update_params={
+                DatasetDocument.tokens: sum(token_counts),
+                DatasetDocument.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                DatasetDocument.indexing_latency: pipeline.elapsed,
+                DatasetDocument.error: None,
+            },
+        )
+
     @staticmethod
     def _check_document_paused_status(document_id: str):
         indexing_cache_key = "document_{}_is_paused".format(document_id)
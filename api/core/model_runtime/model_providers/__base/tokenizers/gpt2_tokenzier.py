@@ -30,6 +30,10 @@ class GPT2Tokenizer:
     @staticmethod
     def get_encoder() -> Any:
         global _tokenizer, _lock
+        # the encoder never changes once loaded, only its initialization needs the lock
+        if _tokenizer is not None:
+            return _tokenizer
+
         with _lock:
             if _tokenizer is None:
                 # Try to use tiktoken to get the tokenizer because it is faster
@@ -5,6 +5,7 @@ from controllers.service_api.wraps import create_or_update_end_user_for_user_id
 from core.app.app_config.common.parameters_mapping import get_parameters_from_feature_dict
 from core.app.apps.advanced_chat.app_generator import AdvancedChatAppGenerator
 from core.app.apps.agent_chat.app_generator import AgentChatAppGenerator
+from core.app.apps.app_generate_worker_pool import nested_app_generation
 from core.app.apps.chat.app_generator import ChatAppGenerator
 from core.app.apps.completion.app_generator import CompletionAppGenerator
 from core.app.apps.workflow.app_generator import WorkflowAppGenerator
@@ -67,15 +68,17 @@ class PluginAppBackwardsInvocation(BaseBackwardsInvocation):
 
         conversation_id = conversation_id or ""
 
-        if app.mode in {AppMode.ADVANCED_CHAT.value, AppMode.AGENT_CHAT.value, AppMode.CHAT.value}:
-            if not query:
-                raise ValueError("missing query")
-
-            return cls.invoke_chat_app(app, user, conversation_id, query, stream, inputs, files)
-        elif app.mode == AppMode.WORKFLOW.value:
-            return cls.invoke_workflow_app(app, user, stream, inputs, files)
-        elif app.mode == AppMode.COMPLETION:
-            return cls.invoke_completion_app(app, user, stream, inputs, files)
+        # the plugin may be serving a generation that holds a worker of the pool while it waits for this one
+        with nested_app_generation():
+            if app.mode in {AppMode.ADVANCED_CHAT.value, AppMode.AGENT_CHAT.value, AppMode.CHAT.value}:
+                if not query:
+                    raise ValueError("missing query")
+
+                return cls.invoke_chat_app(app, user, conversation_id, query, stream, inputs, files)
+            elif app.mode == AppMode.WORKFLOW.value:
+                return cls.invoke_workflow_app(app, user, stream, inputs, files)
+            elif app.mode == AppMode.COMPLETION:
+                return cls.invoke_completion_app(app, user, stream, inputs, files)
 
         raise ValueError("unexpected app type")
 
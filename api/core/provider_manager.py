@@ -22,6 +22,7 @@ from core.entities.provider_entities import (
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
 from core.helper.position_helper import is_filtered
+from core.helper.provider_configurations_cache import provider_configurations_cache
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
     ConfigurateMethod,
@@ -248,7 +249,10 @@ class ProviderManager:
         :param model_type: model type
         :return:
         """
-        provider_configurations = self.get_configurations(tenant_id)
+        # model invocations only read the configurations, so they share the cached ones of the workspace
+        provider_configurations = provider_configurations_cache.get_or_load(
+            tenant_id, lambda: self.get_configurations(tenant_id)
+        )
 
         # get provider instance
         provider_configuration = provider_configurations.get(provider)
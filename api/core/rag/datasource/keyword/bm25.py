@@ -0,0 +1,45 @@
+from collections.abc import Mapping, Sequence
+from typing import Any, TypeVar
+
+import numpy as np
+from pydantic import BaseModel
+
+K = TypeVar("K")
+
+
+class BM25Statistics(BaseModel):
+    """Corpus statistics BM25 needs, maintained per dataset while indexing."""
+
+    document_count: int
+    average_document_length: float
+    document_frequencies: dict[str, int]
+
+
+class BM25:
+    """Okapi BM25 scoring over precomputed statistics, so candidate chunks never have to be re-tokenized."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+    def idf(self, statistics: BM25Statistics, keywords: Sequence[str]) -> np.ndarray:
+        document_frequencies = np.array(
+            [statistics.document_frequencies.get(keyword, 0) for keyword in keywords], dtype=np.float64
+        )
+        return np.log1p((statistics.document_count - document_frequencies + 0.5) / (document_frequencies + 0.5))
+
+    def term_weight(self, idf: Any, term_frequency: Any, document_length: Any, average_document_length: float) -> Any:
+        """
+        Weight of a keyword in a chunk, from numbers or SQL column expressions alike, so the database can sum
+        and rank the scores without sending the postings back.
+        """
+        length_norm = self.k1 * (1 - self.b + self.b * document_length / (average_document_length or 1.0))
+        return idf * term_frequency * (self.k1 + 1) / (term_frequency + length_norm)
+
+    @staticmethod
+    def normalize(scores: Mapping[K, float]) -> dict[K, float]:
+        """Scale scores into [0, 1] by the best score, so they can be weighted against cosine similarities."""
+        max_score = max(scores.values(), default=0.0)
+        if max_score <= 0:
+            return dict.fromkeys(scores, 0.0)
+        return {key: score / max_score for key, score in scores.items()}
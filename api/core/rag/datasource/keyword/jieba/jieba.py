@@ -13,11 +13,29 @@ from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
 from models.dataset import Dataset, DatasetKeywordTable, DocumentSegment
 
+SEGMENT_KEYWORDS_BATCH_SIZE = 1000
+
 
 class KeywordTableConfig(BaseModel):
     max_keywords_per_chunk: int = 10
 
 
+def update_segments_keywords(dataset_id: str, segment_keywords: dict[str, list[str]]) -> None:
+    """Set the keywords of many segments with one query per batch, the caller commits."""
+    node_ids = list(segment_keywords.keys())
+    for i in range(0, len(node_ids), SEGMENT_KEYWORDS_BATCH_SIZE):
+        document_segments = (
+            db.session.query(DocumentSegment)
+            .filter(
+                DocumentSegment.dataset_id == dataset_id,
+                DocumentSegment.index_node_id.in_(node_ids[i : i + SEGMENT_KEYWORDS_BATCH_SIZE]),
+            )
+            .all()
+        )
+        for document_segment in document_segments:
+            document_segment.keywords = segment_keywords[document_segment.index_node_id]
+
+
 class Jieba(BaseKeyword):
     def __init__(self, dataset: Dataset):
         super().__init__(dataset)
@@ -28,16 +46,20 @@ class Jieba(BaseKeyword):
         with redis_client.lock(lock_name, timeout=600):
             keyword_table_handler = JiebaKeywordTableHandler()
             keyword_table = self._get_dataset_keyword_table()
+            segment_keywords = {}
             for text in texts:
                 keywords = keyword_table_handler.extract_keywords(
                     text.page_content, self._config.max_keywords_per_chunk
                 )
                 if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                    segment_keywords[text.metadata["doc_id"]] = list(keywords)
                     keyword_table = self._add_text_to_keyword_table(
                         keyword_table or {}, text.metadata["doc_id"], list(keywords)
                     )
 
+            update_segments_keywords(self.dataset.id, segment_keywords)
+            if segment_keywords:
+                db.session.commit()
             self._save_dataset_keyword_table(keyword_table)
 
             return self
@@ -49,6 +71,7 @@ class Jieba(BaseKeyword):
 
             keyword_table = self._get_dataset_keyword_table()
             keywords_list = kwargs.get("keywords_list")
+            segment_keywords = {}
             for i in range(len(texts)):
                 text = texts[i]
                 if keywords_list:
@@ -62,11 +85,14 @@ class Jieba(BaseKeyword):
                         text.page_content, self._config.max_keywords_per_chunk
                     )
                 if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                    segment_keywords[text.metadata["doc_id"]] = list(keywords)
                     keyword_table = self._add_text_to_keyword_table(
                         keyword_table or {}, text.metadata["doc_id"], list(keywords)
                     )
 
+            update_segments_keywords(self.dataset.id, segment_keywords)
+            if segment_keywords:
+                db.session.commit()
             self._save_dataset_keyword_table(keyword_table)
 
     def text_exists(self, id: str) -> bool:
@@ -91,14 +117,19 @@ class Jieba(BaseKeyword):
         document_ids_filter = kwargs.get("document_ids_filter")
         sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table or {}, query, k)
 
+        if not sorted_chunk_indices:
+            return []
+
+        segment_query = db.session.query(DocumentSegment).filter(
+            DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id.in_(sorted_chunk_indices)
+        )
+        if document_ids_filter:
+            segment_query = segment_query.filter(DocumentSegment.document_id.in_(document_ids_filter))
+        segment_map = {segment.index_node_id: segment for segment in segment_query.all()}
+
         documents = []
         for chunk_index in sorted_chunk_indices:
-            segment_query = db.session.query(DocumentSegment).filter(
-                DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id == chunk_index
-            )
-            if document_ids_filter:
-                segment_query = segment_query.filter(DocumentSegment.document_id.in_(document_ids_filter))
-            segment = segment_query.first()
+            segment = segment_map.get(chunk_index)
 
             if segment:
                 documents.append(
@@ -211,20 +242,10 @@ class Jieba(BaseKeyword):
 
         return sorted_chunk_indices[:k]
 
-    def _update_segment_keywords(self, dataset_id: str, node_id: str, keywords: list[str]):
-        document_segment = (
-            db.session.query(DocumentSegment)
-            .filter(DocumentSegment.dataset_id == dataset_id, DocumentSegment.index_node_id == node_id)
-            .first()
-        )
-        if document_segment:
-            document_segment.keywords = keywords
-            db.session.add(document_segment)
-            db.session.commit()
-
     def create_segment_keywords(self, node_id: str, keywords: list[str]):
         keyword_table = self._get_dataset_keyword_table()
-        self._update_segment_keywords(self.dataset.id, node_id, keywords)
+        update_segments_keywords(self.dataset.id, {node_id: keywords})
+        db.session.commit()
         keyword_table = self._add_text_to_keyword_table(keyword_table or {}, node_id, keywords)
         self._save_dataset_keyword_table(keyword_table)
 
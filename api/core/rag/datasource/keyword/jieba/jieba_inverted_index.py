@@ -0,0 +1,395 @@
+from collections import Counter
+from typing import Any, Optional
+
+from sqlalchemy import Float, case, cast, delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from core.rag.datasource.keyword.bm25 import BM25, BM25Statistics
+from core.rag.datasource.keyword.jieba.jieba import Jieba, KeywordTableConfig, update_segments_keywords
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_base import BaseKeyword
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.dataset import (
+    Dataset,
+    DatasetKeywordFrequency,
+    DatasetKeywordPosting,
+    DatasetKeywordStatistics,
+    DocumentSegment,
+)
+
+POSTING_BATCH_SIZE = 1000
+
+
+class JiebaInvertedIndex(BaseKeyword):
+    """
+    Jieba keyword index stored as one posting row per (keyword, segment) instead of a single JSON keyword table.
+    Searches only read the postings of the query keywords and writes only touch the affected rows,
+    so no dataset-wide lock or full table rewrite is needed.
+    Postings carry term frequencies and segment lengths, and per-dataset BM25 statistics and per-keyword
+    document frequencies are kept up to date on every write, so ranking never re-tokenizes the stored segments
+    and the database sums and ranks the scores itself.
+    """
+
+    def __init__(self, dataset: Dataset):
+        super().__init__(dataset)
+        self._config = KeywordTableConfig()
+
+    def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
+        self.add_texts(texts, **kwargs)
+        return self
+
+    def add_texts(self, texts: list[Document], **kwargs):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_list = kwargs.get("keywords_list")
+        node_keywords: dict[str, list[str]] = {}
+        node_contents: dict[str, str] = {}
+        for i, text in enumerate(texts):
+            if text.metadata is None:
+                continue
+            keywords = keywords_list[i] if keywords_list else None
+            if not keywords:
+                keywords = keyword_table_handler.extract_keywords(
+                    text.page_content, self._config.max_keywords_per_chunk
+                )
+            node_keywords[text.metadata["doc_id"]] = list(keywords)
+            node_contents[text.metadata["doc_id"]] = text.page_content
+
+        update_segments_keywords(self.dataset.id, node_keywords)
+        # re-adding a segment replaces its postings, so the statistics never count it twice
+        self._delete_postings(list(node_keywords.keys()))
+        self._add_postings(node_keywords, node_contents)
+        db.session.commit()
+
+    def text_exists(self, id: str) -> bool:
+        posting = (
+            db.session.query(DatasetKeywordPosting.id)
+            .filter(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id == id)
+            .first()
+        )
+        return posting is not None
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        self._delete_postings(ids)
+        db.session.commit()
+
+    def delete(self) -> None:
+        db.session.query(DatasetKeywordPosting).filter(DatasetKeywordPosting.dataset_id == self.dataset.id).delete(
+            synchronize_session=False
+        )
+        db.session.query(DatasetKeywordStatistics).filter(
+            DatasetKeywordStatistics.dataset_id == self.dataset.id
+        ).delete(synchronize_session=False)
+        db.session.query(DatasetKeywordFrequency).filter(DatasetKeywordFrequency.dataset_id == self.dataset.id).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    def search(self, query: str, **kwargs: Any) -> list[Document]:
+        k = kwargs.get("top_k", 4)
+        document_ids_filter = kwargs.get("document_ids_filter")
+        sorted_chunk_indices = self._retrieve_ids_by_query(query, k, document_ids_filter)
+        if not sorted_chunk_indices:
+            return []
+
+        segments = (
+            db.session.query(DocumentSegment)
+            .filter(
+                DocumentSegment.dataset_id == self.dataset.id,
+                DocumentSegment.index_node_id.in_(sorted_chunk_indices),
+            )
+            .all()
+        )
+        segment_map = {segment.index_node_id: segment for segment in segments}
+
+        documents = []
+        for chunk_index in sorted_chunk_indices:
+            segment = segment_map.get(chunk_index)
+            if segment:
+                documents.append(
+                    Document(
+                        page_content=segment.content,
+                        metadata={
+                            "doc_id": chunk_index,
+                            "doc_hash": segment.index_node_hash,
+                            "document_id": segment.document_id,
+                            "dataset_id": segment.dataset_id,
+                        },
+                    )
+                )
+
+        return documents
+
+    def migrate_from_keyword_table(self) -> int:
+        """
+        Copy the dataset's legacy JSON keyword table into postings. The table itself is kept, so the dataset
+        still works with the jieba keyword store until it is dropped with drop_keyword_table().
+        Returns the number of postings written.
+        """
+        lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
+        with redis_client.lock(lock_name, timeout=600):
+            dataset_keyword_table = self.dataset.dataset_keyword_table
+            if not dataset_keyword_table:
+                return 0
+            keyword_table_dict = dataset_keyword_table.keyword_table_dict
+            keyword_table = keyword_table_dict["__data__"]["table"] if keyword_table_dict else {}
+
+            node_keywords: dict[str, list[str]] = {}
+            for keyword, node_ids in keyword_table.items():
+                for node_id in node_ids:
+                    node_keywords.setdefault(node_id, []).append(keyword)
+
+            # term frequencies and lengths were never stored in the keyword table, recompute them from the segments
+            node_ids = list(node_keywords.keys())
+            node_contents: dict[str, str] = {}
+            for i in range(0, len(node_ids), POSTING_BATCH_SIZE):
+                segments = (
+                    db.session.query(DocumentSegment.index_node_id, DocumentSegment.content)
+                    .filter(
+                        DocumentSegment.dataset_id == self.dataset.id,
+                        DocumentSegment.index_node_id.in_(node_ids[i : i + POSTING_BATCH_SIZE]),
+                    )
+                    .all()
+                )
+                node_contents.update({segment.index_node_id: segment.content for segment in segments})
+
+            self._delete_postings(node_ids)
+            posting_count = self._add_postings(node_keywords, node_contents)
+            db.session.commit()
+
+        return posting_count
+
+    def drop_keyword_table(self) -> bool:
+        """
+        Drop the dataset's legacy JSON keyword table once it has been migrated.
+        Returns False, keeping the table, if it still holds keywords but the dataset has no postings.
+        """
+        dataset_keyword_table = self.dataset.dataset_keyword_table
+        if not dataset_keyword_table:
+            return True
+        keyword_table_dict = dataset_keyword_table.keyword_table_dict
+        if keyword_table_dict and keyword_table_dict["__data__"]["table"]:
+            posting = (
+                db.session.query(DatasetKeywordPosting.id)
+                .filter(DatasetKeywordPosting.dataset_id == self.dataset.id)
+                .first()
+            )
+            if posting is None:
+                return False
+
+        Jieba(self.dataset).delete()
+        return True
+
+    @staticmethod
+    def get_bm25_scores(
+        dataset_id: str,
+        query_keywords: list[str],
+        node_ids: Optional[list[str]] = None,
+        document_ids_filter: Optional[list[str]] = None,
+        top_k: Optional[int] = None,
+    ) -> dict[str, float]:
+        """
+        Score the dataset's chunks against the query keywords with BM25, summed and ranked by the database
+        :param dataset_id: dataset id
+        :param query_keywords: keywords extracted from the query
+        :param node_ids: only score these chunks
+        :param document_ids_filter: only score chunks of these documents
+        :param top_k: only return the best scored chunks
+
+        :return: BM25 score of every chunk matching at least one keyword, keyed by node id, best first
+        """
+        if not query_keywords:
+            return {}
+        statistics = JiebaInvertedIndex._get_bm25_statistics(dataset_id, query_keywords)
+        keywords = list(statistics.document_frequencies)
+        if not statistics.document_count or not keywords:
+            return {}
+
+        bm25 = BM25()
+        idf = case(
+            dict(zip(keywords, bm25.idf(statistics, keywords).tolist())),
+            value=DatasetKeywordPosting.keyword,
+            else_=0.0,
+        )
+        score = func.sum(
+            bm25.term_weight(
+                idf,
+                cast(DatasetKeywordPosting.term_frequency, Float),
+                cast(DatasetKeywordPosting.document_length, Float),
+                statistics.average_document_length,
+            )
+        ).label("score")
+        score_query = db.session.query(DatasetKeywordPosting.index_node_id, score).filter(
+            DatasetKeywordPosting.dataset_id == dataset_id,
+            DatasetKeywordPosting.keyword.in_(keywords),
+        )
+        if node_ids is not None:
+            score_query = score_query.filter(DatasetKeywordPosting.index_node_id.in_(node_ids))
+        if document_ids_filter:
+            score_query = score_query.join(
+                DocumentSegment,
+                (DocumentSegment.dataset_id == DatasetKeywordPosting.dataset_id)
+                & (DocumentSegment.index_node_id == DatasetKeywordPosting.index_node_id),
+            ).filter(DocumentSegment.document_id.in_(document_ids_filter))
+        score_query = score_query.group_by(DatasetKeywordPosting.index_node_id).order_by(
+            score.desc(), DatasetKeywordPosting.index_node_id
+        )
+        if top_k is not None:
+            score_query = score_query.limit(top_k)
+
+        return dict(score_query.all())
+
+    @staticmethod
+    def get_indexed_node_ids(dataset_id: str, node_ids: list[str]) -> set[str]:
+        """
+        Return the chunks among node_ids that have postings in the dataset's keyword index.
+        """
+        indexed_node_ids: set[str] = set()
+        for i in range(0, len(node_ids), POSTING_BATCH_SIZE):
+            rows = (
+                db.session.query(DatasetKeywordPosting.index_node_id)
+                .filter(
+                    DatasetKeywordPosting.dataset_id == dataset_id,
+                    DatasetKeywordPosting.index_node_id.in_(node_ids[i : i + POSTING_BATCH_SIZE]),
+                )
+                .distinct()
+                .all()
+            )
+            indexed_node_ids.update(row.index_node_id for row in rows)
+        return indexed_node_ids
+
+    @staticmethod
+    def _get_bm25_statistics(dataset_id: str, keywords: list[str]) -> BM25Statistics:
+        dataset_statistics = (
+            db.session.query(DatasetKeywordStatistics).filter(DatasetKeywordStatistics.dataset_id == dataset_id).first()
+        )
+        document_frequencies = (
+            db.session.query(DatasetKeywordFrequency.keyword, DatasetKeywordFrequency.document_frequency)
+            .filter(
+                DatasetKeywordFrequency.dataset_id == dataset_id,
+                DatasetKeywordFrequency.keyword.in_(keywords),
+                DatasetKeywordFrequency.document_frequency > 0,
+            )
+            .all()
+        )
+        return BM25Statistics(
+            document_count=dataset_statistics.document_count if dataset_statistics else 0,
+            average_document_length=dataset_statistics.average_document_length if dataset_statistics else 0.0,
+            document_frequencies=dict(document_frequencies),
+        )
+
+    def _retrieve_ids_by_query(self, query: str, k: int = 4, document_ids_filter: Optional[list[str]] = None):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = list(keyword_table_handler.extract_keywords(query))
+
+        scores = self.get_bm25_scores(self.dataset.id, keywords, document_ids_filter=document_ids_filter, top_k=k)
+        return list(scores.keys())
+
+    def _add_postings(self, node_keywords: dict[str, list[str]], node_contents: dict[str, str]) -> int:
+        keyword_table_handler = JiebaKeywordTableHandler()
+        rows = []
+        document_count = 0
+        total_document_length = 0
+        for node_id, keywords in node_keywords.items():
+            keywords = [keyword for keyword in set(keywords) if len(keyword) <= 255]
+            if not keywords:
+                continue
+            term_counts, document_length = keyword_table_handler.count_term_frequencies(node_contents.get(node_id, ""))
+            document_count += 1
+            total_document_length += document_length
+            rows.extend(
+                {
+                    "dataset_id": self.dataset.id,
+                    "keyword": keyword,
+                    "index_node_id": node_id,
+                    "term_frequency": max(term_counts.get(keyword, 0), 1),
+                    "document_length": document_length,
+                }
+                for keyword in keywords
+            )
+
+        document_frequency_deltas: Counter[str] = Counter()
+        for i in range(0, len(rows), POSTING_BATCH_SIZE):
+            stmt = (
+                insert(DatasetKeywordPosting)
+                .values(rows[i : i + POSTING_BATCH_SIZE])
+                .on_conflict_do_nothing(index_elements=["dataset_id", "keyword", "index_node_id"])
+                .returning(DatasetKeywordPosting.keyword)
+            )
+            document_frequency_deltas.update(keyword for (keyword,) in db.session.execute(stmt))
+        self._update_statistics(document_count, total_document_length)
+        self._update_document_frequencies(document_frequency_deltas)
+        return len(rows)
+
+    def _delete_postings(self, node_ids: list[str]) -> None:
+        document_lengths: dict[str, int] = {}
+        document_frequency_deltas: Counter[str] = Counter()
+        for i in range(0, len(node_ids), POSTING_BATCH_SIZE):
+            stmt = (
+                delete(DatasetKeywordPosting)
+                .where(
+                    DatasetKeywordPosting.dataset_id == self.dataset.id,
+                    DatasetKeywordPosting.index_node_id.in_(node_ids[i : i + POSTING_BATCH_SIZE]),
+                )
+                .returning(
+                    DatasetKeywordPosting.keyword,
+                    DatasetKeywordPosting.index_node_id,
+                    DatasetKeywordPosting.document_length,
+                )
+            )
+            for keyword, node_id, document_length in db.session.execute(stmt):
+                document_lengths[node_id] = document_length
+                document_frequency_deltas[keyword] -= 1
+        self._update_statistics(-len(document_lengths), -sum(document_lengths.values()))
+        self._update_document_frequencies(document_frequency_deltas)
+
+    def _update_statistics(self, document_count_delta: int, document_length_delta: int) -> None:
+        if not document_count_delta and not document_length_delta:
+            return
+        stmt = insert(DatasetKeywordStatistics).values(
+            dataset_id=self.dataset.id,
+            document_count=max(document_count_delta, 0),
+            total_document_length=max(document_length_delta, 0),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["dataset_id"],
+            set_={
+                "document_count": DatasetKeywordStatistics.document_count + document_count_delta,
+                "total_document_length": DatasetKeywordStatistics.total_document_length + document_length_delta,
+                "updated_at": func.current_timestamp(),
+            },
+        )
+        db.session.execute(stmt)
+
+    def _update_document_frequencies(self, document_frequency_deltas: Counter[str]) -> None:
+        # keywords are upserted in the same order by every writer, so concurrent writes can't deadlock
+        keywords = sorted(keyword for keyword, delta in document_frequency_deltas.items() if delta)
+        for i in range(0, len(keywords), POSTING_BATCH_SIZE):
+            stmt = insert(DatasetKeywordFrequency).values(
+                [
+                    {
+                        "dataset_id": self.dataset.id,
+                        "keyword": keyword,
+                        "document_frequency": document_frequency_deltas[keyword],
+                    }
+                    for keyword in keywords[i : i + POSTING_BATCH_SIZE]
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["dataset_id", "keyword"],
+                set_={
+                    "document_frequency": DatasetKeywordFrequency.document_frequency + stmt.excluded.document_frequency
+                },
+            )
+            db.session.execute(stmt)
+
+        removed_keywords = [keyword for keyword in keywords if document_frequency_deltas[keyword] < 0]
+        for i in range(0, len(removed_keywords), POSTING_BATCH_SIZE):
+            db.session.query(DatasetKeywordFrequency).filter(
+                DatasetKeywordFrequency.dataset_id == self.dataset.id,
+                DatasetKeywordFrequency.keyword.in_(removed_keywords[i : i + POSTING_BATCH_SIZE]),
+                DatasetKeywordFrequency.document_frequency <= 0,
+            ).delete(synchronize_session=False)
@@ -1,4 +1,5 @@
 import re
+from collections import Counter
 from typing import Optional, cast
 
 
@@ -23,6 +24,13 @@ class JiebaKeywordTableHandler:
 
         return set(self._expand_tokens_with_subtokens(set(keywords)))
 
+    def count_term_frequencies(self, text: str) -> tuple[Counter[str], int]:
+        """Tokenize text with JIEBA, return the count of every token and the text length in tokens."""
+        import jieba  # type: ignore
+
+        tokens = [token for token in jieba.lcut(text) if token.strip()]
+        return Counter(tokens), len(tokens)
+
     def _expand_tokens_with_subtokens(self, tokens: set[str]) -> set[str]:
         """Get subtokens from a list of tokens., filtering for stopwords."""
         from core.rag.datasource.keyword.jieba.stopwords import STOPWORDS
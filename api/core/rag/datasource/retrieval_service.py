@@ -3,6 +3,7 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from flask import Flask, current_app
+from sqlalchemy import or_
 from sqlalchemy.orm import load_only
 
 from configs import dify_config
@@ -284,11 +285,49 @@ class RetrievalService:
                 .all()
             }
 
+            # Collect the index node ids of child chunks and of normal segments
+            child_index_node_ids = set()
+            index_node_ids = set()
+            for document in documents:
+                dataset_document = dataset_documents.get(document.metadata.get("document_id"))
+                if not dataset_document or not document.metadata.get("doc_id"):
+                    continue
+                if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+                    child_index_node_ids.add(document.metadata["doc_id"])
+                else:
+                    index_node_ids.add(document.metadata["doc_id"])
+
+            # Batch query child chunks
+            child_chunks = {}
+            if child_index_node_ids:
+                child_chunks = {
+                    child_chunk.index_node_id: child_chunk
+                    for child_chunk in db.session.query(ChildChunk)
+                    .filter(ChildChunk.index_node_id.in_(child_index_node_ids))
+                    .all()
+                }
+
+            # Batch query the segments of both child chunks and normal documents
+            segment_ids = {child_chunk.segment_id for child_chunk in child_chunks.values()}
+            segments_by_id = {}
+            segments_by_node = {}
+            if segment_ids or index_node_ids:
+                dataset_ids = {doc.dataset_id for doc in dataset_documents.values()}
+                segment_query = db.session.query(DocumentSegment).filter(
+                    DocumentSegment.dataset_id.in_(dataset_ids),
+                    DocumentSegment.enabled == True,
+                    DocumentSegment.status == "completed",
+                    or_(DocumentSegment.id.in_(segment_ids), DocumentSegment.index_node_id.in_(index_node_ids)),
+                )
+                for segment in segment_query.all():
+                    segments_by_id[segment.id] = segment
+                    segments_by_node[(segment.dataset_id, segment.index_node_id)] = segment
+
             records = []
             include_segment_ids = set()
             segment_child_map = {}
 
-            # Process documents
+            # Process documents in score order
             for document in documents:
                 document_id = document.metadata.get("document_id")
                 if document_id not in dataset_documents:
@@ -302,32 +341,14 @@ class RetrievalService:
                     # Handle parent-child documents
                     child_index_node_id = document.metadata.get("doc_id")
 
-                    child_chunk = (
-                        db.session.query(ChildChunk).filter(ChildChunk.index_node_id == child_index_node_id).first()
-                    )
+                    child_chunk = child_chunks.get(child_index_node_id)
 
                     if not child_chunk:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .filter(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.id == child_chunk.segment_id,
-                        )
-                        .options(
-                            load_only(
-                                DocumentSegment.id,
-                                DocumentSegment.content,
-                                DocumentSegment.answer,
-                            )
-                        )
-                        .first()
-                    )
+                    segment = segments_by_id.get(child_chunk.segment_id)
 
-                    if not segment:
+                    if not segment or segment.dataset_id != dataset_document.dataset_id:
                         continue
 
                     if segment.id not in include_segment_ids:
@@ -364,16 +385,7 @@ class RetrievalService:
                     if not index_node_id:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .filter(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.index_node_id == index_node_id,
-                        )
-                        .first()
-                    )
+                    segment = segments_by_node.get((dataset_document.dataset_id, index_node_id))
 
                     if not segment:
                         continue
@@ -169,8 +169,14 @@ class Vector:
 
     def create(self, texts: Optional[list] = None, **kwargs):
         if texts:
-            embeddings = self._embeddings.embed_documents([document.page_content for document in texts])
-            self._vector_processor.create(texts=texts, embeddings=embeddings, **kwargs)
+            embeddings = self.embed_documents(texts)
+            self.create_with_embeddings(texts, embeddings, **kwargs)
+
+    def embed_documents(self, texts: list[Document]) -> list[list[float]]:
+        return self._embeddings.embed_documents([document.page_content for document in texts])
+
+    def create_with_embeddings(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
+        self._vector_processor.create(texts=texts, embeddings=embeddings, **kwargs)
 
     def add_texts(self, documents: list[Document], **kwargs):
         if kwargs.get("duplicate_check", False):
@@ -1,8 +1,11 @@
 from collections.abc import Sequence
 from typing import Any, Optional
+from uuid import uuid4
 
 from sqlalchemy import func
 
+from configs import dify_config
+from core.helper.token_counter import token_counter
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from core.rag.models.document import Document
@@ -61,6 +64,10 @@ class DatasetDocumentStore:
         return output
 
     def add_documents(self, docs: Sequence[Document], allow_update: bool = True, save_child: bool = False) -> None:
+        if dify_config.DATASET_DOCSTORE_BULK_INSERT_ENABLED:
+            self._bulk_add_documents(docs, allow_update=allow_update, save_child=save_child)
+            return
+
         max_position = (
             db.session.query(func.max(DocumentSegment.position))
             .filter(DocumentSegment.document_id == self._document_id)
@@ -69,21 +76,7 @@ class DatasetDocumentStore:
 
         if max_position is None:
             max_position = 0
-        embedding_model = None
-        if self._dataset.indexing_technique == "high_quality":
-            model_manager = ModelManager()
-            embedding_model = model_manager.get_model_instance(
-                tenant_id=self._dataset.tenant_id,
-                provider=self._dataset.embedding_model_provider,
-                model_type=ModelType.TEXT_EMBEDDING,
-                model=self._dataset.embedding_model,
-            )
-
-        if embedding_model:
-            page_content_list = [doc.page_content for doc in docs]
-            tokens_list = embedding_model.get_text_embedding_num_tokens(page_content_list)
-        else:
-            tokens_list = [0] * len(docs)
+        tokens_list = self._get_tokens_list(docs)
 
         for doc, tokens in zip(docs, tokens_list):
             if not isinstance(doc, Document):
@@ -172,6 +165,146 @@ class DatasetDocumentStore:
 
             db.session.commit()
 
+    def _bulk_add_documents(self, docs: Sequence[Document], allow_update: bool, save_child: bool) -> None:
+        """
+        Same as the per document path of add_documents, but prefetches the existing segments of all docs,
+        assigns positions in memory and inserts new segments and child chunks in batches, in one transaction.
+        """
+        batch_size = dify_config.DATASET_DOCSTORE_BULK_INSERT_BATCH_SIZE
+        for doc in docs:
+            if not isinstance(doc, Document):
+                raise ValueError("doc must be a Document")
+
+            if doc.metadata is None:
+                raise ValueError("doc.metadata must be a dict")
+
+        tokens_list = self._get_tokens_list(docs)
+
+        try:
+            max_position = (
+                db.session.query(func.max(DocumentSegment.position))
+                .filter(DocumentSegment.document_id == self._document_id)
+                .scalar()
+            ) or 0
+
+            doc_ids = list(dict.fromkeys(doc.metadata["doc_id"] for doc in docs))
+            existing_segments: dict[str, DocumentSegment] = {}
+            for i in range(0, len(doc_ids), batch_size):
+                for segment in (
+                    db.session.query(DocumentSegment)
+                    .filter(
+                        DocumentSegment.dataset_id == self._dataset.id,
+                        DocumentSegment.index_node_id.in_(doc_ids[i : i + batch_size]),
+                    )
+                    .all()
+                ):
+                    existing_segments.setdefault(segment.index_node_id, segment)
+
+            new_segments: dict[str, dict[str, Any]] = {}
+            children: dict[str, list[Document]] = {}
+            for doc, tokens in zip(docs, tokens_list):
+                doc_id = doc.metadata["doc_id"]
+                segment_document = existing_segments.get(doc_id)
+                new_segment = new_segments.get(doc_id)
+
+                # NOTE: doc could already exist in the store, but we overwrite it
+                if not allow_update and (segment_document or new_segment):
+                    raise ValueError(f"doc_id {doc_id} already exists. Set allow_update to True to overwrite.")
+
+                if segment_document:
+                    segment_document.content = doc.page_content
+                    if doc.metadata.get("answer"):
+                        segment_document.answer = doc.metadata.pop("answer", "")
+                    segment_document.index_node_hash = doc.metadata.get("doc_hash")
+                    segment_document.word_count = len(doc.page_content)
+                    segment_document.tokens = tokens
+                    if save_child and doc.children:
+                        children[segment_document.id] = doc.children
+                elif new_segment:
+                    new_segment["content"] = doc.page_content
+                    if doc.metadata.get("answer"):
+                        new_segment["answer"] = doc.metadata.pop("answer", "")
+                    new_segment["index_node_hash"] = doc.metadata.get("doc_hash")
+                    new_segment["word_count"] = len(doc.page_content)
+                    new_segment["tokens"] = tokens
+                    if save_child and doc.children:
+                        children[new_segment["id"]] = doc.children
+                else:
+                    max_position += 1
+                    new_segment = {
+                        "id": str(uuid4()),
+                        "tenant_id": self._dataset.tenant_id,
+                        "dataset_id": self._dataset.id,
+                        "document_id": self._document_id,
+                        "index_node_id": doc_id,
+                        "index_node_hash": doc.metadata["doc_hash"],
+                        "position": max_position,
+                        "content": doc.page_content,
+                        "answer": doc.metadata.pop("answer", "") if doc.metadata.get("answer") else None,
+                        "word_count": len(doc.page_content),
+                        "tokens": tokens,
+                        "enabled": False,
+                        "created_by": self._user_id,
+                    }
+                    new_segments[doc_id] = new_segment
+                    if save_child and doc.children:
+                        children[new_segment["id"]] = doc.children
+
+            segment_mappings = list(new_segments.values())
+            for i in range(0, len(segment_mappings), batch_size):
+                db.session.bulk_insert_mappings(DocumentSegment, segment_mappings[i : i + batch_size])
+
+            # delete the existing child chunks of updated segments
+            updated_segment_ids = [segment.id for segment in existing_segments.values() if segment.id in children]
+            for i in range(0, len(updated_segment_ids), batch_size):
+                db.session.query(ChildChunk).filter(
+                    ChildChunk.tenant_id == self._dataset.tenant_id,
+                    ChildChunk.dataset_id == self._dataset.id,
+                    ChildChunk.document_id == self._document_id,
+                    ChildChunk.segment_id.in_(updated_segment_ids[i : i + batch_size]),
+                ).delete(synchronize_session=False)
+
+            child_mappings = [
+                {
+                    "tenant_id": self._dataset.tenant_id,
+                    "dataset_id": self._dataset.id,
+                    "document_id": self._document_id,
+                    "segment_id": segment_id,
+                    "position": position,
+                    "index_node_id": child.metadata.get("doc_id"),
+                    "index_node_hash": child.metadata.get("doc_hash"),
+                    "content": child.page_content,
+                    "word_count": len(child.page_content),
+                    "type": "automatic",
+                    "created_by": self._user_id,
+                }
+                for segment_id, segment_children in children.items()
+                for position, child in enumerate(segment_children, start=1)
+            ]
+            for i in range(0, len(child_mappings), batch_size):
+                db.session.bulk_insert_mappings(ChildChunk, child_mappings[i : i + batch_size])
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _get_tokens_list(self, docs: Sequence[Document]) -> list[int]:
+        embedding_model = None
+        if self._dataset.indexing_technique == "high_quality":
+            model_manager = ModelManager()
+            embedding_model = model_manager.get_model_instance(
+                tenant_id=self._dataset.tenant_id,
+                provider=self._dataset.embedding_model_provider,
+                model_type=ModelType.TEXT_EMBEDDING,
+                model=self._dataset.embedding_model,
+            )
+
+        if embedding_model:
+            page_content_list = [doc.page_content for doc in docs]
+            return token_counter.get_text_embedding_num_tokens(embedding_model, page_content_list)
+        return [0] * len(docs)
+
     def document_exists(self, doc_id: str) -> bool:
         """Check if document exists."""
         result = self.get_document_segment(doc_id)
@@ -3,10 +3,13 @@ import logging
 from typing import Any, Optional, cast
 
 import numpy as np
-from sqlalchemy.exc import IntegrityError
+from redis.exceptions import LockError
+from sqlalchemy.dialects.postgresql import insert
 
 from configs import dify_config
 from core.entities.embedding_type import EmbeddingInputType
+from core.helper.lru_cache import TTLLRUCache
+from core.helper.single_flight import SingleFlight
 from core.model_manager import ModelInstance
 from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
@@ -18,6 +21,12 @@ from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+# process-local cache in front of the Redis query embedding cache, holding read-only float32 arrays
+query_embedding_l1_cache = TTLLRUCache(
+    capacity=dify_config.EMBEDDING_QUERY_L1_CACHE_SIZE, ttl=dify_config.EMBEDDING_QUERY_L1_CACHE_TTL
+)
+query_embedding_single_flight = SingleFlight()
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
@@ -28,18 +37,12 @@ class CacheEmbedding(Embeddings):
         """Embed search docs in batches of 10."""
         # use doc embedding cache or store if not exists
         text_embeddings: list[Any] = [None for _ in range(len(texts))]
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self._fetch_cached_embeddings(set(text_hashes))
         embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = (
-                db.session.query(Embedding)
-                .filter_by(
-                    model_name=self._model_instance.model, hash=hash, provider_name=self._model_instance.provider
-                )
-                .first()
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+        for i, hash in enumerate(text_hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash]
             else:
                 embedding_queue_indices.append(i)
         if embedding_queue_indices:
@@ -72,27 +75,13 @@ class CacheEmbedding(Embeddings):
                                 logger.warning(f"Normalized embedding is nan: {normalized_embedding}")
                                 continue
                             embedding_queue_embeddings.append(normalized_embedding)
-                        except IntegrityError:
-                            db.session.rollback()
                         except Exception:
                             logging.exception("Failed transform embedding")
-                cache_embeddings = []
-                try:
-                    for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        text_embeddings[i] = n_embedding
-                        hash = helper.generate_text_hash(texts[i])
-                        if hash not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model,
-                                hash=hash,
-                                provider_name=self._model_instance.provider,
-                            )
-                            embedding_cache.set_embedding(n_embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+                new_embeddings: dict[str, list[float]] = {}
+                for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
+                    text_embeddings[i] = n_embedding
+                    new_embeddings.setdefault(text_hashes[i], n_embedding)
+                self._store_cached_embeddings(new_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.exception("Failed to embed documents: %s")
@@ -100,16 +89,105 @@ class CacheEmbedding(Embeddings):
 
         return text_embeddings
 
+    def _fetch_cached_embeddings(self, hashes: set[str]) -> dict[str, list[float]]:
+        """Look up cached document embeddings by text hash, in chunks of EMBEDDING_CACHE_QUERY_BATCH_SIZE."""
+        batch_size = dify_config.EMBEDDING_CACHE_QUERY_BATCH_SIZE
+        hash_list = list(hashes)
+        cached_embeddings: dict[str, list[float]] = {}
+        for i in range(0, len(hash_list), batch_size):
+            embeddings = (
+                db.session.query(Embedding)
+                .filter(
+                    Embedding.model_name == self._model_instance.model,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(hash_list[i : i + batch_size]),
+                )
+                .all()
+            )
+            for embedding in embeddings:
+                cached_embeddings[embedding.hash] = embedding.get_embedding()
+        return cached_embeddings
+
+    def _store_cached_embeddings(self, embeddings: dict[str, list[float]]) -> None:
+        """Bulk insert new document embeddings, skipping hashes another worker has cached meanwhile."""
+        if not embeddings:
+            return
+        batch_size = dify_config.EMBEDDING_CACHE_QUERY_BATCH_SIZE
+        rows = []
+        for hash, n_embedding in embeddings.items():
+            embedding_cache = Embedding(
+                model_name=self._model_instance.model,
+                hash=hash,
+                provider_name=self._model_instance.provider,
+            )
+            embedding_cache.set_embedding(n_embedding, dify_config.EMBEDDING_CACHE_STORAGE_DTYPE)
+            rows.append(
+                {
+                    "model_name": embedding_cache.model_name,
+                    "hash": embedding_cache.hash,
+                    "provider_name": embedding_cache.provider_name,
+                    "embedding": embedding_cache.embedding,
+                }
+            )
+        for i in range(0, len(rows), batch_size):
+            stmt = (
+                insert(Embedding)
+                .values(rows[i : i + batch_size])
+                .on_conflict_do_nothing(index_elements=["model_name", "hash", "provider_name"])
+            )
+            db.session.execute(stmt)
+        db.session.commit()
+
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
         # use doc embedding cache or store if not exists
         hash = helper.generate_text_hash(text)
         embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model}_{hash}"
+        cached_vector = query_embedding_l1_cache.get(embedding_cache_key)
+        if cached_vector is not None:
+            return cast(list[float], cached_vector.tolist())
+        # concurrent misses for the same query share a single embedding invocation
+        embedding_results = query_embedding_single_flight.do(
+            embedding_cache_key, lambda: self._embed_query_uncached(text, embedding_cache_key)
+        )
+        return list(embedding_results)
+
+    def _embed_query_uncached(self, text: str, embedding_cache_key: str) -> list[float]:
+        embedding_results = self._get_redis_query_embedding(embedding_cache_key)
+        if embedding_results is not None:
+            return embedding_results
+        if not dify_config.EMBEDDING_QUERY_SINGLE_FLIGHT_REDIS_LOCK_ENABLED:
+            return self._invoke_query_embedding(text, embedding_cache_key)
+
+        # let only one worker per query call the provider, the others pick its result up from redis
+        lock = redis_client.lock(
+            f"{embedding_cache_key}_single_flight_lock",
+            timeout=60,
+            blocking_timeout=dify_config.EMBEDDING_QUERY_SINGLE_FLIGHT_LOCK_WAIT_TIMEOUT,
+        )
+        acquired = lock.acquire()
+        try:
+            embedding_results = self._get_redis_query_embedding(embedding_cache_key)
+            if embedding_results is not None:
+                return embedding_results
+            return self._invoke_query_embedding(text, embedding_cache_key)
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except LockError:
+                    logger.warning(f"Single flight lock {embedding_cache_key} expired before release")
+
+    def _get_redis_query_embedding(self, embedding_cache_key: str) -> Optional[list[float]]:
         embedding = redis_client.get(embedding_cache_key)
-        if embedding:
-            redis_client.expire(embedding_cache_key, 600)
-            decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
-            return [float(x) for x in decoded_embedding]
+        if not embedding:
+            return None
+        redis_client.expire(embedding_cache_key, 600)
+        decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
+        self._put_query_embedding_l1_cache(embedding_cache_key, decoded_embedding)
+        return cast(list[float], decoded_embedding.tolist())
+
+    def _invoke_query_embedding(self, text: str, embedding_cache_key: str) -> list[float]:
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text], user=self._user, input_type=EmbeddingInputType.QUERY
@@ -138,5 +216,12 @@ class CacheEmbedding(Embeddings):
             if dify_config.DEBUG:
                 logging.exception(f"Failed to add embedding to redis for the text '{text[:10]}...({len(text)} chars)'")
             raise ex
+        self._put_query_embedding_l1_cache(embedding_cache_key, embedding_vector)
 
         return embedding_results
+
+    @staticmethod
+    def _put_query_embedding_l1_cache(key: str, vector: np.ndarray) -> None:
+        l1_vector = vector.astype(np.float32)
+        l1_vector.setflags(write=False)
+        query_embedding_l1_cache.put(key, l1_vector)
@@ -0,0 +1,154 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from configs import dify_config
+from core.rag.datasource.keyword.bm25 import BM25
+from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_type import KeyWordType
+from core.rag.models.document import Document
+
+
+def cosine_similarities(query_vector: Sequence[float], document_vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Calculate the cosine similarity of the query vector with every document vector in one matrix product
+    :param query_vector: query embedding
+    :param document_vectors: document embeddings, all of the query's dimension
+
+    :return: similarities, in document order
+    """
+    if not document_vectors:
+        return np.zeros(0, dtype=np.float64)
+    query = np.asarray(query_vector, dtype=np.float64)
+    matrix = np.asarray(document_vectors, dtype=np.float64)
+    denominators = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarities = (matrix @ query) / denominators
+    return np.nan_to_num(similarities, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def tfidf_similarities(query_keywords: Sequence[str], documents_keywords: Sequence[Sequence[str]]) -> list[float]:
+    """
+    Calculate the TF-IDF cosine similarity of the query with every document, IDF taken over the candidates
+    :param query_keywords: keywords of the query
+    :param documents_keywords: keywords of every document
+
+    :return: similarities, in document order
+    """
+    total_documents = len(documents_keywords)
+    if not total_documents:
+        return []
+
+    # sparse (document, term, count) triples over a shared vocabulary
+    vocabulary: dict[str, int] = {}
+    document_indices = []
+    term_indices = []
+    term_counts = []
+    for document_index, document_keywords in enumerate(documents_keywords):
+        counts: dict[int, int] = {}
+        for keyword in document_keywords:
+            term_index = vocabulary.setdefault(keyword, len(vocabulary))
+            counts[term_index] = counts.get(term_index, 0) + 1
+        document_indices.extend([document_index] * len(counts))
+        term_indices.extend(counts.keys())
+        term_counts.extend(counts.values())
+    if not vocabulary:
+        return [0.0] * total_documents
+
+    rows = np.asarray(document_indices, dtype=np.intp)
+    columns = np.asarray(term_indices, dtype=np.intp)
+    document_tf = np.asarray(term_counts, dtype=np.float64)
+
+    document_frequencies = np.bincount(columns, minlength=len(vocabulary))
+    idf = np.log((1 + total_documents) / (1 + document_frequencies)) + 1
+
+    # keywords that appear in no candidate get no weight, as they have no IDF
+    query_weights = np.zeros(len(vocabulary), dtype=np.float64)
+    for keyword in query_keywords:
+        term_index = vocabulary.get(keyword)
+        if term_index is not None:
+            query_weights[term_index] += 1
+    query_weights *= idf
+
+    document_weights = document_tf * idf[columns]
+    numerators = np.bincount(rows, weights=document_weights * query_weights[columns], minlength=total_documents)
+    document_norms = np.sqrt(np.bincount(rows, weights=document_weights**2, minlength=total_documents))
+    denominators = document_norms * np.linalg.norm(query_weights)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarities = np.where(denominators > 0, numerators / denominators, 0.0)
+    return similarities.tolist()
+
+
+def keyword_scores(query: str, documents: list[Document]) -> list[float]:
+    """
+    Score documents against the query keywords, in [0, 1].
+    Uses BM25 over the precomputed keyword index statistics when the inverted keyword store is enabled
+    and every document belongs to a dataset, otherwise TF-IDF over the candidates' extracted keywords.
+    :param query: search query
+    :param documents: documents to score
+
+    :return: scores, in document order
+    """
+    keyword_table_handler = JiebaKeywordTableHandler()
+    query_keywords = list(keyword_table_handler.extract_keywords(query, None))
+    if dify_config.KEYWORD_STORE == KeyWordType.JIEBA_INVERTED_INDEX and all(
+        document.metadata and document.metadata.get("dataset_id") for document in documents
+    ):
+        return bm25_scores(query_keywords, documents)
+
+    return tfidf_scores(query_keywords, documents)
+
+
+def tfidf_scores(query_keywords: list[str], documents: list[Document]) -> list[float]:
+    """
+    Score documents with TF-IDF over their extracted keywords, IDF taken over the given documents
+    :param query_keywords: keywords extracted from the search query
+    :param documents: documents to score
+
+    :return: scores, in document order
+    """
+    keyword_table_handler = JiebaKeywordTableHandler()
+    documents_keywords = []
+    for document in documents:
+        # get the document keywords
+        document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
+        if document.metadata is not None:
+            document.metadata["keywords"] = document_keywords
+        documents_keywords.append(list(document_keywords))
+
+    return tfidf_similarities(query_keywords, documents_keywords)
+
+
+def bm25_scores(query_keywords: list[str], documents: list[Document]) -> list[float]:
+    """
+    Score documents with BM25 from the keyword index statistics of their datasets, normalized to [0, 1].
+    Datasets whose candidates are not all in the keyword index, such as child chunks of parent-child datasets
+    or datasets not migrated to the inverted index yet, are scored with TF-IDF instead.
+    :param query_keywords: keywords extracted from the search query
+    :param documents: documents to score, all with a dataset_id
+
+    :return: scores, in document order
+    """
+    dataset_indices: dict[str, list[int]] = {}
+    for i, document in enumerate(documents):
+        if document.metadata is not None:
+            dataset_indices.setdefault(document.metadata["dataset_id"], []).append(i)
+
+    scores = [0.0] * len(documents)
+    bm25_document_scores: dict[int, float] = {}
+    for dataset_id, indices in dataset_indices.items():
+        node_ids = list(dict.fromkeys(documents[i].metadata["doc_id"] for i in indices))
+        if len(JiebaInvertedIndex.get_indexed_node_ids(dataset_id, node_ids)) < len(node_ids):
+            dataset_scores = tfidf_scores(query_keywords, [documents[i] for i in indices])
+            for i, score in zip(indices, dataset_scores):
+                scores[i] = score
+            continue
+
+        node_scores = JiebaInvertedIndex.get_bm25_scores(dataset_id, query_keywords, node_ids=node_ids)
+        for i in indices:
+            bm25_document_scores[i] = node_scores.get(documents[i].metadata["doc_id"], 0.0)
+
+    for i, score in BM25.normalize(bm25_document_scores).items():
+        scores[i] = score
+    return scores
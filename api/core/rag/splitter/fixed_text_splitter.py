@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from typing import Any, Optional
 
+from core.helper.token_counter import token_counter
 from core.model_manager import ModelInstance
-from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
 from core.rag.splitter.text_splitter import (
     TS,
     Collection,
@@ -35,9 +36,9 @@ class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
                 return []
 
             if embedding_model_instance:
-                return embedding_model_instance.get_text_embedding_num_tokens(texts=texts)
+                return token_counter.get_text_embedding_num_tokens(embedding_model_instance, texts)
             else:
-                return [GPT2Tokenizer.get_num_tokens(text) for text in texts]
+                return token_counter.get_gpt2_num_tokens(texts)
 
         def _character_encoder(texts: list[str]) -> list[int]:
             if not texts:
@@ -62,28 +63,33 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
         super().__init__(**kwargs)
         self._fixed_separator = fixed_separator
         self._separators = separators or ["\n\n", "\n", " ", ""]
+        self._length_batch_size = 1000
 
     def split_text(self, text: str) -> list[str]:
         """Split incoming text and return chunks."""
+        return list(self.split_text_iter(text))
+
+    def split_text_iter(self, text: str) -> Iterator[str]:
+        """Split incoming text and yield chunks as they are created."""
         if self._fixed_separator:
             chunks = text.split(self._fixed_separator)
         else:
             chunks = [text]
 
-        final_chunks = []
-        chunks_lengths = self._length_function(chunks)
-        for chunk, chunk_length in zip(chunks, chunks_lengths):
-            if chunk_length > self._chunk_size:
-                final_chunks.extend(self.recursive_split_text(chunk))
-            else:
-                final_chunks.append(chunk)
-
-        return final_chunks
+        # measure the chunks in batches, so the first chunks don't wait for the whole text to be measured
+        for i in range(0, len(chunks), self._length_batch_size):
+            batch = chunks[i : i + self._length_batch_size]
+            for chunk, chunk_length in zip(batch, self._length_function(batch)):
+                if chunk_length > self._chunk_size:
+                    yield from self._recursive_split_text_iter(chunk)
+                else:
+                    yield chunk
 
     def recursive_split_text(self, text: str) -> list[str]:
         """Split incoming text and return chunks."""
+        return list(self._recursive_split_text_iter(text))
 
-        final_chunks = []
+    def _recursive_split_text_iter(self, text: str) -> Iterator[str]:
         separator = self._separators[-1]
         new_separators = []
 
@@ -116,19 +122,16 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
                     _good_splits_lengths.append(s_len)
                 else:
                     if _good_splits:
-                        merged_text = self._merge_splits(_good_splits, _separator, _good_splits_lengths)
-                        final_chunks.extend(merged_text)
+                        yield from self._iter_merge_splits(_good_splits, _separator, _good_splits_lengths)
                         _good_splits = []
                         _good_splits_lengths = []
                     if not new_separators:
-                        final_chunks.append(s)
+                        yield s
                     else:
-                        other_info = self._split_text(s, new_separators)
-                        final_chunks.extend(other_info)
+                        yield from self._split_text_iter(s, new_separators)
 
             if _good_splits:
-                merged_text = self._merge_splits(_good_splits, _separator, _good_splits_lengths)
-                final_chunks.extend(merged_text)
+                yield from self._iter_merge_splits(_good_splits, _separator, _good_splits_lengths)
         else:
             current_part = ""
             current_length = 0
@@ -144,12 +147,10 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
                     overlap_part += s
                     overlap_part_length += s_len
                 else:
-                    final_chunks.append(current_part)
+                    yield current_part
                     current_part = overlap_part + s
                     current_length = s_len + overlap_part_length
                     overlap_part = ""
                     overlap_part_length = 0
             if current_part:
-                final_chunks.append(current_part)
-
-        return final_chunks
+                yield current_part
@@ -4,7 +4,8 @@ import copy
 import logging
 import re
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Collection, Iterable, Sequence, Set
+from collections import deque
+from collections.abc import Callable, Collection, Iterable, Iterator, Sequence, Set
 from dataclasses import dataclass
 from typing import (
     Any,
@@ -72,6 +73,10 @@ class TextSplitter(BaseDocumentTransformer, ABC):
     def split_text(self, text: str) -> list[str]:
         """Split text into multiple components."""
 
+    def split_text_iter(self, text: str) -> Iterator[str]:
+        """Split text into multiple components, yielding them as they are created."""
+        yield from self.split_text(text)
+
     def create_documents(self, texts: list[str], metadatas: Optional[list[dict]] = None) -> list[Document]:
         """Create documents from a list of texts."""
         _metadatas = metadatas or [{}] * len(texts)
@@ -103,43 +108,40 @@ class TextSplitter(BaseDocumentTransformer, ABC):
         else:
             return text
 
-    def _merge_splits(self, splits: Iterable[str], separator: str, lengths: list[int]) -> list[str]:
+    def _merge_splits(self, splits: Iterable[str], separator: str, lengths: Iterable[int]) -> list[str]:
+        return list(self._iter_merge_splits(splits, separator, lengths))
+
+    def _iter_merge_splits(self, splits: Iterable[str], separator: str, lengths: Iterable[int]) -> Iterator[str]:
         # We now want to combine these smaller pieces into medium size
         # chunks to send to the LLM.
         separator_len = self._length_function([separator])[0]
 
-        docs = []
-        current_doc: list[str] = []
+        # splits of the current chunk with their precomputed lengths
+        current_doc: deque[tuple[str, int]] = deque()
         total = 0
-        index = 0
-        for d in splits:
-            _len = lengths[index]
+        for d, _len in zip(splits, lengths):
             if total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size:
                 if total > self._chunk_size:
                     logger.warning(
                         f"Created a chunk of size {total}, which is longer than the specified {self._chunk_size}"
                     )
                 if len(current_doc) > 0:
-                    doc = self._join_docs(current_doc, separator)
+                    doc = self._join_docs([split for split, _ in current_doc], separator)
                     if doc is not None:
-                        docs.append(doc)
+                        yield doc
                     # Keep on popping if:
                     # - we have a larger chunk than in the chunk overlap
                     # - or if we still have any chunks and the length is long
                     while total > self._chunk_overlap or (
                         total + _len + (separator_len if len(current_doc) > 0 else 0) > self._chunk_size and total > 0
                     ):
-                        total -= self._length_function([current_doc[0]])[0] + (
-                            separator_len if len(current_doc) > 1 else 0
-                        )
-                        current_doc = current_doc[1:]
-            current_doc.append(d)
+                        _, first_len = current_doc.popleft()
+                        total -= first_len + (separator_len if len(current_doc) > 0 else 0)
+            current_doc.append((d, _len))
             total += _len + (separator_len if len(current_doc) > 1 else 0)
-            index += 1
-        doc = self._join_docs(current_doc, separator)
+        doc = self._join_docs([split for split, _ in current_doc], separator)
         if doc is not None:
-            docs.append(doc)
-        return docs
+            yield doc
 
     @classmethod
     def from_huggingface_tokenizer(cls, tokenizer: Any, **kwargs: Any) -> TextSplitter:
@@ -463,7 +465,9 @@ class RecursiveCharacterTextSplitter(TextSplitter):
         self._separators = separators or ["\n\n", "\n", " ", ""]
 
     def _split_text(self, text: str, separators: list[str]) -> list[str]:
-        final_chunks = []
+        return list(self._split_text_iter(text, separators))
+
+    def _split_text_iter(self, text: str, separators: list[str]) -> Iterator[str]:
         separator = separators[-1]
         new_separators = []
 
@@ -487,21 +491,19 @@ class RecursiveCharacterTextSplitter(TextSplitter):
                 _good_splits_lengths.append(s_len)
             else:
                 if _good_splits:
-                    merged_text = self._merge_splits(_good_splits, _separator, _good_splits_lengths)
-                    final_chunks.extend(merged_text)
+                    yield from self._iter_merge_splits(_good_splits, _separator, _good_splits_lengths)
                     _good_splits = []
                     _good_splits_lengths = []
                 if not new_separators:
-                    final_chunks.append(s)
+                    yield s
                 else:
-                    other_info = self._split_text(s, new_separators)
-                    final_chunks.extend(other_info)
+                    yield from self._split_text_iter(s, new_separators)
 
         if _good_splits:
-            merged_text = self._merge_splits(_good_splits, _separator, _good_splits_lengths)
-            final_chunks.extend(merged_text)
-
-        return final_chunks
+            yield from self._iter_merge_splits(_good_splits, _separator, _good_splits_lengths)
 
     def split_text(self, text: str) -> list[str]:
         return self._split_text(text, self._separators)
+
+    def split_text_iter(self, text: str) -> Iterator[str]:
+        return self._split_text_iter(text, self._separators)
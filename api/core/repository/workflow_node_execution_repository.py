@@ -87,6 +87,15 @@ class WorkflowNodeExecutionRepository(Protocol):
         """
         ...
 
+    def flush(self) -> None:
+        """
+        Persist all pending changes.
+
+        Implementations that buffer writes must make every saved or updated WorkflowNodeExecution durable
+        before returning. Implementations that write immediately do nothing.
+        """
+        ...
+
     def clear(self) -> None:
         """
         Clear all WorkflowNodeExecution records based on implementation-specific criteria.
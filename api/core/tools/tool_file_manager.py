@@ -4,6 +4,7 @@ import hmac
 import logging
 import os
 import time
+from collections.abc import Iterable
 from mimetypes import guess_extension, guess_type
 from typing import Optional, Union
 from uuid import uuid4
@@ -65,6 +66,55 @@ class ToolFileManager:
         mimetype: str,
         filename: Optional[str] = None,
     ) -> ToolFile:
+        filepath, present_filename = ToolFileManager._build_file_path(tenant_id, mimetype, filename)
+        storage.save(filepath, file_binary)
+
+        return ToolFileManager._create_tool_file(
+            user_id=user_id,
+            tenant_id=tenant_id,
+            conversation_id=conversation_id,
+            filepath=filepath,
+            mimetype=mimetype,
+            name=present_filename,
+            size=len(file_binary),
+        )
+
+    @staticmethod
+    def create_file_by_stream(
+        *,
+        user_id: str,
+        tenant_id: str,
+        conversation_id: Optional[str],
+        chunks: Iterable[bytes],
+        mimetype: str,
+        filename: Optional[str] = None,
+    ) -> ToolFile:
+        """
+        create file from chunks without holding the whole file in memory,
+        a partially written file is removed when reading the chunks fails
+        """
+        filepath, present_filename = ToolFileManager._build_file_path(tenant_id, mimetype, filename)
+        try:
+            size = storage.save_stream(filepath, chunks)
+        except Exception:
+            try:
+                storage.delete(filepath)
+            except Exception:
+                logger.exception(f"failed to delete partially saved file {filepath}")
+            raise
+
+        return ToolFileManager._create_tool_file(
+            user_id=user_id,
+            tenant_id=tenant_id,
+            conversation_id=conversation_id,
+            filepath=filepath,
+            mimetype=mimetype,
+            name=present_filename,
+            size=size,
+        )
+
+    @staticmethod
+    def _build_file_path(tenant_id: str, mimetype: str, filename: Optional[str]) -> tuple[str, str]:
         extension = guess_extension(mimetype) or ".bin"
         unique_name = uuid4().hex
         unique_filename = f"{unique_name}{extension}"
@@ -74,17 +124,27 @@ class ToolFileManager:
             has_extension = len(filename.split(".")) > 1
             # Add extension flexibly
             present_filename = filename if has_extension else f"{filename}{extension}"
-        filepath = f"tools/{tenant_id}/{unique_filename}"
-        storage.save(filepath, file_binary)
+        return f"tools/{tenant_id}/{unique_filename}", present_filename
 
+    @staticmethod
+    def _create_tool_file(
+        *,
+        user_id: str,
+        tenant_id: str,
+        conversation_id: Optional[str],
+        filepath: str,
+        mimetype: str,
+        name: str,
+        size: int,
+    ) -> ToolFile:
         tool_file = ToolFile(
             user_id=user_id,
             tenant_id=tenant_id,
             conversation_id=conversation_id,
             file_key=filepath,
             mimetype=mimetype,
-            name=present_filename,
-            size=len(file_binary),
+            name=name,
+            size=size,
         )
 
         db.session.add(tool_file)
@@ -3,7 +3,7 @@ from collections import defaultdict
 from collections.abc import Mapping, Sequence
 from typing import Any, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from core.file import File, FileAttribute, file_manager
 from core.variables import Segment, SegmentGroup, Variable
@@ -42,6 +42,8 @@ class VariablePool(BaseModel):
         description="Conversation variables.",
         default_factory=list,
     )
+    # Nodes whose variables are shared with forked pools and must be copied before they are written, see `fork`.
+    _shared_node_ids: set[str] = PrivateAttr(default_factory=set)
 
     def __init__(
         self,
@@ -103,7 +105,7 @@ class VariablePool(BaseModel):
             variable = variable_factory.segment_to_variable(segment=segment, selector=selector)
 
         hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]][hash_key] = variable
+        self._get_writable_node_variables(selector[0])[hash_key] = variable
 
     def get(self, selector: Sequence[str], /) -> Segment | None:
         """
@@ -122,7 +124,7 @@ class VariablePool(BaseModel):
             return None
 
         hash_key = hash(tuple(selector[1:]))
-        value = self.variable_dictionary[selector[0]].get(hash_key)
+        value = self._get_node_variables(selector[0]).get(hash_key)
 
         if value is None:
             selector, attr = selector[:-1], selector[-1]
@@ -154,9 +156,41 @@ class VariablePool(BaseModel):
             return
         if len(selector) == 1:
             self.variable_dictionary[selector[0]] = {}
+            self._shared_node_ids.discard(selector[0])
             return
         hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]].pop(hash_key, None)
+        self._get_writable_node_variables(selector[0]).pop(hash_key, None)
+
+    def fork(self) -> "VariablePool":
+        """
+        Create a copy-on-write snapshot of the variable pool.
+
+        The child shares the variables of each node with this pool until either of them adds or removes a
+        variable of that node, which copies the node's variables first. Forking only copies the mapping of
+        node ids, and writes to either pool after the fork are never visible to the other.
+
+        Returns:
+            VariablePool: The child pool.
+        """
+        child = VariablePool.model_construct(
+            variable_dictionary=defaultdict(dict, self.variable_dictionary),
+            user_inputs=self.user_inputs,
+            system_variables=self.system_variables,
+            environment_variables=self.environment_variables,
+            conversation_variables=self.conversation_variables,
+        )
+        self._shared_node_ids.update(self.variable_dictionary)
+        child._shared_node_ids = set(self.variable_dictionary)
+        return child
+
+    def _get_node_variables(self, node_id: str, /) -> Mapping[int, Segment]:
+        return self.variable_dictionary.get(node_id, {})
+
+    def _get_writable_node_variables(self, node_id: str, /) -> dict[int, Segment]:
+        if node_id in self._shared_node_ids:
+            self.variable_dictionary[node_id] = dict(self.variable_dictionary[node_id])
+            self._shared_node_ids.discard(node_id)
+        return self.variable_dictionary[node_id]
 
     def convert_template(self, template: str, /):
         parts = VARIABLE_PATTERN.split(template)
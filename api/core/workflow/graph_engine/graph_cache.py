@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Optional
+
+from configs import dify_config
+from core.workflow.graph_engine.entities.graph import Graph
+from libs.helper import generate_text_hash
+from models.workflow import Workflow
+
+GraphCacheKey = tuple[str, str, Optional[str]]
+
+
+class GraphCache:
+    """
+    Process-wide LRU cache of compiled workflow graphs.
+
+    Entries are keyed by workflow id, a hash of the stored graph JSON and the root node id, so an edited
+    draft can never be served a stale topology. Each lookup hands out a shallow per-run view of the cached
+    graph, sharing the immutable parts (node configs, parallels) with the cached instance and copying the parts
+    a run changes (edges, stream dependencies).
+    """
+
+    def __init__(self, capacity: int):
+        self._cache: OrderedDict[GraphCacheKey, tuple[str, Graph]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_key(workflow: Workflow, root_node_id: Optional[str] = None) -> GraphCacheKey:
+        return workflow.id, generate_text_hash(workflow.graph or ""), root_node_id
+
+    def get_or_init(self, workflow: Workflow, init: Callable[[], Graph], root_node_id: Optional[str] = None) -> Graph:
+        """
+        Get the compiled graph of the workflow, building it with init on a miss
+        :param workflow: workflow the graph belongs to
+        :param init: builds the graph from the workflow graph config
+        :param root_node_id: root node id the graph was built from
+        :return: per-run view of the graph
+        """
+        key = self.build_key(workflow, root_node_id)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._view(entry[1])
+            self.misses += 1
+
+        # built outside the lock, concurrent misses of the same graph only cost a duplicated init
+        graph = init()
+        if self.capacity > 0:
+            with self._lock:
+                self._cache[key] = (workflow.app_id, graph)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.capacity:
+                    self._cache.popitem(last=False)
+        return self._view(graph)
+
+    def invalidate_workflow(self, workflow_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == workflow_id]:
+                del self._cache[key]
+
+    def invalidate_app(self, app_id: str) -> None:
+        with self._lock:
+            for key in [key for key, (entry_app_id, _) in self._cache.items() if entry_app_id == app_id]:
+                del self._cache[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    @staticmethod
+    def _view(graph: Graph) -> Graph:
+        # edge lists are extended at runtime (add_extra_edge), and the stream processors remove the nodes of
+        # success branches from the answer dependencies
+        return graph.model_copy(
+            update={
+                "edge_mapping": {node_id: list(edges) for node_id, edges in graph.edge_mapping.items()},
+                "answer_stream_generate_routes": graph.answer_stream_generate_routes.model_copy(deep=True),
+                "end_stream_param": graph.end_stream_param.model_copy(deep=True),
+            }
+        )
+
+
+workflow_graph_cache = GraphCache(capacity=dify_config.WORKFLOW_GRAPH_CACHE_SIZE)
@@ -1,17 +1,17 @@
 import contextvars
+import functools
 import logging
 import queue
 import time
 import uuid
 from collections.abc import Generator, Mapping
-from concurrent.futures import ThreadPoolExecutor, wait
-from copy import copy, deepcopy
+from concurrent.futures import wait
+from copy import copy
 from datetime import UTC, datetime
 from typing import Any, Optional, cast
 
 from flask import Flask, current_app
 
-from configs import dify_config
 from core.app.apps.base_app_queue_manager import GenerateTaskStoppedError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.workflow.entities.node_entities import AgentNodeStrategyInit, NodeRunMetadataKey, NodeRunResult
@@ -41,6 +41,7 @@ from core.workflow.graph_engine.entities.graph import Graph, GraphEdge
 from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
 from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
 from core.workflow.graph_engine.entities.runtime_route_state import RouteNodeState
+from core.workflow.graph_engine.worker_pool import graph_engine_worker_pool
 from core.workflow.nodes import NodeType
 from core.workflow.nodes.agent.agent_node import AgentNode
 from core.workflow.nodes.agent.entities import AgentNodeData
@@ -59,36 +60,7 @@ from models.workflow import WorkflowNodeExecutionStatus, WorkflowType
 logger = logging.getLogger(__name__)
 
 
-class GraphEngineThreadPool(ThreadPoolExecutor):
-    def __init__(
-        self,
-        max_workers=None,
-        thread_name_prefix="",
-        initializer=None,
-        initargs=(),
-        max_submit_count=dify_config.MAX_SUBMIT_COUNT,
-    ) -> None:
-        super().__init__(max_workers, thread_name_prefix, initializer, initargs)
-        self.max_submit_count = max_submit_count
-        self.submit_count = 0
-
-    def submit(self, fn, /, *args, **kwargs):
-        self.submit_count += 1
-        self.check_is_full()
-
-        return super().submit(fn, *args, **kwargs)
-
-    def task_done_callback(self, future):
-        self.submit_count -= 1
-
-    def check_is_full(self) -> None:
-        if self.submit_count > self.max_submit_count:
-            raise ValueError(f"Max submit count {self.max_submit_count} of workflow thread pool reached.")
-
-
 class GraphEngine:
-    workflow_thread_pool_mapping: dict[str, GraphEngineThreadPool] = {}
-
     def __init__(
         self,
         tenant_id: str,
@@ -106,24 +78,15 @@ class GraphEngine:
         max_execution_time: int,
         thread_pool_id: Optional[str] = None,
     ) -> None:
-        thread_pool_max_submit_count = dify_config.MAX_SUBMIT_COUNT
-        thread_pool_max_workers = 10
-
-        # init thread pool
+        # parallel branches and iterations of the run and all its nested runs share the process-wide worker pool,
+        # the thread pool id identifies the top-level run for its quotas
+        self.thread_pool = graph_engine_worker_pool
         if thread_pool_id:
-            if thread_pool_id not in GraphEngine.workflow_thread_pool_mapping:
-                raise ValueError(f"Max submit count {thread_pool_max_submit_count} of workflow thread pool reached.")
-
             self.thread_pool_id = thread_pool_id
-            self.thread_pool = GraphEngine.workflow_thread_pool_mapping[thread_pool_id]
             self.is_main_thread_pool = False
         else:
-            self.thread_pool = GraphEngineThreadPool(
-                max_workers=thread_pool_max_workers, max_submit_count=thread_pool_max_submit_count
-            )
             self.thread_pool_id = str(uuid.uuid4())
             self.is_main_thread_pool = True
-            GraphEngine.workflow_thread_pool_mapping[self.thread_pool_id] = self.thread_pool
 
         self.graph = graph
         self.init_params = GraphInitParams(
@@ -218,8 +181,8 @@ class GraphEngine:
             raise e
 
     def _release_thread(self):
-        if self.is_main_thread_pool and self.thread_pool_id in GraphEngine.workflow_thread_pool_mapping:
-            del GraphEngine.workflow_thread_pool_mapping[self.thread_pool_id]
+        if self.is_main_thread_pool:
+            self.thread_pool.cancel_pending(self.thread_pool_id)
 
     def _run(
         self,
@@ -478,21 +441,22 @@ class GraphEngine:
                 continue
 
             future = self.thread_pool.submit(
-                self._run_parallel_node,
-                **{
-                    "flask_app": current_app._get_current_object(),  # type: ignore[attr-defined]
-                    "q": q,
-                    "context": contextvars.copy_context(),
-                    "parallel_id": parallel_id,
-                    "parallel_start_node_id": edge.target_node_id,
-                    "parent_parallel_id": in_parallel_id,
-                    "parent_parallel_start_node_id": parallel_start_node_id,
-                    "handle_exceptions": handle_exceptions,
-                },
+                functools.partial(
+                    self._run_parallel_node,
+                    flask_app=current_app._get_current_object(),  # type: ignore[attr-defined]
+                    q=q,
+                    context=contextvars.copy_context(),
+                    parallel_id=parallel_id,
+                    parallel_start_node_id=edge.target_node_id,
+                    parent_parallel_id=in_parallel_id,
+                    parent_parallel_start_node_id=parallel_start_node_id,
+                    handle_exceptions=handle_exceptions,
+                ),
+                run_id=self.thread_pool_id,
+                tenant_id=self.init_params.tenant_id,
+                group_id=parallel_id,
             )
 
-            future.add_done_callback(self.thread_pool.task_done_callback)
-
             futures.append(future)
 
         succeeded_count = 0
@@ -877,11 +841,11 @@ class GraphEngine:
     def create_copy(self):
         """
         create a graph engine copy
-        :return: graph engine with a new variable pool and initialized total tokens
+        :return: graph engine with a forked variable pool and initialized total tokens
         """
         new_instance = copy(self)
         new_instance.graph_runtime_state = copy(self.graph_runtime_state)
-        new_instance.graph_runtime_state.variable_pool = deepcopy(self.graph_runtime_state.variable_pool)
+        new_instance.graph_runtime_state.variable_pool = self.graph_runtime_state.variable_pool.fork()
         new_instance.graph_runtime_state.total_tokens = 0
         return new_instance
 
@@ -0,0 +1,278 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+from configs import dify_config
+
+
+class WorkerPoolStats(BaseModel):
+    max_workers: int
+    active_workers: int
+    queue_depth: int
+    started_count: int
+    inline_count: int
+    total_wait_time: float
+    max_wait_time: float
+
+    @property
+    def average_wait_time(self) -> float:
+        return self.total_wait_time / self.started_count if self.started_count else 0.0
+
+
+class _PendingTask(NamedTuple):
+    task: Callable[[], Any]
+    future: Future
+    run_id: str
+    tenant_id: str
+    group_id: Optional[str]
+    group_limit: Optional[int]
+    submitted_at: float
+
+
+class GraphEngineWorkerPool:
+    """
+    Process-wide bounded worker pool that parallel branches and parallel iterations of all graph runs share.
+
+    Tasks start while the pool, their tenant, their run and their group (e.g. one parallel iteration) are
+    under quota, otherwise they wait in a per-run FIFO queue. Queued runs are served round-robin, so a run
+    with a thousand queued items can't starve the others. Submitters outside the pool block while the queue
+    is full. Tasks submitted from inside the pool never queue: they either start right away or run inline in
+    the submitting worker, since a worker waiting on queued work could otherwise deadlock a saturated pool.
+
+    Like the thread pool each parallel iteration and branch set used to create, each group of a run may have
+    at most max_submit_count_per_group queued and running tasks. Tasks without a group count as one group.
+    """
+
+    _local = threading.local()
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_workers_per_tenant: int,
+        max_workers_per_run: int,
+        max_submit_count_per_group: int,
+        max_queue_size: int,
+        queue_timeout: float,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_workers_per_tenant = max_workers_per_tenant
+        self.max_workers_per_run = max_workers_per_run
+        self.max_submit_count_per_group = max_submit_count_per_group
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="graph_engine_worker", initializer=self._mark_worker_thread
+        )
+        self._condition = threading.Condition()
+        self._queues: OrderedDict[str, deque[_PendingTask]] = OrderedDict()
+        self._queue_depth = 0
+        self._active = 0
+        self._run_active: defaultdict[str, int] = defaultdict(int)
+        self._tenant_active: defaultdict[str, int] = defaultdict(int)
+        self._group_active: defaultdict[str, int] = defaultdict(int)
+        # queued and running tasks of each group of a run
+        self._group_submitted: defaultdict[tuple[str, Optional[str]], int] = defaultdict(int)
+
+        self._started_count = 0
+        self._inline_count = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @classmethod
+    def _mark_worker_thread(cls) -> None:
+        cls._local.is_worker = True
+
+    @classmethod
+    def in_worker_thread(cls) -> bool:
+        return getattr(cls._local, "is_worker", False)
+
+    def submit(
+        self,
+        task: Callable[[], Any],
+        *,
+        run_id: str,
+        tenant_id: str,
+        group_id: Optional[str] = None,
+        group_limit: Optional[int] = None,
+    ) -> Future:
+        """
+        Submit a task
+        :param task: task to run
+        :param run_id: id of the top-level graph run the task belongs to
+        :param tenant_id: tenant id
+        :param group_id: id of a group of tasks with its own concurrency limit
+        :param group_limit: concurrency limit of the group
+        :return: future of the task result
+        """
+        pending = _PendingTask(
+            task=task,
+            future=Future(),
+            run_id=run_id,
+            tenant_id=tenant_id,
+            group_id=group_id,
+            group_limit=group_limit,
+            submitted_at=time.perf_counter(),
+        )
+        in_worker_thread = self.in_worker_thread()
+        with self._condition:
+            if self._group_submitted[(run_id, group_id)] >= self.max_submit_count_per_group:
+                raise ValueError(f"Max submit count {self.max_submit_count_per_group} of workflow thread pool reached.")
+
+            if self._can_start(pending) and (in_worker_thread or not self._queue_depth):
+                self._group_submitted[(run_id, group_id)] += 1
+                self._start(pending)
+                return pending.future
+
+            if in_worker_thread:
+                self._inline_count += 1
+            else:
+                deadline = time.monotonic() + self.queue_timeout
+                while self._queue_depth >= self.max_queue_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ValueError(f"Graph engine worker pool queue of {self.max_queue_size} tasks is full.")
+                    self._condition.wait(remaining)
+
+                self._group_submitted[(run_id, group_id)] += 1
+                self._queues.setdefault(run_id, deque()).append(pending)
+                self._queue_depth += 1
+                self._dispatch()
+                return pending.future
+
+        self._run_task(pending)
+        return pending.future
+
+    def cancel_pending(self, run_id: str) -> None:
+        """
+        Cancel the queued tasks of a run, running tasks are left to finish
+        :param run_id: id of the top-level graph run
+        """
+        with self._condition:
+            queue = self._queues.pop(run_id, None)
+            if not queue:
+                return
+            for pending in queue:
+                pending.future.cancel()
+                self._queue_depth -= 1
+                self._release_submitted(pending)
+            self._condition.notify_all()
+
+    def stats(self) -> WorkerPoolStats:
+        with self._condition:
+            return WorkerPoolStats(
+                max_workers=self.max_workers,
+                active_workers=self._active,
+                queue_depth=self._queue_depth,
+                started_count=self._started_count,
+                inline_count=self._inline_count,
+                total_wait_time=self._total_wait_time,
+                max_wait_time=self._max_wait_time,
+            )
+
+    def _can_start(self, pending: _PendingTask) -> bool:
+        return (
+            self._active < self.max_workers
+            and self._run_active[pending.run_id] < self.max_workers_per_run
+            and self._tenant_active[pending.tenant_id] < self.max_workers_per_tenant
+            and (
+                pending.group_id is None
+                or pending.group_limit is None
+                or self._group_active[pending.group_id] < pending.group_limit
+            )
+        )
+
+    def _start(self, pending: _PendingTask) -> None:
+        self._active += 1
+        self._run_active[pending.run_id] += 1
+        self._tenant_active[pending.tenant_id] += 1
+        if pending.group_id is not None:
+            self._group_active[pending.group_id] += 1
+
+        wait_time = time.perf_counter() - pending.submitted_at
+        self._started_count += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+
+        self._executor.submit(self._execute, pending)
+
+    def _dispatch(self) -> None:
+        """Start queued tasks while there are free workers, taking one task per run in turn."""
+        while self._queues and self._active < self.max_workers:
+            started = False
+            for run_id in list(self._queues):
+                queue = self._queues[run_id]
+                while queue and queue[0].future.cancelled():
+                    self._release_submitted(queue.popleft())
+                    self._queue_depth -= 1
+                    self._condition.notify_all()
+                if queue and self._can_start(queue[0]):
+                    pending = queue.popleft()
+                    self._queue_depth -= 1
+                    self._condition.notify_all()
+                    self._start(pending)
+                    started = True
+                if not queue:
+                    del self._queues[run_id]
+                elif started:
+                    self._queues.move_to_end(run_id)
+                if started:
+                    break
+            if not started:
+                return
+
+    def _execute(self, pending: _PendingTask) -> None:
+        # the slot is released before the future resolves, so whoever waits on it sees the pool settled
+        self._run_task(pending, on_finish=self._release_slot)
+
+    def _release_slot(self, pending: _PendingTask) -> None:
+        with self._condition:
+            self._active -= 1
+            self._release_counter(self._run_active, pending.run_id)
+            self._release_counter(self._tenant_active, pending.tenant_id)
+            if pending.group_id is not None:
+                self._release_counter(self._group_active, pending.group_id)
+            self._release_submitted(pending)
+            self._dispatch()
+
+    @staticmethod
+    def _run_task(pending: _PendingTask, on_finish: Optional[Callable[[_PendingTask], None]] = None) -> None:
+        if not pending.future.set_running_or_notify_cancel():
+            if on_finish:
+                on_finish(pending)
+            return
+
+        try:
+            result = pending.task()
+        except BaseException as e:
+            if on_finish:
+                on_finish(pending)
+            pending.future.set_exception(e)
+        else:
+            if on_finish:
+                on_finish(pending)
+            pending.future.set_result(result)
+
+    def _release_submitted(self, pending: _PendingTask) -> None:
+        self._release_counter(self._group_submitted, (pending.run_id, pending.group_id))
+
+    @staticmethod
+    def _release_counter(counter: defaultdict, key: Any) -> None:
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+
+graph_engine_worker_pool = GraphEngineWorkerPool(
+    max_workers=dify_config.GRAPH_ENGINE_MAX_WORKERS,
+    max_workers_per_tenant=dify_config.GRAPH_ENGINE_MAX_WORKERS_PER_TENANT,
+    max_workers_per_run=dify_config.GRAPH_ENGINE_MAX_WORKERS_PER_RUN,
+    max_submit_count_per_group=dify_config.MAX_SUBMIT_COUNT,
+    max_queue_size=dify_config.GRAPH_ENGINE_MAX_QUEUE_SIZE,
+    queue_timeout=dify_config.GRAPH_ENGINE_QUEUE_TIMEOUT,
+)
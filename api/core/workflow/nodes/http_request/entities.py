@@ -1,5 +1,5 @@
 import mimetypes
-from collections.abc import Sequence
+from collections.abc import Generator, Iterator, Sequence
 from email.message import Message
 from typing import Any, Literal, Optional
 
@@ -135,7 +135,7 @@ class Response:
             # Try to detect if content is text-based by sampling first few bytes
             try:
                 # Sample first 1024 bytes for text detection
-                content_sample = self.response.content[:1024]
+                content_sample = self.content_sample
                 content_sample.decode("utf-8")
                 # If we can decode as UTF-8 and find common text patterns, likely not a file
                 text_markers = (b"{", b"[", b"<", b"function", b"var ", b"const ", b"let ")
@@ -153,6 +153,10 @@ class Response:
         # For unknown types, check if it's a media type
         return any(media_type in content_type for media_type in ("image/", "audio/", "video/"))
 
+    @property
+    def content_sample(self) -> bytes:
+        return self.response.content[:1024]
+
     @property
     def content_type(self) -> str:
         return self.headers.get("content-type", "")
@@ -190,3 +194,48 @@ class Response:
             msg["content-disposition"] = content_disposition
             return msg
         return None
+
+
+class StreamingResponse(Response):
+    """
+    Response whose body is still being read from the open connection.
+
+    The first chunks are kept as a sample for file detection, the rest is either buffered on read() or handed out
+    once by iter_bytes(), e.g. to write a file straight to storage.
+    """
+
+    def __init__(self, response: httpx.Response, sample: bytes, chunks: Iterator[bytes]):
+        super().__init__(response)
+        self.sample = sample
+        self.chunks = chunks
+        self.received_size = 0
+        self._content: Optional[bytes] = None
+
+    def iter_bytes(self) -> Generator[bytes, None, None]:
+        if self._content is not None:
+            yield self._content
+            return
+        for chunk in self.chunks:
+            self.received_size += len(chunk)
+            yield chunk
+
+    def read(self) -> bytes:
+        if self._content is None:
+            self._content = b"".join(self.iter_bytes())
+        return self._content
+
+    @property
+    def content_sample(self) -> bytes:
+        return self.sample[:1024]
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.response.encoding or "utf-8", errors="replace")
+
+    @property
+    def content(self) -> bytes:
+        return self.read()
+
+    @property
+    def size(self) -> int:
+        return len(self._content) if self._content is not None else self.received_size
@@ -1,6 +1,8 @@
 import base64
+import itertools
 import json
-from collections.abc import Mapping
+from collections.abc import Generator, Iterator, Mapping
+from contextlib import contextmanager
 from copy import deepcopy
 from random import randint
 from typing import Any, Literal
@@ -19,6 +21,7 @@ from .entities import (
     HttpRequestNodeData,
     HttpRequestNodeTimeout,
     Response,
+    StreamingResponse,
 )
 from .exc import (
     AuthorizationConfigError,
@@ -278,18 +281,65 @@ class Executor:
             else dify_config.HTTP_REQUEST_NODE_MAX_TEXT_SIZE
         )
         if executor_response.size > threshold_size:
-            raise ResponseSizeError(
-                f"{'File' if executor_response.is_file else 'Text'} size is too large,"
-                f" max size is {threshold_size / 1024 / 1024:.2f} MB,"
-                f" but current size is {executor_response.readable_size}."
-            )
+            raise self._response_size_error(executor_response, threshold_size)
+
+        return executor_response
+
+    def _validate_and_parse_stream_response(self, response: httpx.Response) -> StreamingResponse:
+        chunks = response.iter_bytes()
+        sample = b""
+        for chunk in chunks:
+            sample += chunk
+            if len(sample) >= 1024:
+                break
+
+        executor_response = StreamingResponse(response, sample=sample, chunks=iter(()))
+        threshold_size = (
+            dify_config.HTTP_REQUEST_NODE_MAX_BINARY_SIZE
+            if executor_response.is_file
+            else dify_config.HTTP_REQUEST_NODE_MAX_TEXT_SIZE
+        )
+        executor_response.chunks = self._limit_response_size(
+            executor_response, itertools.chain([sample], chunks), threshold_size
+        )
+        # text bodies are needed as a whole anyway, file bodies are left to be streamed by the caller
+        if not executor_response.is_file:
+            executor_response.read()
 
         return executor_response
 
+    def _limit_response_size(
+        self, executor_response: StreamingResponse, chunks: Iterator[bytes], threshold_size: int
+    ) -> Generator[bytes, None, None]:
+        received_size = 0
+        for chunk in chunks:
+            received_size += len(chunk)
+            if received_size > threshold_size:
+                executor_response.received_size = received_size
+                raise self._response_size_error(executor_response, threshold_size, partial=True)
+            yield chunk
+
+    @staticmethod
+    def _response_size_error(executor_response: Response, threshold_size: int, partial: bool = False):
+        return ResponseSizeError(
+            f"{'File' if executor_response.is_file else 'Text'} size is too large,"
+            f" max size is {threshold_size / 1024 / 1024:.2f} MB,"
+            f" but current size is {'more than ' if partial else ''}{executor_response.readable_size}."
+        )
+
     def _do_http_request(self, headers: dict[str, Any]) -> httpx.Response:
         """
         do http request depending on api bundle
         """
+        self._validate_method()
+        try:
+            response = getattr(ssrf_proxy, self.method.lower())(**self._build_request_args(headers))
+        except (ssrf_proxy.MaxRetriesExceededError, httpx.RequestError) as e:
+            raise HttpRequestNodeError(str(e))
+        # FIXME: fix type ignore, this maybe httpx type issue
+        return response  # type: ignore
+
+    def _validate_method(self) -> None:
         if self.method not in {
             "get",
             "head",
@@ -308,6 +358,19 @@ class Executor:
         }:
             raise InvalidHttpMethodError(f"Invalid http method {self.method}")
 
+    @contextmanager
+    def _do_http_stream_request(self, headers: dict[str, Any]) -> Generator[httpx.Response, None, None]:
+        """
+        do http request and keep the connection open while the response body is read
+        """
+        self._validate_method()
+        try:
+            with ssrf_proxy.stream_request(self.method.upper(), **self._build_request_args(headers)) as response:
+                yield response
+        except (ssrf_proxy.MaxRetriesExceededError, httpx.RequestError) as e:
+            raise HttpRequestNodeError(str(e))
+
+    def _build_request_args(self, headers: dict[str, Any]) -> dict[str, Any]:
         request_args = {
             "url": self.url,
             "data": self.data,
@@ -322,12 +385,7 @@ class Executor:
             "max_retries": self.max_retries,
         }
         # request_args = {k: v for k, v in request_args.items() if v is not None}
-        try:
-            response = getattr(ssrf_proxy, self.method.lower())(**request_args)
-        except (ssrf_proxy.MaxRetriesExceededError, httpx.RequestError) as e:
-            raise HttpRequestNodeError(str(e))
-        # FIXME: fix type ignore, this maybe httpx type issue
-        return response  # type: ignore
+        return request_args
 
     def invoke(self) -> Response:
         # assemble headers
@@ -337,6 +395,19 @@ class Executor:
         # validate response
         return self._validate_and_parse_response(response)
 
+    @contextmanager
+    def invoke_stream(self) -> Generator[StreamingResponse, None, None]:
+        """
+        invoke with the response body read incrementally, text bodies are read within the context,
+        file bodies have to be consumed by the caller before leaving it
+        """
+        # assemble headers
+        headers = self._assembling_headers()
+        # do http request
+        with self._do_http_stream_request(headers) as response:
+            # validate response
+            yield self._validate_and_parse_stream_response(response)
+
     def to_log(self):
         url_parts = urlparse(self.url)
         path = url_parts.path or "/"
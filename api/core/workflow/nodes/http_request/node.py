@@ -19,6 +19,7 @@ from .entities import (
     HttpRequestNodeData,
     HttpRequestNodeTimeout,
     Response,
+    StreamingResponse,
 )
 from .exc import HttpRequestNodeError, RequestBodyError
 
@@ -71,8 +72,12 @@ class HttpRequestNode(BaseNode[HttpRequestNodeData]):
             )
             process_data["request"] = http_executor.to_log()
 
-            response = http_executor.invoke()
-            files = self.extract_files(url=http_executor.url, response=response)
+            if dify_config.HTTP_REQUEST_NODE_STREAM_RESPONSE_ENABLED:
+                with http_executor.invoke_stream() as response:
+                    files = self.extract_files(url=http_executor.url, response=response)
+            else:
+                response = http_executor.invoke()
+                files = self.extract_files(url=http_executor.url, response=response)
             if not response.response.is_success and (self.should_continue_on_error or self.should_retry):
                 return NodeRunResult(
                     status=WorkflowNodeExecutionStatus.FAILED,
@@ -173,7 +178,6 @@ class HttpRequestNode(BaseNode[HttpRequestNodeData]):
         files: list[File] = []
         is_file = response.is_file
         content_type = response.content_type
-        content = response.content
         parsed_content_disposition = response.parsed_content_disposition
         content_disposition_type = None
 
@@ -192,13 +196,22 @@ class HttpRequestNode(BaseNode[HttpRequestNodeData]):
             content_disposition_type or content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
         )
 
-        tool_file = ToolFileManager.create_file_by_raw(
-            user_id=self.user_id,
-            tenant_id=self.tenant_id,
-            conversation_id=None,
-            file_binary=content,
-            mimetype=mime_type,
-        )
+        if isinstance(response, StreamingResponse):
+            tool_file = ToolFileManager.create_file_by_stream(
+                user_id=self.user_id,
+                tenant_id=self.tenant_id,
+                conversation_id=None,
+                chunks=response.iter_bytes(),
+                mimetype=mime_type,
+            )
+        else:
+            tool_file = ToolFileManager.create_file_by_raw(
+                user_id=self.user_id,
+                tenant_id=self.tenant_id,
+                conversation_id=None,
+                file_binary=response.content,
+                mimetype=mime_type,
+            )
 
         mapping = {
             "tool_file_id": tool_file.id,
@@ -1,4 +1,5 @@
 import contextvars
+import functools
 import logging
 import uuid
 from collections.abc import Generator, Mapping, Sequence
@@ -120,7 +121,7 @@ class IterationNode(BaseNode[IterationNodeData]):
         variable_pool.add([self.node_id, "item"], iterator_list_value[0])
 
         # init graph engine
-        from core.workflow.graph_engine.graph_engine import GraphEngine, GraphEngineThreadPool
+        from core.workflow.graph_engine.graph_engine import GraphEngine
 
         graph_engine = GraphEngine(
             tenant_id=self.tenant_id,
@@ -167,26 +168,28 @@ class IterationNode(BaseNode[IterationNodeData]):
             if self.node_data.is_parallel:
                 futures: list[Future] = []
                 q: Queue = Queue()
-                thread_pool = GraphEngineThreadPool(
-                    max_workers=self.node_data.parallel_nums, max_submit_count=dify_config.MAX_SUBMIT_COUNT
-                )
                 for index, item in enumerate(iterator_list_value):
-                    future: Future = thread_pool.submit(
-                        self._run_single_iter_parallel,
-                        flask_app=current_app._get_current_object(),  # type: ignore
-                        q=q,
-                        context=contextvars.copy_context(),
-                        iterator_list_value=iterator_list_value,
-                        inputs=inputs,
-                        outputs=outputs,
-                        start_at=start_at,
-                        graph_engine=graph_engine,
-                        iteration_graph=iteration_graph,
-                        index=index,
-                        item=item,
-                        iter_run_map=iter_run_map,
+                    future: Future = graph_engine.thread_pool.submit(
+                        functools.partial(
+                            self._run_single_iter_parallel,
+                            flask_app=current_app._get_current_object(),  # type: ignore
+                            q=q,
+                            context=contextvars.copy_context(),
+                            iterator_list_value=iterator_list_value,
+                            inputs=inputs,
+                            outputs=outputs,
+                            start_at=start_at,
+                            graph_engine=graph_engine,
+                            iteration_graph=iteration_graph,
+                            index=index,
+                            item=item,
+                            iter_run_map=iter_run_map,
+                        ),
+                        run_id=graph_engine.thread_pool_id,
+                        tenant_id=self.tenant_id,
+                        group_id=self.id,
+                        group_limit=self.node_data.parallel_nums,
                     )
-                    future.add_done_callback(thread_pool.task_done_callback)
                     futures.append(future)
                 succeeded_count = 0
                 while True:
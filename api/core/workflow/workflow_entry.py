@@ -15,6 +15,7 @@ from core.workflow.graph_engine.entities.event import GraphEngineEvent, GraphRun
 from core.workflow.graph_engine.entities.graph import Graph
 from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
 from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
+from core.workflow.graph_engine.graph_cache import workflow_graph_cache
 from core.workflow.graph_engine.graph_engine import GraphEngine
 from core.workflow.nodes import NodeType
 from core.workflow.nodes.base import BaseNode
@@ -152,7 +153,7 @@ class WorkflowEntry:
         variable_pool = VariablePool(environment_variables=workflow.environment_variables)
 
         # init graph
-        graph = Graph.init(graph_config=workflow.graph_dict)
+        graph = workflow_graph_cache.get_or_init(workflow, lambda: Graph.init(graph_config=workflow.graph_dict))
 
         # init workflow run state
         node_instance = node_cls(
@@ -0,0 +1,9 @@
+from core.workflow.graph_engine.graph_cache import workflow_graph_cache
+from events.app_event import app_published_workflow_was_updated
+
+
+@app_published_workflow_was_updated.connect
+def handle(sender, **kwargs):
+    app = sender
+    # the previously published workflow of the app will not be run anymore
+    workflow_graph_cache.invalidate_app(app.id)
@@ -0,0 +1,10 @@
+from core.workflow.graph_engine.graph_cache import workflow_graph_cache
+from events.app_event import app_draft_workflow_was_synced
+
+
+@app_draft_workflow_was_synced.connect
+def handle(sender, **kwargs):
+    synced_draft_workflow = kwargs.get("synced_draft_workflow")
+    if synced_draft_workflow is None:
+        return
+    workflow_graph_cache.invalidate_workflow(synced_draft_workflow.id)
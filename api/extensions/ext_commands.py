@@ -12,6 +12,8 @@ def init_app(app: DifyApp):
         fix_app_site_missing,
         install_plugins,
         migrate_data_for_plugin,
+        migrate_embedding_cache_format,
+        migrate_keyword_index,
         old_metadata_migration,
         reset_email,
         reset_encrypt_key_pair,
@@ -36,6 +38,8 @@ def init_app(app: DifyApp):
         install_plugins,
         old_metadata_migration,
         clear_free_plan_tenant_expired_logs,
+        migrate_embedding_cache_format,
+        migrate_keyword_index,
     ]
     for cmd in cmds_to_register:
         app.cli.add_command(cmd)
@@ -1,5 +1,5 @@
 import logging
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Iterable
 from typing import Literal, Union, overload
 
 from flask import Flask
@@ -98,6 +98,10 @@ class Storage:
         """保存文件到存储服务"""
         self.storage_runner.save(filename, data)
 
+    def save_stream(self, filename: str, chunks: Iterable[bytes]) -> int:
+        """流式保存文件到存储服务，返回文件大小"""
+        return self.storage_runner.save_stream(filename, chunks)
+
     @overload
     def load(self, filename: str, /, *, stream: Literal[False] = False) -> bytes:
         ...
@@ -1,5 +1,6 @@
 import logging
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
+from tempfile import SpooledTemporaryFile
 
 import boto3  # type: ignore
 from botocore.client import Config  # type: ignore
@@ -51,6 +52,16 @@ class AwsS3Storage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(Bucket=self.bucket_name, Key=filename, Body=data)
 
+    def save_stream(self, filename: str, chunks: Iterable[bytes]) -> int:
+        # spool to disk past 8 MB, upload_fileobj then sends the file as a multipart upload
+        with SpooledTemporaryFile(max_size=8 * 1024 * 1024) as file:
+            for chunk in chunks:
+                file.write(chunk)
+            size = file.tell()
+            file.seek(0)
+            self.client.upload_fileobj(file, self.bucket_name, filename)
+        return size
+
     def load_once(self, filename: str) -> bytes:
         try:
             data: bytes = self.client.get_object(Bucket=self.bucket_name, Key=filename)["Body"].read()
@@ -1,7 +1,7 @@
 """Abstract interface for file storage implementations."""
 
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 
 
 class BaseStorage(ABC):
@@ -11,6 +11,15 @@ class BaseStorage(ABC):
     def save(self, filename, data):
         raise NotImplementedError
 
+    def save_stream(self, filename: str, chunks: Iterable[bytes]) -> int:
+        """
+        Save data read from an iterable of chunks, returning its size.
+        Storages without a streaming upload buffer the chunks before saving.
+        """
+        data = b"".join(chunks)
+        self.save(filename, data)
+        return len(data)
+
     @abstractmethod
     def load_once(self, filename: str) -> bytes:
         raise NotImplementedError
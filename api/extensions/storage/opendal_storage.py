@@ -1,6 +1,6 @@
 import logging
 import os
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from pathlib import Path
 
 import opendal  # type: ignore[import]
@@ -44,6 +44,15 @@ class OpenDALStorage(BaseStorage):
         self.op.write(path=filename, bs=data)
         logger.debug(f"file {filename} saved")
 
+    def save_stream(self, filename: str, chunks: Iterable[bytes]) -> int:
+        size = 0
+        with self.op.open(path=filename, mode="wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+                size += len(chunk)
+        logger.debug(f"file {filename} saved as stream")
+        return size
+
     def load_once(self, filename: str) -> bytes:
         if not self.exists(filename):
             raise FileNotFoundError("File not found")
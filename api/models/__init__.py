@@ -13,6 +13,9 @@ from .dataset import (
     AppDatasetJoin,
     Dataset,
     DatasetCollectionBinding,
+    DatasetKeywordFrequency,
+    DatasetKeywordPosting,
+    DatasetKeywordStatistics,
     DatasetKeywordTable,
     DatasetPermission,
     DatasetPermissionEnum,
@@ -117,6 +120,9 @@ __all__ = [
     "DataSourceOauthBinding",
     "Dataset",
     "DatasetCollectionBinding",
+    "DatasetKeywordFrequency",
+    "DatasetKeywordPosting",
+    "DatasetKeywordStatistics",
     "DatasetKeywordTable",
     "DatasetPermission",
     "DatasetPermissionEnum",
@@ -7,10 +7,12 @@ import logging
 import os
 import pickle
 import re
+import struct
 import time
 from json import JSONDecodeError
 from typing import Any, cast
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped
@@ -908,6 +910,54 @@ class DatasetKeywordTable(db.Model):  # type: ignore[name-defined]
                 return None
 
 
+class DatasetKeywordPosting(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="dataset_keyword_posting_pkey"),
+        db.UniqueConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_unique_idx"),
+        db.Index("dataset_keyword_posting_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    id = db.Column(StringUUID, primary_key=True, server_default=db.text("uuid_generate_v4()"))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    keyword = db.Column(db.String(255), nullable=False)
+    index_node_id = db.Column(db.String(255), nullable=False)
+    term_frequency = db.Column(db.Integer, nullable=False, server_default=db.text("1"))
+    document_length = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+
+
+class DatasetKeywordStatistics(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "dataset_keyword_statistics"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="dataset_keyword_statistics_pkey"),
+        db.UniqueConstraint("dataset_id", name="dataset_keyword_statistics_dataset_idx"),
+    )
+
+    id = db.Column(StringUUID, primary_key=True, server_default=db.text("uuid_generate_v4()"))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    document_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    total_document_length = db.Column(db.BigInteger, nullable=False, server_default=db.text("0"))
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+
+    @property
+    def average_document_length(self) -> float:
+        return self.total_document_length / self.document_count if self.document_count else 0.0
+
+
+class DatasetKeywordFrequency(db.Model):  # type: ignore[name-defined]
+    __tablename__ = "dataset_keyword_frequencies"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="dataset_keyword_frequency_pkey"),
+        db.UniqueConstraint("dataset_id", "keyword", name="dataset_keyword_frequency_unique_idx"),
+    )
+
+    id = db.Column(StringUUID, primary_key=True, server_default=db.text("uuid_generate_v4()"))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    keyword = db.Column(db.String(255), nullable=False)
+    document_frequency = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+
+
 class Embedding(db.Model):  # type: ignore[name-defined]
     __tablename__ = "embeddings"
     __table_args__ = (
@@ -925,11 +975,45 @@ class Embedding(db.Model):  # type: ignore[name-defined]
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
     provider_name = db.Column(db.String(255), nullable=False, server_default=db.text("''::character varying"))
 
-    def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+    # Compact layout: magic, format version and dtype code, followed by the raw little-endian vector.
+    # Rows written before this format existed hold a pickled list[float] and are still readable.
+    COMPACT_MAGIC = b"DEMB"
+    COMPACT_VERSION = 1
+    _COMPACT_HEADER = struct.Struct("<4sBB")
+    _COMPACT_DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f2")}
+    _COMPACT_DTYPE_CODES = {"float32": 1, "float16": 2}
+
+    def set_embedding(self, embedding_data: list[float] | np.ndarray, dtype: str = "float32"):
+        self.embedding = self.encode_embedding(embedding_data, dtype)
 
     def get_embedding(self) -> list[float]:
-        return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
+        return cast(list[float], self.get_embedding_array().tolist())
+
+    def get_embedding_array(self) -> np.ndarray:
+        """Decode the stored vector straight into a numpy array, skipping the Python list."""
+        return self.decode_embedding(self.embedding)
+
+    @property
+    def is_compact(self) -> bool:
+        return bytes(self.embedding[: len(self.COMPACT_MAGIC)]) == self.COMPACT_MAGIC
+
+    @classmethod
+    def encode_embedding(cls, embedding_data: list[float] | np.ndarray, dtype: str = "float32") -> bytes:
+        dtype_code = cls._COMPACT_DTYPE_CODES.get(dtype)
+        if dtype_code is None:
+            raise ValueError(f"Unsupported embedding dtype {dtype}")
+        vector = np.asarray(embedding_data, dtype=cls._COMPACT_DTYPES[dtype_code])
+        return cls._COMPACT_HEADER.pack(cls.COMPACT_MAGIC, cls.COMPACT_VERSION, dtype_code) + vector.tobytes()
+
+    @classmethod
+    def decode_embedding(cls, data: bytes) -> np.ndarray:
+        header_size = cls._COMPACT_HEADER.size
+        if bytes(data[: len(cls.COMPACT_MAGIC)]) != cls.COMPACT_MAGIC:
+            return np.asarray(pickle.loads(data), dtype=np.float64)  # noqa: S301
+        magic, version, dtype_code = cls._COMPACT_HEADER.unpack_from(data)
+        if version != cls.COMPACT_VERSION or dtype_code not in cls._COMPACT_DTYPES:
+            raise ValueError(f"Unsupported embedding format version {version} with dtype code {dtype_code}")
+        return np.frombuffer(data, dtype=cls._COMPACT_DTYPES[dtype_code], offset=header_size)
 
 
 class DatasetCollectionBinding(db.Model):  # type: ignore[name-defined]
@@ -13,7 +13,10 @@ from sqlalchemy.orm import sessionmaker
 from configs import dify_config
 from core.repository.repository_factory import RepositoryFactory
 from extensions.ext_database import db
-from repositories.workflow_node_execution import SQLAlchemyWorkflowNodeExecutionRepository
+from repositories.workflow_node_execution import (
+    SQLAlchemyWorkflowNodeExecutionRepository,
+    WriteBehindWorkflowNodeExecutionRepository,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +83,15 @@ def create_workflow_node_execution_repository(params: Mapping[str, Any]) -> SQLA
         # 使用全局db引擎创建sessionmaker
         session_factory = sessionmaker(bind=db.engine)
 
+    # 启用写后缓冲时，节点执行记录先缓存在内存中，再批量写入数据库
+    if dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED:
+        return WriteBehindWorkflowNodeExecutionRepository(
+            session_factory=session_factory,
+            tenant_id=tenant_id,
+            app_id=app_id,
+            batch_size=dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_BATCH_SIZE,
+        )
+
     # 创建并返回仓库实例
     return SQLAlchemyWorkflowNodeExecutionRepository(
         session_factory=session_factory,  # SQLAlchemy会话工厂
@@ -3,7 +3,9 @@ WorkflowNodeExecution repository implementations.
 """
 
 from repositories.workflow_node_execution.sqlalchemy_repository import SQLAlchemyWorkflowNodeExecutionRepository
+from repositories.workflow_node_execution.write_behind_repository import WriteBehindWorkflowNodeExecutionRepository
 
 __all__ = [
     "SQLAlchemyWorkflowNodeExecutionRepository",
+    "WriteBehindWorkflowNodeExecutionRepository",
 ]
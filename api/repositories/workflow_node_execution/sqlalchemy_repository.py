@@ -173,6 +173,11 @@ class SQLAlchemyWorkflowNodeExecutionRepository:
             session.merge(execution)
             session.commit()
 
+    def flush(self) -> None:
+        """
+        Nothing to do, save and update commit their changes immediately.
+        """
+
     def clear(self) -> None:
         """
         Clear all WorkflowNodeExecution records for the current tenant_id and app_id.
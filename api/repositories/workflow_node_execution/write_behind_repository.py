@@ -0,0 +1,220 @@
+"""
+Write-behind implementation of the WorkflowNodeExecutionRepository.
+"""
+
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from configs import dify_config
+from core.repository.workflow_node_execution_repository import OrderConfig
+from models.workflow import WorkflowNodeExecution
+from repositories.workflow_node_execution.sqlalchemy_repository import SQLAlchemyWorkflowNodeExecutionRepository
+
+logger = logging.getLogger(__name__)
+
+_COLUMN_KEYS = [attr.key for attr in inspect(WorkflowNodeExecution).column_attrs]
+
+
+class WriteBehindWorkflowNodeExecutionRepository(SQLAlchemyWorkflowNodeExecutionRepository):
+    """
+    Write-behind implementation of the WorkflowNodeExecutionRepository interface.
+
+    Saves and updates only record the current column values of an execution in memory, so the insert at node
+    start and the update at node end usually become a single row write. Buffered rows are written in bulk
+    INSERT ... ON CONFLICT DO UPDATE batches by a background thread every flush interval, or as soon as batch_size
+    rows are buffered. Callers block once the buffer holds twice that many rows.
+
+    Reads and flush() write the buffer first, so callers always see their own writes and can make every node
+    execution durable before committing the final status of the workflow run.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker | Engine,
+        tenant_id: str,
+        app_id: Optional[str] = None,
+        batch_size: int = 100,
+    ):
+        """
+        Initialize the repository with a SQLAlchemy sessionmaker or engine and tenant context.
+
+        Args:
+            session_factory: SQLAlchemy sessionmaker or engine for creating sessions
+            tenant_id: Tenant ID for multi-tenancy
+            app_id: Optional app ID for filtering by application
+            batch_size: Number of buffered rows that triggers a flush, and rows written per statement
+        """
+        super().__init__(session_factory=session_factory, tenant_id=tenant_id, app_id=app_id)
+        self._batch_size = batch_size
+        self._buffer: dict[str, dict[str, Any]] = {}
+        self._buffer_lock = threading.Lock()
+        # held while writing, so buffered rows of an execution reach the database in the order they were buffered
+        self._flush_lock = threading.Lock()
+
+    def save(self, execution: WorkflowNodeExecution) -> None:
+        """
+        Buffer a new WorkflowNodeExecution instance.
+
+        Args:
+            execution: The WorkflowNodeExecution instance to save
+        """
+        self._buffer_execution(execution)
+
+    def update(self, execution: WorkflowNodeExecution) -> None:
+        """
+        Buffer the changes of an existing WorkflowNodeExecution instance.
+
+        Args:
+            execution: The WorkflowNodeExecution instance to update
+        """
+        self._buffer_execution(execution)
+
+    def flush(self) -> None:
+        """
+        Write all buffered WorkflowNodeExecution rows and commit them.
+
+        Rows that could not be written stay buffered and the error is raised.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                rows = list(self._buffer.values())
+                self._buffer = {}
+            if not rows:
+                return
+
+            try:
+                self._write_rows(rows)
+            except Exception:
+                with self._buffer_lock:
+                    # keep rows buffered after this flush started, they are newer
+                    self._buffer = {**{row["id"]: row for row in rows}, **self._buffer}
+                raise
+
+    def get_by_node_execution_id(self, node_execution_id: str) -> Optional[WorkflowNodeExecution]:
+        self.flush()
+        return super().get_by_node_execution_id(node_execution_id)
+
+    def get_by_workflow_run(
+        self,
+        workflow_run_id: str,
+        order_config: Optional[OrderConfig] = None,
+    ) -> Sequence[WorkflowNodeExecution]:
+        self.flush()
+        return super().get_by_workflow_run(workflow_run_id, order_config)
+
+    def get_running_executions(self, workflow_run_id: str) -> Sequence[WorkflowNodeExecution]:
+        self.flush()
+        return super().get_running_executions(workflow_run_id)
+
+    def clear(self) -> None:
+        with self._flush_lock, self._buffer_lock:
+            self._buffer = {}
+        super().clear()
+
+    @property
+    def buffered_count(self) -> int:
+        return len(self._buffer)
+
+    def _buffer_execution(self, execution: WorkflowNodeExecution) -> None:
+        # Ensure tenant_id is set
+        if not execution.tenant_id:
+            execution.tenant_id = self._tenant_id
+
+        # Set app_id if provided and not already set
+        if self._app_id and not execution.app_id:
+            execution.app_id = self._app_id
+
+        if not execution.id:
+            execution.id = str(uuid4())
+
+        # copy the values now, the caller keeps changing the instance while it is buffered
+        row = {key: getattr(execution, key) for key in _COLUMN_KEYS}
+        if row["elapsed_time"] is None:
+            row["elapsed_time"] = 0
+
+        with self._buffer_lock:
+            self._buffer[execution.id] = row
+            buffered_count = len(self._buffer)
+
+        if buffered_count >= self._batch_size * 2:
+            self.flush()
+        else:
+            write_behind_flusher.schedule(self, immediately=buffered_count >= self._batch_size)
+
+    def _write_rows(self, rows: list[dict[str, Any]]) -> None:
+        with self._session_factory() as session:
+            for i in range(0, len(rows), self._batch_size):
+                stmt = insert(WorkflowNodeExecution).values(rows[i : i + self._batch_size])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={key: stmt.excluded[key] for key in _COLUMN_KEYS if key != "id"},
+                )
+                session.execute(stmt)
+            session.commit()
+
+
+class WriteBehindFlusher:
+    """
+    Process-wide background thread flushing the buffers of write-behind repositories.
+    """
+
+    def __init__(self, flush_interval: float = 1.0) -> None:
+        self.flush_interval = flush_interval
+        self._condition = threading.Condition()
+        # repositories with buffered rows, kept alive until their rows are written
+        self._repositories: set[WriteBehindWorkflowNodeExecutionRepository] = set()
+        self._flush_requested = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def schedule(self, repository: WriteBehindWorkflowNodeExecutionRepository, immediately: bool = False) -> None:
+        """
+        Flush the repository with the next flush, or right away.
+        """
+        with self._condition:
+            self._ensure_started()
+            self._repositories.add(repository)
+            if immediately:
+                self._flush_requested = True
+                self._condition.notify()
+
+    def _ensure_started(self) -> None:
+        # threads don't survive a fork, so a forked process starts its own flusher
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="workflow-node-execution-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._flush_requested:
+                    self._condition.wait(timeout=self.flush_interval)
+                self._flush_requested = False
+                repositories = list(self._repositories)
+                self._repositories.clear()
+
+            for repository in repositories:
+                try:
+                    repository.flush()
+                except Exception:
+                    logger.exception("Failed to flush workflow node executions, retrying with the next flush")
+                if repository.buffered_count:
+                    with self._condition:
+                        self._repositories.add(repository)
+
+
+write_behind_flusher = WriteBehindFlusher(
+    flush_interval=dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_FLUSH_INTERVAL
+)
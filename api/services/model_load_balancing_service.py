@@ -8,6 +8,7 @@ from constants import HIDDEN_VALUE
 from core.entities.provider_configuration import ProviderConfiguration
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_configurations_cache import provider_configurations_cache
 from core.model_manager import LBModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
@@ -46,6 +47,7 @@ class ModelLoadBalancingService:
 
         # Enable model load balancing
         provider_configuration.enable_model_load_balancing(model=model, model_type=ModelType.value_of(model_type))
+        provider_configurations_cache.invalidate(tenant_id)
 
     def disable_model_load_balancing(self, tenant_id: str, provider: str, model: str, model_type: str) -> None:
         """
@@ -67,6 +69,7 @@ class ModelLoadBalancingService:
 
         # disable model load balancing
         provider_configuration.disable_model_load_balancing(model=model, model_type=ModelType.value_of(model_type))
+        provider_configurations_cache.invalidate(tenant_id)
 
     def get_load_balancing_configs(
         self, tenant_id: str, provider: str, model: str, model_type: str
@@ -276,6 +279,7 @@ class ModelLoadBalancingService:
         )
         db.session.add(inherit_config)
         db.session.commit()
+        provider_configurations_cache.invalidate(tenant_id)
 
         return inherit_config
 
@@ -291,6 +295,15 @@ class ModelLoadBalancingService:
         :param configs: load balancing configs
         :return:
         """
+        try:
+            self._update_load_balancing_configs(tenant_id, provider, model, model_type, configs)
+        finally:
+            # configs are committed one by one, so even a failed update may have changed some of them
+            provider_configurations_cache.invalidate(tenant_id)
+
+    def _update_load_balancing_configs(
+        self, tenant_id: str, provider: str, model: str, model_type: str, configs: list[dict]
+    ) -> None:
         # Get all provider configurations of the current workspace
         provider_configurations = self.provider_manager.get_configurations(tenant_id)
 
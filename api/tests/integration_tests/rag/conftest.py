@@ -0,0 +1,66 @@
+import uuid
+
+import pytest
+from flask import Flask
+
+from configs import dify_config
+from extensions.ext_database import db
+from models.dataset import (
+    ChildChunk,
+    Dataset,
+    DatasetKeywordFrequency,
+    DatasetKeywordPosting,
+    DatasetKeywordStatistics,
+    DatasetKeywordTable,
+    DocumentSegment,
+)
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    """
+    Flask app bound to a disposable schema of the configured Postgres, holding the dataset tables.
+
+    The schema is dropped when the session ends, so the tests never touch the tables of the database itself.
+    """
+    schema = f"test_{uuid.uuid4().hex}"
+    engine_options = dict(dify_config.SQLALCHEMY_ENGINE_OPTIONS)
+    engine_options["connect_args"] = {"options": f"-c timezone=UTC -c search_path={schema}"}
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = dify_config.SQLALCHEMY_DATABASE_URI
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
+    db.init_app(app)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(db.text(f"CREATE SCHEMA {schema}"))
+        try:
+            with db.engine.begin() as connection:
+                # server defaults of the models call uuid_generate_v4() of the uuid-ossp extension
+                connection.execute(
+                    db.text(
+                        f"CREATE FUNCTION {schema}.uuid_generate_v4() RETURNS uuid"
+                        " AS 'SELECT gen_random_uuid()' LANGUAGE sql"
+                    )
+                )
+            db.metadata.create_all(
+                db.engine,
+                tables=[
+                    model.__table__
+                    for model in (
+                        Dataset,
+                        DocumentSegment,
+                        ChildChunk,
+                        DatasetKeywordTable,
+                        DatasetKeywordPosting,
+                        DatasetKeywordStatistics,
+                        DatasetKeywordFrequency,
+                    )
+                ],
+            )
+            yield app
+        finally:
+            db.session.remove()
+            with db.engine.begin() as connection:
+                connection.execute(db.text(f"DROP SCHEMA {schema} CASCADE"))
+            db.engine.dispose()
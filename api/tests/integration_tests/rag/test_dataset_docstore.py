@@ -0,0 +1,59 @@
+import time
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs import dify_config
+from core.rag.docstore.dataset_docstore import DatasetDocumentStore
+from core.rag.models.document import ChildDocument, Document
+from extensions.ext_database import db
+from models.dataset import ChildChunk, DocumentSegment
+
+
+def _docs(count: int) -> list[Document]:
+    return [
+        Document(
+            page_content=f"segment {i} " * 50,
+            metadata={"doc_id": str(uuid.uuid4()), "doc_hash": f"hash-{i}"},
+            children=[
+                ChildDocument(page_content=f"child {i}-{j}", metadata={"doc_id": str(uuid.uuid4()), "doc_hash": "hash"})
+                for j in range(3)
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def _add_documents(docs: list[Document]) -> float:
+    document_id = str(uuid.uuid4())
+    dataset = MagicMock(id=str(uuid.uuid4()), tenant_id=str(uuid.uuid4()), indexing_technique="economy")
+    doc_store = DatasetDocumentStore(dataset=dataset, user_id=str(uuid.uuid4()), document_id=document_id)
+
+    start = time.perf_counter()
+    doc_store.add_documents(docs, save_child=True)
+    elapsed = time.perf_counter() - start
+
+    assert db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).count() == len(docs)
+    assert db.session.query(ChildChunk).filter(ChildChunk.document_id == document_id).count() == len(docs) * 3
+    db.session.query(ChildChunk).filter(ChildChunk.document_id == document_id).delete()
+    db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).delete()
+    db.session.commit()
+    return elapsed
+
+
+@pytest.mark.parametrize("bulk_insert", [False, True])
+def test_add_documents_saves_segments_and_child_chunks(flask_app, monkeypatch, bulk_insert):
+    monkeypatch.setattr(dify_config, "DATASET_DOCSTORE_BULK_INSERT_ENABLED", bulk_insert)
+
+    _add_documents(_docs(20))
+
+
+@pytest.mark.benchmark
+def test_bulk_add_documents_benchmark(flask_app, monkeypatch, record_property):
+    docs_count = 2000
+
+    monkeypatch.setattr(dify_config, "DATASET_DOCSTORE_BULK_INSERT_ENABLED", False)
+    record_property("per_document_seconds", _add_documents(_docs(docs_count)))
+    monkeypatch.setattr(dify_config, "DATASET_DOCSTORE_BULK_INSERT_ENABLED", True)
+    record_property("bulk_seconds", _add_documents(_docs(docs_count)))
@@ -0,0 +1,237 @@
+import math
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs import dify_config
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+from core.rag.datasource.keyword.jieba.jieba_inverted_index import JiebaInvertedIndex
+from core.rag.datasource.keyword.keyword_type import KeyWordType
+from core.rag.models.document import Document
+from core.rag.rerank.entity.weight import KeywordSetting, VectorSetting, Weights
+from core.rag.rerank.weight_rerank import WeightRerankRunner
+from extensions.ext_database import db
+from models.dataset import (
+    Dataset,
+    DatasetKeywordFrequency,
+    DatasetKeywordPosting,
+    DatasetKeywordStatistics,
+    DatasetKeywordTable,
+    DocumentSegment,
+)
+
+CONTENTS = {
+    "node-apple": "apple apple apple pie recipe",
+    "node-banana": "banana bread with a little apple",
+    "node-cherry": "cherry jam",
+}
+
+
+@pytest.fixture
+def dataset(flask_app, monkeypatch):
+    monkeypatch.setattr("core.rag.datasource.keyword.jieba.jieba.redis_client", MagicMock())
+    monkeypatch.setattr("core.rag.datasource.keyword.jieba.jieba_inverted_index.redis_client", MagicMock())
+
+    dataset = Dataset(tenant_id=str(uuid.uuid4()), name="keywords", created_by=str(uuid.uuid4()))
+    db.session.add(dataset)
+    db.session.flush()
+    document_id = str(uuid.uuid4())
+    for position, (node_id, content) in enumerate(CONTENTS.items()):
+        db.session.add(
+            DocumentSegment(
+                tenant_id=dataset.tenant_id,
+                dataset_id=dataset.id,
+                document_id=document_id,
+                position=position,
+                content=content,
+                word_count=len(content),
+                tokens=len(content.split()),
+                index_node_id=node_id,
+                created_by=dataset.created_by,
+            )
+        )
+    db.session.commit()
+    yield dataset
+
+    for model in (
+        DocumentSegment,
+        DatasetKeywordTable,
+        DatasetKeywordPosting,
+        DatasetKeywordStatistics,
+        DatasetKeywordFrequency,
+    ):
+        db.session.query(model).filter(model.dataset_id == dataset.id).delete()
+    db.session.query(Dataset).filter(Dataset.id == dataset.id).delete()
+    db.session.commit()
+
+
+def _documents() -> list[Document]:
+    return [Document(page_content=content, metadata={"doc_id": node_id}) for node_id, content in CONTENTS.items()]
+
+
+def _statistics(dataset: Dataset) -> DatasetKeywordStatistics:
+    return db.session.query(DatasetKeywordStatistics).filter(DatasetKeywordStatistics.dataset_id == dataset.id).one()
+
+
+def _posting_count(dataset: Dataset) -> int:
+    return db.session.query(DatasetKeywordPosting).filter(DatasetKeywordPosting.dataset_id == dataset.id).count()
+
+
+def test_create_and_search(dataset):
+    keyword = JiebaInvertedIndex(dataset)
+    keyword.create(_documents())
+
+    documents = keyword.search("apple", top_k=4)
+
+    assert [document.metadata["doc_id"] for document in documents] == ["node-apple", "node-banana"]
+    assert documents[0].page_content == CONTENTS["node-apple"]
+    assert keyword.text_exists("node-cherry")
+    segment_keywords = (
+        db.session.query(DocumentSegment.keywords)
+        .filter(DocumentSegment.dataset_id == dataset.id, DocumentSegment.index_node_id == "node-cherry")
+        .scalar()
+    )
+    assert "cherry" in segment_keywords
+
+
+def test_add_texts_replaces_postings(dataset):
+    keyword = JiebaInvertedIndex(dataset)
+    keyword.add_texts(_documents(), keywords_list=[["apple"], ["banana"], ["cherry"]])
+    keyword.add_texts(_documents()[:1], keywords_list=[["pie"]])
+
+    assert _posting_count(dataset) == 3
+    assert _statistics(dataset).document_count == 3
+    assert [document.metadata["doc_id"] for document in keyword.search("pie")] == ["node-apple"]
+    assert keyword.search("cherry")[0].metadata["doc_id"] == "node-cherry"
+
+
+def _document_frequencies(dataset: Dataset) -> dict[str, int]:
+    return dict(
+        db.session.query(DatasetKeywordFrequency.keyword, DatasetKeywordFrequency.document_frequency)
+        .filter(DatasetKeywordFrequency.dataset_id == dataset.id)
+        .all()
+    )
+
+
+def test_document_frequencies_are_maintained(dataset):
+    keyword = JiebaInvertedIndex(dataset)
+    keyword.add_texts(_documents(), keywords_list=[["apple", "pie"], ["apple", "banana"], ["cherry"]])
+
+    assert _document_frequencies(dataset) == {"apple": 2, "pie": 1, "banana": 1, "cherry": 1}
+
+    keyword.add_texts(_documents()[:1], keywords_list=[["apple", "recipe"]])
+    keyword.delete_by_ids(["node-banana"])
+
+    assert _document_frequencies(dataset) == {"apple": 1, "recipe": 1, "cherry": 1}
+
+    keyword.delete()
+
+    assert _document_frequencies(dataset) == {}
+
+
+def test_bm25_scores_are_ranked_in_the_database(dataset):
+    keyword = JiebaInvertedIndex(dataset)
+    keyword.add_texts(_documents(), keywords_list=[["apple", "pie"], ["apple", "banana"], ["cherry"]])
+
+    scores = JiebaInvertedIndex.get_bm25_scores(dataset.id, ["apple", "banana", "missing"])
+
+    # Okapi BM25 with k1=1.2, b=0.75 over the 3 indexed chunks
+    statistics = _statistics(dataset)
+    document_frequencies = {"apple": 2, "banana": 1}
+    expected: dict[str, float] = {}
+    for posting in db.session.query(DatasetKeywordPosting).filter(
+        DatasetKeywordPosting.dataset_id == dataset.id,
+        DatasetKeywordPosting.keyword.in_(list(document_frequencies)),
+    ):
+        df = document_frequencies[posting.keyword]
+        idf = math.log(1 + (statistics.document_count - df + 0.5) / (df + 0.5))
+        norm = 1.2 * (1 - 0.75 + 0.75 * posting.document_length / statistics.average_document_length)
+        weight = idf * posting.term_frequency * 2.2 / (posting.term_frequency + norm)
+        expected[posting.index_node_id] = expected.get(posting.index_node_id, 0.0) + weight
+    assert set(expected) == {"node-apple", "node-banana"}
+    assert list(scores) == sorted(expected, key=lambda node_id: -expected[node_id])
+    assert scores == pytest.approx(expected)
+
+    top_scores = JiebaInvertedIndex.get_bm25_scores(dataset.id, ["apple", "banana"], top_k=1)
+    assert list(top_scores) == ["node-banana"]
+    assert JiebaInvertedIndex.get_bm25_scores(dataset.id, ["missing"]) == {}
+
+
+def test_delete_by_ids_and_delete(dataset):
+    keyword = JiebaInvertedIndex(dataset)
+    keyword.create(_documents())
+
+    keyword.delete_by_ids(["node-apple"])
+
+    assert not keyword.text_exists("node-apple")
+    assert [document.metadata["doc_id"] for document in keyword.search("apple")] == ["node-banana"]
+    assert _statistics(dataset).document_count == 2
+
+    keyword.delete()
+
+    assert _posting_count(dataset) == 0
+    assert keyword.search("banana") == []
+
+
+def test_migrate_keeps_keyword_table_until_dropped(dataset):
+    Jieba(dataset).create(_documents())
+    keyword = JiebaInvertedIndex(dataset)
+
+    assert keyword.migrate_from_keyword_table() > 0
+
+    # the jieba keyword store keeps working until the table is dropped explicitly
+    assert dataset.dataset_keyword_table is not None
+    assert Jieba(dataset).search("cherry")[0].metadata["doc_id"] == "node-cherry"
+    assert keyword.search("apple")[0].metadata["doc_id"] == "node-apple"
+    assert _statistics(dataset).document_count == 3
+
+    # migrating again doesn't count the segments twice
+    keyword.migrate_from_keyword_table()
+    assert _statistics(dataset).document_count == 3
+
+    assert keyword.drop_keyword_table()
+    assert dataset.dataset_keyword_table is None
+    assert keyword.search("apple")[0].metadata["doc_id"] == "node-apple"
+
+
+def test_drop_keeps_unmigrated_keyword_table(dataset):
+    Jieba(dataset).create(_documents())
+
+    assert not JiebaInvertedIndex(dataset).drop_keyword_table()
+    assert dataset.dataset_keyword_table is not None
+
+
+def test_weight_rerank_falls_back_to_tfidf_for_unindexed_chunks(dataset, monkeypatch):
+    monkeypatch.setattr(dify_config, "KEYWORD_STORE", KeyWordType.JIEBA_INVERTED_INDEX)
+    JiebaInvertedIndex(dataset).add_texts(
+        _documents(), keywords_list=[["apple", "pie"], ["apple", "banana"], ["cherry"]]
+    )
+    # e.g. child chunks of a parent-child dataset, which have no postings
+    unindexed_dataset_id = str(uuid.uuid4())
+    candidates = [
+        Document(page_content=content, metadata={"doc_id": node_id, "dataset_id": dataset.id, "score": 0.0})
+        for node_id, content in CONTENTS.items()
+    ] + [
+        Document(
+            page_content=content, metadata={"doc_id": f"child-{i}", "dataset_id": unindexed_dataset_id, "score": 0.0}
+        )
+        for i, content in enumerate(["apple tart", "plum cake"])
+    ]
+    weights = Weights(
+        vector_setting=VectorSetting(vector_weight=0.0, embedding_provider_name="", embedding_model_name=""),
+        keyword_setting=KeywordSetting(keyword_weight=1.0),
+    )
+
+    documents = WeightRerankRunner(dataset.tenant_id, weights).run("apple", candidates)
+
+    documents_by_id = {document.metadata["doc_id"]: document for document in documents}
+    scores = {node_id: document.metadata["score"] for node_id, document in documents_by_id.items()}
+    assert scores["node-apple"] == pytest.approx(1.0)
+    assert 0.0 < scores["node-banana"] < 1.0
+    assert scores["node-cherry"] == 0.0
+    assert scores["child-0"] > 0.0
+    assert scores["child-1"] == 0.0
+    # only the unindexed candidates had their keywords extracted
+    assert "keywords" in documents_by_id["child-0"].metadata
+    assert "keywords" not in documents_by_id["node-apple"].metadata
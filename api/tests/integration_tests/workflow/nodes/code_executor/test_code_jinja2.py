@@ -1,6 +1,10 @@
 import base64
+import time
+
+import pytest
 
 from core.helper.code_executor.code_executor import CodeExecutor, CodeLanguage
+from core.helper.code_executor.jinja2.jinja2_native_renderer import Jinja2NativeRenderer
 from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
 
 CODE_LANGUAGE = CodeLanguage.JINJA2
@@ -32,3 +36,46 @@ def test_jinja2_get_runner_script():
     assert runner_script.count(Jinja2TemplateTransformer._code_placeholder) == 1
     assert runner_script.count(Jinja2TemplateTransformer._inputs_placeholder) == 1
     assert runner_script.count(Jinja2TemplateTransformer._result_tag) == 2
+
+
+_PROMPT_TEMPLATE = (
+    "You are a helpful assistant.\n"
+    '{% for doc in documents %}<doc id="{{ loop.index }}">{{ doc.content }}</doc>\n{% endfor %}'
+    "Answer the question of {{ user.name }}: {{ query }}"
+)
+_PROMPT_INPUTS = {
+    "documents": [{"content": f"document {i} " * 20} for i in range(5)],
+    "user": {"name": "Alice"},
+    "query": "What is Dify?",
+}
+
+
+def test_jinja2_native_rendering_matches_sandbox():
+    renderer = Jinja2NativeRenderer(capacity=8, max_output_length=100000, timeout=5.0)
+
+    sandbox_result = CodeExecutor.execute_workflow_code_template(
+        language=CODE_LANGUAGE, code=_PROMPT_TEMPLATE, inputs=_PROMPT_INPUTS
+    )
+
+    assert renderer.render(_PROMPT_TEMPLATE, _PROMPT_INPUTS) == sandbox_result["result"]
+
+
+@pytest.mark.benchmark
+def test_jinja2_native_rendering_benchmark(record_property):
+    renderer = Jinja2NativeRenderer(capacity=8, max_output_length=100000, timeout=5.0)
+    rounds = 20
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        CodeExecutor.execute_workflow_code_template(
+            language=CODE_LANGUAGE, code=_PROMPT_TEMPLATE, inputs=_PROMPT_INPUTS
+        )
+    sandbox_elapsed = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        renderer.render(_PROMPT_TEMPLATE, _PROMPT_INPUTS)
+    native_elapsed = (time.perf_counter() - start) / rounds
+
+    record_property("sandbox_ms", sandbox_elapsed * 1000)
+    record_property("native_ms", native_elapsed * 1000)
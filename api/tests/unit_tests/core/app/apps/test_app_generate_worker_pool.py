@@ -0,0 +1,136 @@
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.app.apps.app_generate_worker_pool import AppGenerateWorkerPool, nested_app_generation
+
+
+def test_submit_runs_target_with_kwargs():
+    pool = AppGenerateWorkerPool(max_workers=2)
+    results: queue.Queue = queue.Queue()
+
+    pool.submit(lambda a, b: results.put(a + b), a=1, b=2)
+
+    assert results.get(timeout=5) == 3
+
+
+def test_unbounded_pool_uses_dedicated_threads():
+    pool = AppGenerateWorkerPool(max_workers=0)
+    names: queue.Queue = queue.Queue()
+
+    pool.submit(lambda: names.put(threading.current_thread().name))
+
+    assert not names.get(timeout=5).startswith("app_generate_worker")
+
+
+def test_submit_limits_running_workers():
+    pool = AppGenerateWorkerPool(max_workers=2)
+    release = threading.Event()
+    started: queue.Queue = queue.Queue()
+
+    def work(i: int) -> None:
+        started.put(i)
+        release.wait(timeout=5)
+
+    for i in range(5):
+        pool.submit(work, i=i)
+
+    assert {started.get(timeout=5), started.get(timeout=5)} == {0, 1}
+    assert pool.active_workers == 2
+    assert pool.queue_depth == 3
+    release.set()
+    assert sorted(started.get(timeout=5) for _ in range(3)) == [2, 3, 4]
+
+
+def test_failing_target_does_not_stop_pool():
+    pool = AppGenerateWorkerPool(max_workers=1)
+    results: queue.Queue = queue.Queue()
+
+    def fail() -> None:
+        raise RuntimeError("generate failed")
+
+    pool.submit(fail)
+    pool.submit(lambda: results.put("ok"))
+
+    assert results.get(timeout=5) == "ok"
+
+
+def test_nested_generation_does_not_deadlock_saturated_pool():
+    pool = AppGenerateWorkerPool(max_workers=1)
+    child_results: queue.Queue = queue.Queue()
+    parent_results: queue.Queue = queue.Queue()
+
+    def child() -> None:
+        child_results.put("child")
+
+    def branch() -> None:
+        pool.submit(child)
+
+    def parent(in_branch: bool) -> None:
+        # like a workflow tool, directly or in a parallel branch that copies the context, waiting for its app
+        if in_branch:
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=context.run, args=(branch,))
+            thread.start()
+            thread.join()
+        else:
+            pool.submit(child)
+        parent_results.put(child_results.get(timeout=5))
+
+    pool.submit(parent, in_branch=False)
+    assert parent_results.get(timeout=10) == "child"
+    pool.submit(parent, in_branch=True)
+    assert parent_results.get(timeout=10) == "child"
+
+
+def test_nested_app_generation_uses_dedicated_thread():
+    pool = AppGenerateWorkerPool(max_workers=1)
+    release = threading.Event()
+    names: queue.Queue = queue.Queue()
+
+    pool.submit(release.wait, timeout=5)
+    with nested_app_generation():
+        pool.submit(lambda: names.put(threading.current_thread().name))
+
+    assert not names.get(timeout=5).startswith("app_generate_worker")
+    assert pool.queue_depth == 0
+    release.set()
+
+
+@pytest.mark.parametrize("stream_count", [50, pytest.param(1000, marks=pytest.mark.benchmark)])
+def test_concurrent_streams_per_worker(stream_count, record_property):
+    """
+    Every stream waits on its own queue, the way a task pipeline listens on its queue manager, while a few pool
+    workers generate the chunks of all streams.
+    """
+    max_workers = 8
+    chunk_count = 20
+    pool = AppGenerateWorkerPool(max_workers=max_workers)
+    streams: list[queue.Queue] = [queue.Queue() for _ in range(stream_count)]
+
+    def generate(q: queue.Queue) -> None:
+        for i in range(chunk_count):
+            q.put(i)
+            time.sleep(0.001)
+        q.put(None)
+
+    def listen(q: queue.Queue) -> int:
+        received = 0
+        while q.get(timeout=60) is not None:
+            received += 1
+        return received
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=stream_count) as listeners:
+        futures = [listeners.submit(listen, q) for q in streams]
+        for q in streams:
+            pool.submit(generate, q=q)
+        received = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    assert received == [chunk_count] * stream_count
+    record_property("chunks_per_second", stream_count * chunk_count / elapsed)
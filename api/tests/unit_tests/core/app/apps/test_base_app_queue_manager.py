@@ -0,0 +1,151 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from configs import dify_config
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import (
+    QueueLLMChunkEvent,
+    QueueStopEvent,
+    QueueTextChunkEvent,
+    QueueWorkflowSucceededEvent,
+)
+from core.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta
+from core.model_runtime.entities.message_entities import AssistantPromptMessage
+
+
+@pytest.fixture
+def mock_redis(monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_QUEUE_STOP_SIGNAL_PUBSUB_ENABLED", False)
+    with patch("core.app.apps.base_app_queue_manager.redis_client", new=MagicMock()) as redis_client:
+        redis_client.get.return_value = None
+        yield redis_client
+
+
+def _queue_manager() -> WorkflowAppQueueManager:
+    return WorkflowAppQueueManager(
+        task_id="task-id", user_id="user-id", invoke_from=InvokeFrom.SERVICE_API, app_mode="workflow"
+    )
+
+
+def _llm_chunk(content: str, finish_reason: str | None = None) -> QueueLLMChunkEvent:
+    return QueueLLMChunkEvent(
+        chunk=LLMResultChunk(
+            model="model",
+            delta=LLMResultChunkDelta(
+                index=0, message=AssistantPromptMessage(content=content), finish_reason=finish_reason
+            ),
+        )
+    )
+
+
+def test_stop_flag_check_is_throttled(mock_redis, monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_QUEUE_STOP_FLAG_CHECK_INTERVAL", 60)
+    queue_manager = _queue_manager()
+
+    for _ in range(100):
+        queue_manager.publish(QueueTextChunkEvent(text="a"), PublishFrom.APPLICATION_MANAGER)
+
+    assert mock_redis.get.call_count == 1
+
+
+def test_stop_flag_is_sticky(mock_redis, monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_QUEUE_STOP_FLAG_CHECK_INTERVAL", 0)
+    queue_manager = _queue_manager()
+
+    mock_redis.get.return_value = b"1"
+    assert queue_manager._is_stopped()
+    mock_redis.get.return_value = None
+    assert queue_manager._is_stopped()
+    assert mock_redis.get.call_count == 1
+
+
+def test_stop_signal_skips_stop_flag_polling(mock_redis, monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_QUEUE_STOP_SIGNAL_PUBSUB_ENABLED", True)
+    monkeypatch.setattr(dify_config, "APP_QUEUE_STOP_FLAG_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(dify_config, "APP_QUEUE_STOP_FLAG_FALLBACK_CHECK_INTERVAL", 60)
+    listener = MagicMock(subscribed=True)
+    listener.register.return_value = threading.Event()
+    monkeypatch.setattr("core.app.apps.base_app_queue_manager.task_stop_listener", listener)
+    queue_manager = _queue_manager()
+
+    for _ in range(100):
+        assert not queue_manager._is_stopped()
+    assert mock_redis.get.call_count == 1
+
+    listener.register.return_value.set()
+    assert queue_manager._is_stopped()
+    assert mock_redis.get.call_count == 1
+
+
+def test_publish_rejects_sqlalchemy_models(mock_redis):
+    queue_manager = _queue_manager()
+    event = MagicMock()
+    event.model_dump.return_value = {"outputs": [MagicMock(_sa_instance_state=object())]}
+
+    with pytest.raises(TypeError, match="SQLAlchemy Model"):
+        queue_manager.publish(event, PublishFrom.TASK_PIPELINE)
+
+
+def test_listen_coalesces_chunks(mock_redis, monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_QUEUE_CHUNK_COALESCING_ENABLED", True)
+    queue_manager = _queue_manager()
+
+    for text in ["Hello", ", ", "world"]:
+        queue_manager.publish(QueueTextChunkEvent(text=text), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(
+        QueueTextChunkEvent(text="!", from_variable_selector=["llm", "text"]), PublishFrom.APPLICATION_MANAGER
+    )
+    for content, finish_reason in [("a", None), ("b", "stop"), ("c", None)]:
+        queue_manager.publish(_llm_chunk(content, finish_reason), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(QueueWorkflowSucceededEvent(outputs={}), PublishFrom.APPLICATION_MANAGER)
+
+    events = [message.event for message in queue_manager.listen()]
+
+    assert [type(event) for event in events] == [
+        QueueTextChunkEvent,
+        QueueTextChunkEvent,
+        QueueLLMChunkEvent,
+        QueueLLMChunkEvent,
+        QueueWorkflowSucceededEvent,
+    ]
+    assert events[0].text == "Hello, world"
+    assert events[1].text == "!"
+    assert events[2].chunk.delta.message.content == "ab"
+    assert events[2].chunk.delta.finish_reason == "stop"
+    assert events[3].chunk.delta.message.content == "c"
+
+
+def test_listen_without_coalescing_keeps_chunks(mock_redis, monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_QUEUE_CHUNK_COALESCING_ENABLED", False)
+    queue_manager = _queue_manager()
+
+    for text in ["a", "b", "c"]:
+        queue_manager.publish(QueueTextChunkEvent(text=text), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE)
+
+    events = [message.event for message in queue_manager.listen()]
+
+    assert [event.text for event in events[:3]] == ["a", "b", "c"]
+    assert isinstance(events[3], QueueStopEvent)
+
+
+def test_publish_delivers_every_chunk_in_order(mock_redis, monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_QUEUE_CHUNK_COALESCING_ENABLED", False)
+    monkeypatch.setattr(dify_config, "APP_QUEUE_STOP_FLAG_CHECK_INTERVAL", 60)
+    queue_manager = _queue_manager()
+    rounds = 1000
+
+    for index in range(rounds):
+        queue_manager.publish(_llm_chunk(str(index)), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(QueueStopEvent(stopped_by=QueueStopEvent.StopBy.USER_MANUAL), PublishFrom.TASK_PIPELINE)
+
+    events = [message.event for message in queue_manager.listen()]
+
+    assert [event.chunk.delta.message.content for event in events[:rounds]] == [str(i) for i in range(rounds)]
+    assert isinstance(events[rounds], QueueStopEvent)
+    assert len(events) == rounds + 1
+    assert mock_redis.get.call_count == 1
@@ -0,0 +1,67 @@
+import queue
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.app.apps.task_stop_listener import TaskStopListener
+
+
+class _FakePubSub:
+    def __init__(self, messages: queue.Queue):
+        self._messages = messages
+        self.subscribed = threading.Event()
+
+    def subscribe(self, channel):
+        self.subscribed.set()
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pubsub():
+    messages: queue.Queue = queue.Queue()
+    fake_pubsub = _FakePubSub(messages)
+    with patch("core.app.apps.task_stop_listener.redis_client", new=MagicMock()) as redis_client:
+        redis_client.pubsub.return_value = fake_pubsub
+        redis_client.publish.side_effect = lambda channel, data: messages.put(
+            {"type": "message", "channel": channel, "data": data.encode()}
+        )
+        yield fake_pubsub
+
+
+def test_notify_sets_event_of_local_task(pubsub):
+    listener = TaskStopListener()
+    event = listener.register("task-1")
+    other_event = listener.register("task-2")
+    assert pubsub.subscribed.wait(timeout=5)
+    assert listener.subscribed
+
+    listener.notify("task-1")
+
+    assert event.wait(timeout=5)
+    assert not other_event.is_set()
+
+
+def test_register_starts_one_thread(pubsub):
+    listener = TaskStopListener()
+    with patch("core.app.apps.task_stop_listener.threading.Thread") as thread_cls:
+        thread_cls.return_value = MagicMock()
+        events = [listener.register(f"task-{i}") for i in range(10)]
+
+    assert thread_cls.call_count == 1
+    assert len(events) == 10
+
+
+def test_unreferenced_tasks_are_released(pubsub):
+    listener = TaskStopListener()
+    listener.register("task-1")
+
+    assert "task-1" not in listener._events
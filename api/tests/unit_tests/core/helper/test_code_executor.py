@@ -0,0 +1,64 @@
+import json
+import re
+import threading
+from base64 import b64decode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from configs import dify_config
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+
+
+class _SandboxHandler(BaseHTTPRequestHandler):
+    """Stand-in for the sandbox run endpoint, echoing the inputs of python3 template runs."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802
+        self.server.connections.add(self.client_address)  # type: ignore[attr-defined]
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        inputs = re.search(r"b64decode\('([^']*)'\)", body["code"])
+        if inputs is None:
+            response = {"code": 0, "message": "success", "data": {"error": "invalid code"}}
+        else:
+            result = json.loads(b64decode(inputs.group(1)))
+            stdout = f"<<RESULT>>{json.dumps(result)}<<RESULT>>"
+            response = {"code": 0, "message": "success", "data": {"stdout": stdout}}
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def sandbox(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SandboxHandler)
+    server.connections = set()  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(dify_config, "CODE_EXECUTION_ENDPOINT", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(CodeExecutor, "_http_client", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_execute_code_reuses_connections(sandbox):
+    for i in range(20):
+        result = CodeExecutor.execute_workflow_code_template(
+            language=CodeLanguage.PYTHON3, code="def main(a): return {'a': a}", inputs={"a": i}
+        )
+        assert result == {"a": i}
+
+    assert len(sandbox.connections) == 1
+
+
+def test_execute_code_error(sandbox):
+    with pytest.raises(CodeExecutionError, match="invalid code"):
+        CodeExecutor.execute_code(language=CodeLanguage.PYTHON3, preload="", code="print(1)")
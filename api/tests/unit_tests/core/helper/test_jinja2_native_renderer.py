@@ -0,0 +1,165 @@
+import tracemalloc
+
+import pytest
+
+from core.helper.code_executor.jinja2.jinja2_native_renderer import Jinja2NativeRenderer, Jinja2RenderError
+
+
+def _renderer(**kwargs) -> Jinja2NativeRenderer:
+    options = {"capacity": 8, "max_output_length": 1000, "timeout": 5.0}
+    options.update(kwargs)
+    return Jinja2NativeRenderer(**options)
+
+
+def test_render():
+    renderer = _renderer()
+    template = "{% for doc in docs %}[{{ loop.index }}] {{ doc.title | upper }}\n{% endfor %}Q: {{ query }}"
+    inputs = {"docs": [{"title": "a"}, {"title": "b"}], "query": "why?"}
+
+    assert renderer.render(template, inputs) == "[1] A\n[2] B\nQ: why?"
+
+
+def test_compiled_templates_are_cached():
+    renderer = _renderer(capacity=2)
+    renderer.render("{{ a }}", {"a": 1})
+    renderer.render("{{ a }}", {"a": 2})
+    renderer.render("{{ b }}", {"b": 1})
+    renderer.render("{{ c }}", {"c": 1})
+
+    assert (renderer.hits, renderer.misses) == (1, 3)
+    assert len(renderer) == 2
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{% include 'other' %}",
+        "{% macro m() %}{{ m() }}{% endmacro %}{{ m() }}",
+        "{% for item in items recursive %}{{ loop(item) }}{% endfor %}",
+        "{{ ''.__class__.__mro__ }}",
+        "line\\n{{ a }}",
+        "{{ a ",
+    ],
+)
+def test_unsafe_templates_fall_back_to_sandbox(template):
+    renderer = _renderer()
+
+    assert renderer.render(template, {"a": 1, "items": []}) is None
+
+
+def test_output_length_limit():
+    renderer = _renderer(max_output_length=10)
+
+    with pytest.raises(Jinja2RenderError, match="Output length exceeds 10"):
+        renderer.render("{% for i in range(100) %}{{ i }}{% endfor %}", {})
+
+
+def test_render_error():
+    renderer = _renderer()
+
+    with pytest.raises(Jinja2RenderError, match="division by zero"):
+        renderer.render("{{ 1 / a }}", {"a": 0})
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{{ 'a' * 100000000 }}",
+        "{{ 100000000 * [1] }}",
+        "{{ (range(10) | list * 10000000) | length }}",
+        "{{ 10 ** 100000000 }}",
+    ],
+)
+def test_unbounded_operations_fall_back_to_sandbox(template):
+    renderer = _renderer()
+
+    assert renderer.render(template, {}) is None
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{{ 'a'.ljust(500000000) }}",
+        "{{ 'a'.rjust(500000000) }}",
+        "{{ 'a'.center(500000000) }}",
+        "{{ 'a'.zfill(500000000) }}",
+        "{{ '\t'.expandtabs(500000000) }}",
+        "{{ '{:500000000}'.format('a') }}",
+        "{{ '{:{w}}'.format('a', w=500000000) }}",
+        "{{ '%500000000s' % 'a' }}",
+        "{{ '%*s' | format(500000000, 'a') }}",
+        "{{ 'a' | center(500000000) }}",
+        "{{ (['a' * 1000000] * 1000) | join }}",
+        "{{ ', '.join(['a' * 1000000] * 1000) }}",
+        "{{ ('a' * 1000000) | replace('a', 'bbbbbbbbbb') }}",
+        "{{ ('a' * 1000000).replace('a', 'bbbbbbbbbb') }}",
+        "{{ ('\n' * 1000000) | indent(1000, blank=true) }}",
+        "{{ ('a ' * 500000) | wordwrap(1, wrapstring='b' * 1000) }}",
+        "{{ (['a' * 1000000] * 1000) | string | length }}",
+        "{{ (['a' * 1000000] * 1000) | tojson | length }}",
+        "{{ ([[0] * 1000000] * 1000) | sum(start=[]) | length }}",
+        "{{ [0] | batch(500000000, 0) | list | length }}",
+        "{{ [0] | slice(500000000) | list | length }}",
+        "{{ (('a' * 1000000) ~ ('a' * 1000000)) | length }}",
+        "{{ (('a' * 1000000) + ('a' * 1000000)) | length }}",
+        "{{ lipsum(1000000) | length }}",
+        "{% set items = [0] * 1000000 %}{{ items.extend(items) }}",
+    ],
+)
+def test_amplifying_operations_fall_back_to_sandbox(template):
+    renderer = _renderer(max_output_length=1000000)
+
+    tracemalloc.start()
+    try:
+        assert renderer.render(template, {}) is None
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 50 * 1024 * 1024
+
+
+def test_long_expression_output_is_rejected_before_it_is_built():
+    renderer = _renderer(max_output_length=1000000)
+
+    with pytest.raises(Jinja2RenderError, match="Output length exceeds 1000000"):
+        renderer.render("{{ ['a' * 1000000] * 1000 }}", {})
+
+
+def test_bounded_string_operations():
+    renderer = _renderer()
+    template = (
+        "{{ 'a'.ljust(3, '.') }}|{{ 'b' | center(5) }}|{{ '{:>4}'.format(1) }}|{{ '%03d' % 7 }}|"
+        "{{ items | join(', ') }}|{{ '-'.join(items) }}|{{ 'aXa' | replace('X', 'yy') }}|{{ a ~ '!' }}|"
+        "{{ 'x\ny' | indent(2) }}|{{ '%s-%s' | format(1, 2) }}|{{ [[1], [2]] | sum(start=[]) }}|{{ items | tojson }}"
+    )
+
+    assert renderer.render(template, {"items": ["p", "q"], "a": 1}) == (
+        'a..|  b  |   1|007|p, q|p-q|ayya|1!|x\n  y|1-2|[1, 2]|["p", "q"]'
+    )
+
+
+def test_bounded_operations():
+    renderer = _renderer()
+
+    assert renderer.render("{{ 'ab' * 2 }} {{ [0] * 2 }} {{ 6 * 7 }} {{ 2 ** 10 }} {{ 1.5 ** 2 }}", {}) == (
+        "abab [0, 0] 42 1024 2.25"
+    )
+
+
+def test_timeout_stops_loops_without_output():
+    renderer = _renderer(timeout=0.2)
+
+    with pytest.raises(Jinja2RenderError, match="exceeded 0.2 seconds"):
+        renderer.render(
+            "{% for a in items %}{% for b in items %}{% endfor %}{% endfor %}", {"items": list(range(100000))}
+        )
+
+
+def test_loops_keep_their_behavior():
+    renderer = _renderer()
+    template = (
+        "{% for a, b in pairs %}{{ a }}{{ b }}{% if loop.last %}/{{ loop.length }}{% endif %}{% endfor %}"
+        "{% for item in items %}{{ item }}{% else %} empty{% endfor %}"
+    )
+
+    assert renderer.render(template, {"pairs": [[1, 2], [3, 4]], "items": []}) == "1234/2 empty"
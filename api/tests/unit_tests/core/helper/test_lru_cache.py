@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+from core.helper.lru_cache import TTLLRUCache
+
+
+def test_ttl_lru_cache_evicts_least_recently_used():
+    cache = TTLLRUCache(capacity=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_ttl_lru_cache_expires_entries():
+    cache = TTLLRUCache(capacity=2, ttl=10)
+    with patch("core.helper.lru_cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1)
+    with patch("core.helper.lru_cache.time.monotonic", return_value=109.0):
+        assert cache.get("a") == 1
+    with patch("core.helper.lru_cache.time.monotonic", return_value=110.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_lru_cache_disabled():
+    cache = TTLLRUCache(capacity=0, ttl=10)
+    cache.put("a", 1)
+    assert cache.get("a") is None
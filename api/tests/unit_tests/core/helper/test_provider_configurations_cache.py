@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, int] = {}
+
+    def get(self, key):
+        value = self.values.get(key)
+        return str(value).encode() if value is not None else None
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+@pytest.fixture
+def fake_redis():
+    redis = _FakeRedis()
+    with patch("core.helper.provider_configurations_cache.redis_client", new=redis):
+        yield redis
+
+
+def test_configurations_are_cached_per_tenant(fake_redis):
+    cache = ProviderConfigurationsCache(capacity=8, ttl=60)
+    load = MagicMock(side_effect=lambda: object())
+
+    first = cache.get_or_load("tenant-1", load)
+    assert cache.get_or_load("tenant-1", load) is first
+    assert cache.get_or_load("tenant-2", load) is not first
+    assert load.call_count == 2
+
+
+def test_invalidate_reloads_in_all_processes(fake_redis):
+    process_1 = ProviderConfigurationsCache(capacity=8, ttl=60)
+    process_2 = ProviderConfigurationsCache(capacity=8, ttl=60)
+    load = MagicMock(side_effect=lambda: object())
+
+    process_1.get_or_load("tenant-1", load)
+    stale = process_2.get_or_load("tenant-1", load)
+    process_1.invalidate("tenant-1")
+
+    assert process_2.get_or_load("tenant-1", load) is not stale
+    assert load.call_count == 3
+
+
+def test_change_during_load_is_not_cached(fake_redis):
+    cache = ProviderConfigurationsCache(capacity=8, ttl=60)
+
+    def load_and_change():
+        cache.invalidate("tenant-1")
+        return object()
+
+    stale = cache.get_or_load("tenant-1", load_and_change)
+
+    assert cache.get_or_load("tenant-1", lambda: object()) is not stale
+
+
+def test_redis_failure_falls_back_to_load():
+    cache = ProviderConfigurationsCache(capacity=8, ttl=60)
+    redis = MagicMock()
+    redis.get.side_effect = ConnectionError
+    load = MagicMock(side_effect=lambda: object())
+
+    with patch("core.helper.provider_configurations_cache.redis_client", new=redis):
+        cache.get_or_load("tenant-1", load)
+        cache.get_or_load("tenant-1", load)
+
+    assert load.call_count == 2
@@ -0,0 +1,47 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.helper.single_flight import SingleFlight
+
+
+def test_single_flight_shares_in_flight_result():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    call_count = 0
+
+    def embed():
+        nonlocal call_count
+        call_count += 1
+        started.set()
+        release.wait(timeout=5)
+        return [0.1, 0.2]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(single_flight.do, "key", embed)
+        started.wait(timeout=5)
+        followers = [executor.submit(single_flight.do, "key", embed) for _ in range(7)]
+        # give the followers time to join the in-flight call before it completes
+        time.sleep(0.2)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert call_count == 1
+    assert all(result == [0.1, 0.2] for result in results)
+    # the finished call is forgotten, the next call runs the function again
+    assert single_flight.do("key", lambda: [0.3]) == [0.3]
+
+
+def test_single_flight_propagates_errors_and_resets():
+    single_flight = SingleFlight()
+
+    def fail():
+        raise ValueError("provider error")
+
+    with pytest.raises(ValueError):
+        single_flight.do("key", fail)
+
+    assert single_flight.do("key", lambda: 1) == 1
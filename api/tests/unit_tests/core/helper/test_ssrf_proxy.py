@@ -1,9 +1,20 @@
+import asyncio
+import os
 import random
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
-from core.helper.ssrf_proxy import SSRF_DEFAULT_MAX_RETRIES, STATUS_FORCELIST, make_request
+from core.helper import ssrf_proxy
+from core.helper.ssrf_proxy import (
+    SSRF_DEFAULT_MAX_RETRIES,
+    STATUS_FORCELIST,
+    get_async_client,
+    get_client,
+    make_request,
+    make_request_async,
+)
 
 
 @patch("httpx.Client.request")
@@ -50,3 +61,95 @@ def test_retry_logic_success(mock_request):
     assert response.status_code == 200
     assert mock_request.call_count == SSRF_DEFAULT_MAX_RETRIES + 1
     assert mock_request.call_args_list[0][1].get("method") == "GET"
+
+
+def test_clients_share_the_pool_per_ssl_verify():
+    assert get_client(ssl_verify=True) is not get_client(ssl_verify=True)
+    assert get_client(ssl_verify=True)._transport is get_client(ssl_verify=True)._transport
+    assert get_client(ssl_verify=True)._transport is not get_client(ssl_verify=False)._transport
+
+
+def test_requests_share_the_pool():
+    with patch.object(httpx.Client, "request", autospec=True) as mock_request:
+        mock_request.return_value = MagicMock(status_code=200)
+
+        make_request("GET", "http://example.com")
+        make_request("GET", "http://example.org", allow_redirects=True)
+
+    clients = [call.args[0] for call in mock_request.call_args_list]
+    assert clients[0] is not clients[1]
+    assert clients[0]._transport is clients[1]._transport is get_client()._transport
+    assert mock_request.call_args_list[1].kwargs["follow_redirects"] is True
+
+
+def test_cookies_are_kept_within_a_request(monkeypatch):
+    received_cookies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received_cookies.append(request.headers.get("cookie"))
+        if request.url.path == "/login":
+            return httpx.Response(302, headers={"location": "/home", "set-cookie": "session=secret; Path=/"})
+        return httpx.Response(200)
+
+    monkeypatch.setitem(ssrf_proxy._transports, ssrf_proxy._client_key(True), (httpx.MockTransport(handler), {}))
+    monkeypatch.setattr(ssrf_proxy, "_transports_pid", os.getpid())
+
+    response = make_request("GET", "http://example.com/login", follow_redirects=True, ssl_verify=True)
+    make_request("GET", "http://example.com/home", ssl_verify=True)
+
+    assert response.status_code == 200
+    # the redirect carries the cookie set by its response, the next request doesn't
+    assert received_cookies == [None, "session=secret", None]
+
+
+@patch("httpx.AsyncClient.request", new_callable=AsyncMock)
+def test_async_retry_logic_success(mock_request):
+    mock_request.side_effect = [MagicMock(status_code=STATUS_FORCELIST[0]), MagicMock(status_code=200)]
+
+    async def run():
+        with patch("core.helper.ssrf_proxy.asyncio.sleep", new_callable=AsyncMock):
+            response = await make_request_async("GET", "http://example.com", max_retries=1)
+        assert get_async_client()._transport is get_async_client()._transport
+        return response
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert mock_request.call_count == 2
+
+
+def test_environment_proxies_are_honoured_without_ssrf_proxies(monkeypatch):
+    for name in ("SSRF_PROXY_ALL_URL", "SSRF_PROXY_HTTP_URL", "SSRF_PROXY_HTTPS_URL"):
+        monkeypatch.setattr(ssrf_proxy.dify_config, name, None)
+    monkeypatch.setenv("HTTP_PROXY", "http://proxy.internal:3128")
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.internal:3128")
+    monkeypatch.setenv("NO_PROXY", "intranet.local")
+    monkeypatch.setattr(ssrf_proxy, "_transports", {})
+
+    client = get_client()
+
+    proxied = client._transport_for_url(httpx.URL("https://example.com"))
+    assert proxied is client._transport_for_url(httpx.URL("http://example.com"))
+    assert proxied is not client._transport
+    assert client._transport_for_url(httpx.URL("https://intranet.local")) is client._transport
+
+
+def test_pools_are_reset_in_a_forked_process(monkeypatch):
+    monkeypatch.setattr(ssrf_proxy, "_transports", {})
+    client = get_client()
+
+    async def get_async_transport():
+        return get_async_client()._transport
+
+    loop = asyncio.new_event_loop()
+    try:
+        async_transport = loop.run_until_complete(get_async_transport())
+        assert loop in ssrf_proxy._async_transports
+
+        monkeypatch.setattr(ssrf_proxy, "_transports_pid", -1)
+
+        assert get_client()._transport is not client._transport
+        assert loop not in ssrf_proxy._async_transports
+        assert loop.run_until_complete(get_async_transport()) is not async_transport
+    finally:
+        loop.close()
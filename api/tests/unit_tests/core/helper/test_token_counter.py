@@ -0,0 +1,131 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.helper.token_counter import TokenCounter
+
+
+def _model_instance(model: str = "text-embedding-3-small", round_trip: float = 0.0) -> MagicMock:
+    model_instance = MagicMock()
+    model_instance.provider_model_bundle.configuration.tenant_id = "tenant"
+    model_instance.provider = "openai"
+    model_instance.model = model
+
+    def get_text_embedding_num_tokens(texts: list[str]) -> list[int]:
+        time.sleep(round_trip)
+        return [len(text.split()) for text in texts]
+
+    model_instance.get_text_embedding_num_tokens.side_effect = get_text_embedding_num_tokens
+    return model_instance
+
+
+@pytest.fixture
+def gpt2_tokenizer(mocker):
+    return mocker.patch(
+        "core.helper.token_counter.GPT2Tokenizer.get_num_tokens", side_effect=lambda text: len(text.split())
+    )
+
+
+def test_counts_are_cached():
+    counter = TokenCounter(cache_size=100, cache_ttl=60, batch_size=10)
+    model_instance = _model_instance()
+
+    assert counter.get_text_embedding_num_tokens(model_instance, ["a b", "c"]) == [2, 1]
+    assert counter.get_text_embedding_num_tokens(model_instance, ["c", "a b", "d e f"]) == [1, 2, 3]
+
+    requested = [call.kwargs["texts"] for call in model_instance.get_text_embedding_num_tokens.call_args_list]
+    assert requested == [["a b", "c"], ["d e f"]]
+
+
+def test_duplicate_texts_are_counted_once():
+    counter = TokenCounter(cache_size=0, cache_ttl=60, batch_size=10)
+    model_instance = _model_instance()
+
+    assert counter.get_text_embedding_num_tokens(model_instance, ["a b", "a b", "c", "a b"]) == [2, 2, 1, 2]
+    model_instance.get_text_embedding_num_tokens.assert_called_once_with(texts=["a b", "c"])
+
+
+def test_missing_texts_are_requested_in_batches():
+    counter = TokenCounter(cache_size=100, cache_ttl=60, batch_size=2)
+    model_instance = _model_instance()
+    texts = [" ".join(["word"] * i) for i in range(1, 6)]
+
+    assert counter.get_text_embedding_num_tokens(model_instance, texts) == [1, 2, 3, 4, 5]
+    requested = [call.kwargs["texts"] for call in model_instance.get_text_embedding_num_tokens.call_args_list]
+    assert requested == [texts[0:2], texts[2:4], texts[4:5]]
+
+
+def test_cache_is_keyed_by_model():
+    counter = TokenCounter(cache_size=100, cache_ttl=60, batch_size=10)
+    small_model = _model_instance("text-embedding-3-small")
+    large_model = _model_instance("text-embedding-3-large")
+
+    counter.get_text_embedding_num_tokens(small_model, ["a b"])
+    counter.get_text_embedding_num_tokens(large_model, ["a b"])
+
+    small_model.get_text_embedding_num_tokens.assert_called_once()
+    large_model.get_text_embedding_num_tokens.assert_called_once()
+
+
+def test_empty_texts():
+    counter = TokenCounter(cache_size=100, cache_ttl=60, batch_size=10)
+    model_instance = _model_instance()
+
+    assert counter.get_text_embedding_num_tokens(model_instance, []) == []
+    model_instance.get_text_embedding_num_tokens.assert_not_called()
+
+
+def test_gpt2_counts_are_cached(gpt2_tokenizer):
+    counter = TokenCounter(cache_size=100, cache_ttl=60, batch_size=10)
+
+    assert counter.get_gpt2_num_tokens(["a b", "c"]) == [2, 1]
+    assert counter.get_gpt2_num_tokens(["a b", "c"]) == [2, 1]
+    assert gpt2_tokenizer.call_count == 2
+
+
+def test_large_gpt2_jobs_use_process_pool(gpt2_tokenizer, mocker):
+    counter = TokenCounter(cache_size=100, cache_ttl=60, batch_size=10, process_pool_size=2, process_pool_min_texts=3)
+    pool = ThreadPoolExecutor(max_workers=2)
+    get_process_pool = mocker.patch.object(counter, "_get_process_pool", return_value=pool)
+
+    assert counter.get_gpt2_num_tokens(["a", "b c"]) == [1, 2]
+    get_process_pool.assert_not_called()
+
+    assert counter.get_gpt2_num_tokens(["d", "e f", "g h i"]) == [1, 2, 3]
+    get_process_pool.assert_called_once()
+    pool.shutdown()
+
+
+@pytest.mark.benchmark
+def test_token_counting_benchmark(record_property):
+    """
+    Count the tokens of a 10k chunk document the way indexing does: all at once when the docstore saves the
+    segments, then per chunk of 10 when the indexing runner loads them, against an embedding model that takes a
+    round trip per request.
+    """
+    chunk_count = 10000
+    round_trip = 0.005
+    request_size = 10
+    texts = [f"chunk {i} " * 20 for i in range(chunk_count)]
+
+    model_instance = _model_instance(round_trip=round_trip)
+    start = time.perf_counter()
+    model_instance.get_text_embedding_num_tokens(texts=texts)
+    for i in range(0, chunk_count, request_size):
+        model_instance.get_text_embedding_num_tokens(texts=texts[i : i + request_size])
+    uncached_elapsed = time.perf_counter() - start
+
+    counter = TokenCounter(cache_size=chunk_count, cache_ttl=60, batch_size=500)
+    model_instance = _model_instance(round_trip=round_trip)
+    start = time.perf_counter()
+    counter.get_text_embedding_num_tokens(model_instance, texts)
+    for i in range(0, chunk_count, request_size):
+        counter.get_text_embedding_num_tokens(model_instance, texts[i : i + request_size])
+    cached_elapsed = time.perf_counter() - start
+
+    record_property("model_seconds", uncached_elapsed)
+    record_property("token_counter_seconds", cached_elapsed)
+    # the chunks are counted once, in batches, and the later lookups are served from the cache
+    assert model_instance.get_text_embedding_num_tokens.call_count == chunk_count // 500
@@ -0,0 +1,42 @@
+import math
+
+import pytest
+
+from core.rag.datasource.keyword.bm25 import BM25, BM25Statistics
+
+
+def _expected_weight(tf: int, df: int, document_length: int, statistics: BM25Statistics, k1=1.2, b=0.75) -> float:
+    idf = math.log(1 + (statistics.document_count - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * document_length / statistics.average_document_length)
+    return idf * tf * (k1 + 1) / (tf + norm)
+
+
+def test_bm25_term_weight_matches_formula():
+    statistics = BM25Statistics(
+        document_count=10, average_document_length=20.0, document_frequencies={"dify": 2, "agent": 5}
+    )
+    bm25 = BM25()
+    dify_idf, agent_idf = bm25.idf(statistics, ["dify", "agent"]).tolist()
+
+    assert bm25.term_weight(dify_idf, 3, 10, statistics.average_document_length) == pytest.approx(
+        _expected_weight(3, 2, 10, statistics)
+    )
+    assert bm25.term_weight(agent_idf, 2, 40, statistics.average_document_length) == pytest.approx(
+        _expected_weight(2, 5, 40, statistics)
+    )
+
+
+def test_bm25_rare_keyword_outranks_common_keyword():
+    statistics = BM25Statistics(
+        document_count=100, average_document_length=10.0, document_frequencies={"rare": 1, "common": 90}
+    )
+    bm25 = BM25()
+    rare_idf, common_idf = bm25.idf(statistics, ["rare", "common"]).tolist()
+
+    assert bm25.term_weight(rare_idf, 1, 10, 10.0) > bm25.term_weight(common_idf, 1, 10, 10.0)
+
+
+def test_bm25_normalize():
+    assert BM25.normalize({}) == {}
+    assert BM25.normalize({"a": 2.0, "b": 1.0}) == {"a": 1.0, "b": 0.5}
+    assert BM25.normalize({"a": 0.0}) == {"a": 0.0}
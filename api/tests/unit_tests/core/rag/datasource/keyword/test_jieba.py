@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock, patch
+
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+from core.rag.models.document import Document
+from models.dataset import DocumentSegment
+
+
+def _make_jieba() -> Jieba:
+    dataset = MagicMock()
+    dataset.id = "dataset-1"
+    return Jieba(dataset)
+
+
+def test_search_fetches_segments_in_one_query_and_keeps_ranking():
+    jieba = _make_jieba()
+    ranked_ids = ["node-3", "node-1", "node-2"]
+    segments = [
+        DocumentSegment(index_node_id=node_id, dataset_id="dataset-1", document_id="doc-1", content=node_id)
+        for node_id in ["node-1", "node-2", "node-3"]
+    ]
+
+    with (
+        patch.object(jieba, "_get_dataset_keyword_table", return_value={}),
+        patch.object(jieba, "_retrieve_ids_by_query", return_value=ranked_ids),
+        patch("core.rag.datasource.keyword.jieba.jieba.db") as mock_db,
+    ):
+        query = mock_db.session.query.return_value
+        query.filter.return_value = query
+        query.all.return_value = segments
+        documents = jieba.search("query", top_k=3, document_ids_filter=["doc-1"])
+
+    assert mock_db.session.query.call_count == 1
+    assert query.filter.call_count == 2
+    assert [document.metadata["doc_id"] for document in documents] == ranked_ids
+
+
+def test_add_texts_commits_segment_keywords_once():
+    jieba = _make_jieba()
+    texts = [Document(page_content=f"text {i}", metadata={"doc_id": f"node-{i}"}) for i in range(20)]
+    segments = [DocumentSegment(index_node_id=f"node-{i}", keywords=[]) for i in range(20)]
+
+    with (
+        patch("core.rag.datasource.keyword.jieba.jieba.redis_client", new=MagicMock()),
+        patch.object(jieba, "_get_dataset_keyword_table", return_value={}),
+        patch.object(jieba, "_save_dataset_keyword_table"),
+        patch("core.rag.datasource.keyword.jieba.jieba.db") as mock_db,
+    ):
+        mock_db.session.query.return_value.filter.return_value.all.return_value = segments
+        jieba.add_texts(texts, keywords_list=[[f"keyword-{i}"] for i in range(20)])
+
+    assert mock_db.session.query.call_count == 1
+    assert mock_db.session.commit.call_count == 1
+    assert segments[7].keywords == ["keyword-7"]
@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock, patch
+
+from core.rag.datasource.retrieval_service import RetrievalService
+from core.rag.index_processor.constant.index_type import IndexType
+from core.rag.models.document import Document
+from models.dataset import ChildChunk, DocumentSegment
+from models.dataset import Document as DatasetDocument
+
+
+def _mock_query(rows_by_model: dict):
+    def query(model):
+        query_mock = MagicMock()
+        query_mock.filter.return_value = query_mock
+        query_mock.options.return_value = query_mock
+        query_mock.all.return_value = rows_by_model[model]
+        return query_mock
+
+    return query
+
+
+def test_format_retrieval_documents_query_count_does_not_grow_with_hits():
+    hit_count = 50
+    dataset_documents = [
+        DatasetDocument(id="paragraph-doc", dataset_id="dataset-1", doc_form=IndexType.PARAGRAPH_INDEX),
+        DatasetDocument(id="parent-child-doc", dataset_id="dataset-1", doc_form=IndexType.PARENT_CHILD_INDEX),
+    ]
+    segments = [
+        DocumentSegment(id=f"segment-{i}", dataset_id="dataset-1", index_node_id=f"node-{i}", content=f"content {i}")
+        for i in range(hit_count)
+    ]
+    parent_segment = DocumentSegment(id="parent", dataset_id="dataset-1", index_node_id="parent-node", content="p")
+    child_chunks = [
+        ChildChunk(id=f"child-{i}", index_node_id=f"child-node-{i}", segment_id="parent", content=f"c{i}", position=i)
+        for i in range(hit_count)
+    ]
+    documents = [
+        Document(
+            page_content="",
+            metadata={"document_id": "paragraph-doc", "doc_id": f"node-{i}", "score": 1 - i / 100},
+        )
+        for i in reversed(range(hit_count))
+    ] + [
+        Document(
+            page_content="",
+            metadata={"document_id": "parent-child-doc", "doc_id": f"child-node-{i}", "score": i / 100},
+        )
+        for i in range(hit_count)
+    ]
+
+    with patch("core.rag.datasource.retrieval_service.db") as mock_db:
+        mock_db.session.query.side_effect = _mock_query(
+            {
+                DatasetDocument: dataset_documents,
+                ChildChunk: child_chunks,
+                DocumentSegment: segments + [parent_segment],
+            }
+        )
+        records = RetrievalService.format_retrieval_documents(documents)
+
+    # one query each for documents, child chunks and segments, however many hits are returned
+    assert mock_db.session.query.call_count == 3
+    assert [record.segment.id for record in records] == [f"segment-{i}" for i in reversed(range(hit_count))] + [
+        "parent"
+    ]
+    parent_record = records[-1]
+    assert parent_record.child_chunks is not None
+    assert len(parent_record.child_chunks) == hit_count
+    assert parent_record.score == (hit_count - 1) / 100
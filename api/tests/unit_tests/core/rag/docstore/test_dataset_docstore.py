@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from configs import dify_config
+from core.rag.docstore.dataset_docstore import DatasetDocumentStore
+from core.rag.models.document import ChildDocument, Document
+from models.dataset import ChildChunk, DocumentSegment
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    monkeypatch.setattr(dify_config, "DATASET_DOCSTORE_BULK_INSERT_ENABLED", True)
+    monkeypatch.setattr(dify_config, "DATASET_DOCSTORE_BULK_INSERT_BATCH_SIZE", 2)
+    with patch("core.rag.docstore.dataset_docstore.db") as db:
+        yield db
+
+
+def _doc_store() -> DatasetDocumentStore:
+    dataset = MagicMock(id="dataset-1", tenant_id="tenant-1", indexing_technique="economy")
+    return DatasetDocumentStore(dataset=dataset, user_id="user-1", document_id="document-1")
+
+
+def _doc(i: int, children: int = 0) -> Document:
+    return Document(
+        page_content=f"content {i}",
+        metadata={"doc_id": f"node-{i}", "doc_hash": f"hash-{i}"},
+        children=[
+            ChildDocument(page_content=f"child {i}-{j}", metadata={"doc_id": f"child-{i}-{j}", "doc_hash": "hash"})
+            for j in range(children)
+        ]
+        or None,
+    )
+
+
+def _inserted(mock_db, model) -> list[dict]:
+    return [
+        mapping
+        for call in mock_db.session.bulk_insert_mappings.call_args_list
+        if call.args[0] is model
+        for mapping in call.args[1]
+    ]
+
+
+def test_bulk_add_documents_inserts_new_segments_in_batches(mock_db):
+    query = mock_db.session.query.return_value.filter.return_value
+    query.scalar.return_value = 3
+    query.all.return_value = []
+
+    _doc_store().add_documents([_doc(i, children=2) for i in range(5)], save_child=True)
+
+    segments = _inserted(mock_db, DocumentSegment)
+    assert [segment["position"] for segment in segments] == [4, 5, 6, 7, 8]
+    assert [segment["index_node_id"] for segment in segments] == [f"node-{i}" for i in range(5)]
+    children = _inserted(mock_db, ChildChunk)
+    assert len(children) == 10
+    assert children[0]["segment_id"] == segments[0]["id"]
+    assert [child["position"] for child in children[:2]] == [1, 2]
+    # 5 segments and 10 child chunks in batches of 2
+    assert mock_db.session.bulk_insert_mappings.call_count == 3 + 5
+    # the max position query and one existing segments query per batch of doc ids
+    assert mock_db.session.query.call_count == 1 + 3
+    mock_db.session.commit.assert_called_once()
+
+
+def test_bulk_add_documents_updates_existing_segments(mock_db):
+    existing = DocumentSegment(id="segment-1", index_node_id="node-1", content="old", position=1)
+    query = mock_db.session.query.return_value.filter.return_value
+    query.scalar.return_value = 1
+    query.all.return_value = [existing]
+
+    _doc_store().add_documents([_doc(1), _doc(2)])
+
+    assert existing.content == "content 1"
+    assert existing.index_node_hash == "hash-1"
+    segments = _inserted(mock_db, DocumentSegment)
+    assert [(segment["index_node_id"], segment["position"]) for segment in segments] == [("node-2", 2)]
+
+
+def test_bulk_add_documents_rejects_existing_without_update(mock_db):
+    query = mock_db.session.query.return_value.filter.return_value
+    query.scalar.return_value = 0
+    query.all.return_value = []
+
+    with pytest.raises(ValueError, match="already exists"):
+        _doc_store().add_documents([_doc(1), _doc(1)], allow_update=False)
+
+    mock_db.session.bulk_insert_mappings.assert_not_called()
+    mock_db.session.rollback.assert_called_once()
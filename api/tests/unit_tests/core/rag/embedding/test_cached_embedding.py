@@ -0,0 +1,86 @@
+import math
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from configs import dify_config
+from core.model_runtime.entities.model_entities import ModelPropertyKey
+from core.rag.embedding.cached_embedding import CacheEmbedding, query_embedding_l1_cache
+from libs import helper
+from models.dataset import Embedding
+
+
+def _make_model_instance(dimension: int = 8) -> MagicMock:
+    model_instance = MagicMock()
+    model_instance.model = "text-embedding-3-small"
+    model_instance.provider = "openai"
+    model_schema = MagicMock()
+    model_schema.model_properties = {ModelPropertyKey.MAX_CHUNKS: 100}
+    model_instance.model_type_instance.get_model_schema.return_value = model_schema
+
+    def invoke_text_embedding(texts, user=None, input_type=None):
+        result = MagicMock()
+        result.embeddings = [list(np.random.rand(dimension)) for _ in texts]
+        return result
+
+    model_instance.invoke_text_embedding.side_effect = invoke_text_embedding
+    return model_instance
+
+
+def _make_cached_rows(texts: list[str]) -> list[Embedding]:
+    rows = []
+    for text in texts:
+        embedding = Embedding(model_name="text-embedding-3-small", hash=helper.generate_text_hash(text))
+        embedding.set_embedding([1.0, 0.0])
+        rows.append(embedding)
+    return rows
+
+
+@pytest.mark.parametrize("chunk_count", [1_000, 10_000])
+def test_embed_documents_round_trips(chunk_count: int):
+    texts = [f"chunk {i}" for i in range(chunk_count)]
+    # half of the chunks are already cached
+    cached_rows = _make_cached_rows(texts[::2])
+
+    with patch("core.rag.embedding.cached_embedding.db") as mock_db:
+        query = mock_db.session.query.return_value
+        query.filter.return_value.all.side_effect = lambda: cached_rows if query.filter.call_count == 1 else []
+
+        embeddings = CacheEmbedding(_make_model_instance()).embed_documents(texts)
+
+    batch_size = dify_config.EMBEDDING_CACHE_QUERY_BATCH_SIZE
+    assert len(embeddings) == chunk_count
+    assert all(embedding is not None for embedding in embeddings)
+    assert embeddings[0] == [1.0, 0.0]
+    # one select per lookup batch and one insert per batch of misses, instead of one select per chunk
+    assert mock_db.session.query.call_count == math.ceil(chunk_count / batch_size)
+    assert mock_db.session.execute.call_count == math.ceil((chunk_count // 2) / batch_size)
+    assert mock_db.session.commit.call_count == 1
+
+
+def test_embed_documents_all_cached_skips_model_and_insert():
+    texts = ["a", "b", "a"]
+    with patch("core.rag.embedding.cached_embedding.db") as mock_db:
+        mock_db.session.query.return_value.filter.return_value.all.return_value = _make_cached_rows(["a", "b"])
+        model_instance = _make_model_instance()
+        embeddings = CacheEmbedding(model_instance).embed_documents(texts)
+
+    assert embeddings == [[1.0, 0.0]] * 3
+    model_instance.invoke_text_embedding.assert_not_called()
+    mock_db.session.execute.assert_not_called()
+
+
+def test_embed_query_uses_process_cache():
+    query_embedding_l1_cache.clear()
+    model_instance = _make_model_instance()
+    mock_redis = MagicMock()
+    mock_redis.get.return_value = None
+    with patch("core.rag.embedding.cached_embedding.redis_client", new=mock_redis):
+        first = CacheEmbedding(model_instance).embed_query("what is dify?")
+        second = CacheEmbedding(model_instance).embed_query("what is dify?")
+
+    np.testing.assert_allclose(first, second, rtol=1e-6)
+    assert model_instance.invoke_text_embedding.call_count == 1
+    assert mock_redis.get.call_count == 1
+    assert query_embedding_l1_cache.hits == 1
@@ -0,0 +1,88 @@
+import math
+import random
+import time
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from core.rag.rerank.scoring import cosine_similarities, tfidf_similarities
+
+
+def _reference_tfidf_similarities(query_keywords: list[str], documents_keywords: list[list[str]]) -> list[float]:
+    # the dict based implementation the weight rerank used to run per candidate
+    total_documents = len(documents_keywords)
+    all_keywords = set()
+    for document_keywords in documents_keywords:
+        all_keywords.update(document_keywords)
+    keyword_idf = {}
+    for keyword in all_keywords:
+        doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
+        keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
+
+    query_tfidf = {keyword: count * keyword_idf.get(keyword, 0) for keyword, count in Counter(query_keywords).items()}
+    similarities = []
+    for document_keywords in documents_keywords:
+        document_tfidf = {
+            keyword: count * keyword_idf.get(keyword, 0) for keyword, count in Counter(document_keywords).items()
+        }
+        intersection = set(query_tfidf) & set(document_tfidf)
+        numerator = sum(query_tfidf[x] * document_tfidf[x] for x in intersection)
+        denominator = math.sqrt(sum(v**2 for v in query_tfidf.values())) * math.sqrt(
+            sum(v**2 for v in document_tfidf.values())
+        )
+        similarities.append(float(numerator) / denominator if denominator else 0.0)
+    return similarities
+
+
+def _random_keywords(rng: random.Random, vocabulary: list[str], size: int) -> list[str]:
+    return [rng.choice(vocabulary) for _ in range(size)]
+
+
+def test_tfidf_similarities_match_reference():
+    rng = random.Random(42)
+    vocabulary = [f"term{i}" for i in range(60)]
+    documents_keywords = [_random_keywords(rng, vocabulary, rng.randint(0, 20)) for _ in range(40)]
+    query_keywords = _random_keywords(rng, vocabulary, 5) + ["unseen"]
+
+    expected = _reference_tfidf_similarities(query_keywords, documents_keywords)
+
+    assert tfidf_similarities(query_keywords, documents_keywords) == pytest.approx(expected)
+
+
+def test_tfidf_similarities_edge_cases():
+    assert tfidf_similarities(["a"], []) == []
+    assert tfidf_similarities(["a"], [[], []]) == [0.0, 0.0]
+    assert tfidf_similarities([], [["a"], ["b"]]) == [0.0, 0.0]
+    assert tfidf_similarities(["a"], [["a"], ["b"]]) == pytest.approx([1.0, 0.0])
+
+
+def test_cosine_similarities():
+    similarities = cosine_similarities([1.0, 0.0], [[2.0, 0.0], [0.0, 3.0], [1.0, 1.0], [0.0, 0.0]])
+
+    assert similarities.tolist() == pytest.approx([1.0, 0.0, 1 / math.sqrt(2), 0.0])
+    assert cosine_similarities([1.0, 0.0], []).size == 0
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("candidates", [50, 500, 5000])
+def test_scoring_benchmark(candidates: int, record_property):
+    rng = random.Random(candidates)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    documents_keywords = [_random_keywords(rng, vocabulary, 10) for _ in range(candidates)]
+    query_keywords = _random_keywords(rng, vocabulary, 5)
+    np_rng = np.random.default_rng(candidates)
+    query_vector = np_rng.random(768).tolist()
+    document_vectors = np_rng.random((candidates, 768)).tolist()
+
+    start = time.perf_counter()
+    scores = tfidf_similarities(query_keywords, documents_keywords)
+    tfidf_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    similarities = cosine_similarities(query_vector, document_vectors)
+    cosine_elapsed = time.perf_counter() - start
+
+    record_property("tfidf_ms", tfidf_elapsed * 1000)
+    record_property("cosine_ms", cosine_elapsed * 1000)
+    assert len(scores) == candidates
+    assert similarities.shape == (candidates,)
@@ -0,0 +1,124 @@
+import random
+import time
+
+import pytest
+
+from core.rag.splitter.fixed_text_splitter import FixedRecursiveCharacterTextSplitter
+from core.rag.splitter.text_splitter import RecursiveCharacterTextSplitter
+
+
+def _reference_merge_splits(splitter, splits: list[str], separator: str, lengths: list[int]) -> list[str]:
+    """The list based merge that _merge_splits replaced, for comparison."""
+    separator_len = splitter._length_function([separator])[0]
+    docs = []
+    current_doc: list[str] = []
+    total = 0
+    for d, _len in zip(splits, lengths):
+        if total + _len + (separator_len if len(current_doc) > 0 else 0) > splitter._chunk_size:
+            if len(current_doc) > 0:
+                doc = splitter._join_docs(current_doc, separator)
+                if doc is not None:
+                    docs.append(doc)
+                while total > splitter._chunk_overlap or (
+                    total + _len + (separator_len if len(current_doc) > 0 else 0) > splitter._chunk_size and total > 0
+                ):
+                    total -= splitter._length_function([current_doc[0]])[0] + (
+                        separator_len if len(current_doc) > 1 else 0
+                    )
+                    current_doc = current_doc[1:]
+        current_doc.append(d)
+        total += _len + (separator_len if len(current_doc) > 1 else 0)
+    doc = splitter._join_docs(current_doc, separator)
+    if doc is not None:
+        docs.append(doc)
+    return docs
+
+
+def _text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+    parts = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(3, 40)))
+        sentence += rng.choice([". ", ".\n", ".\n\n"])
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)
+
+
+@pytest.mark.parametrize(("chunk_size", "chunk_overlap"), [(50, 0), (200, 50), (500, 499), (1000, 100)])
+def test_merge_splits_matches_reference(chunk_size, chunk_overlap):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    splits = _text(20000).split(" ")
+    lengths = [len(split) for split in splits]
+
+    assert splitter._merge_splits(splits, " ", lengths) == _reference_merge_splits(splitter, splits, " ", lengths)
+
+
+def test_merge_splits_reuses_lengths():
+    calls = []
+
+    def length_function(texts: list[str]) -> list[int]:
+        calls.append(texts)
+        return [len(text) for text in texts]
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=30, length_function=length_function)
+    splits = _text(5000).split(" ")
+
+    splitter._merge_splits(splits, " ", [len(split) for split in splits])
+
+    # only the separator is measured
+    assert calls == [[" "]]
+
+
+def test_split_text_iter_matches_split_text():
+    text = _text(50000)
+    recursive_splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
+    fixed_splitter = FixedRecursiveCharacterTextSplitter(fixed_separator="\n\n", chunk_size=300, chunk_overlap=50)
+
+    assert list(recursive_splitter.split_text_iter(text)) == recursive_splitter.split_text(text)
+    assert list(fixed_splitter.split_text_iter(text)) == fixed_splitter.split_text(text)
+
+
+def test_split_text_iter_is_lazy():
+    measured: list[str] = []
+
+    def length_function(texts: list[str]) -> list[int]:
+        measured.extend(texts)
+        return [len(text) for text in texts]
+
+    splitter = FixedRecursiveCharacterTextSplitter(
+        fixed_separator="\n\n", chunk_size=300, chunk_overlap=50, length_function=length_function
+    )
+    splitter._length_batch_size = 10
+    text = _text(1024 * 1024)
+
+    first_chunk = next(splitter.split_text_iter(text))
+    first_chunk_measured = sum(map(len, measured))
+    measured.clear()
+    chunks = splitter.split_text(text)
+
+    assert first_chunk == chunks[0]
+    # the first chunk is yielded before the rest of the text is measured
+    assert first_chunk_measured < len(text) / 100
+    assert sum(map(len, measured)) > len(text) / 2
+
+
+@pytest.mark.benchmark
+def test_split_text_benchmark(record_property):
+    text = _text(10 * 1024 * 1024)
+    splitter = FixedRecursiveCharacterTextSplitter(fixed_separator="\n\n", chunk_size=1000, chunk_overlap=200)
+
+    start = time.perf_counter()
+    record_property("chunks", sum(1 for _ in splitter.split_text_iter(text)))
+    record_property("split_seconds", time.perf_counter() - start)
+
+    splits = text.split(" ")
+    lengths = [len(split) for split in splits]
+    start = time.perf_counter()
+    splitter._merge_splits(splits, " ", lengths)
+    record_property("merge_seconds", time.perf_counter() - start)
+    start = time.perf_counter()
+    _reference_merge_splits(splitter, splits, " ", lengths)
+    record_property("reference_merge_seconds", time.perf_counter() - start)
@@ -0,0 +1,158 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.indexing_pipeline import IndexingPipeline
+from core.rag.models.document import Document
+
+
+def _pages(count: int, chunks_per_page: int) -> list[Document]:
+    return [
+        Document(page_content="\n".join(f"page {i} chunk {j}" for j in range(chunks_per_page)), metadata={})
+        for i in range(count)
+    ]
+
+
+def _split(page: Document) -> list[Document]:
+    return [Document(page_content=line, metadata={"doc_id": line}) for line in page.page_content.split("\n")]
+
+
+class StubEmbedding:
+    """Embedding backend taking a round trip per request, recording its concurrent requests."""
+
+    def __init__(self, round_trip: float = 0.0):
+        self.round_trip = round_trip
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def embed(self, batch: list[Document]) -> list[list[float]]:
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.round_trip)
+        with self._lock:
+            self.running -= 1
+        return [[float(len(document.page_content))] for document in batch]
+
+
+class StubVectorStore:
+    """Vector backend taking a round trip per write."""
+
+    def __init__(self, round_trip: float = 0.0):
+        self.round_trip = round_trip
+        self.texts: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def write(self, batch: list[Document], embeddings: list[list[float]]) -> None:
+        time.sleep(self.round_trip)
+        with self._lock:
+            for document, embedding in zip(batch, embeddings):
+                self.texts[document.page_content] = embedding
+
+
+def test_pipeline_writes_every_chunk():
+    embedding = StubEmbedding()
+    vector_store = StubVectorStore()
+    saved: list[str] = []
+    split_completed = threading.Event()
+
+    pipeline = IndexingPipeline(
+        split=_split,
+        save=lambda batch: saved.extend(document.page_content for document in batch),
+        embed=embedding.embed,
+        write=vector_store.write,
+        batch_size=7,
+        split_completed=split_completed.set,
+    )
+    pipeline.run(_pages(10, 5))
+
+    expected = [f"page {i} chunk {j}" for i in range(10) for j in range(5)]
+    assert saved == expected
+    assert sorted(vector_store.texts) == sorted(expected)
+    assert vector_store.texts["page 1 chunk 2"] == [float(len("page 1 chunk 2"))]
+    assert split_completed.is_set()
+    assert pipeline.metrics["save"].batches == 8
+    assert pipeline.metrics["write"].items == 50
+
+
+def test_pipeline_limits_concurrent_embedding_requests():
+    embedding = StubEmbedding(round_trip=0.01)
+
+    pipeline = IndexingPipeline(
+        split=_split,
+        save=lambda batch: None,
+        embed=embedding.embed,
+        write=StubVectorStore().write,
+        batch_size=1,
+        embedding_concurrency=8,
+        embedding_semaphore=threading.BoundedSemaphore(2),
+    )
+    pipeline.run(_pages(10, 5))
+
+    assert embedding.max_running == 2
+
+
+@pytest.mark.parametrize("failing_stage", ["split", "save", "embed", "write"])
+def test_pipeline_raises_first_error(failing_stage):
+    def fail(*args):
+        raise ValueError(f"{failing_stage} failed")
+
+    stages = {
+        "split": _split,
+        "save": lambda batch: None,
+        "embed": StubEmbedding().embed,
+        "write": StubVectorStore().write,
+    }
+    stages[failing_stage] = fail
+
+    pipeline = IndexingPipeline(**stages, batch_size=2, queue_size=1)
+    with pytest.raises(ValueError, match=f"{failing_stage} failed"):
+        pipeline.run(_pages(100, 5))
+
+
+@pytest.mark.benchmark
+def test_indexing_pipeline_benchmark(record_property):
+    """
+    Index a 200 page document whose pages take a while to split, against stub embedding and vector backends
+    taking a round trip per batch, once stage after stage the way IndexingRunner does without the pipeline and
+    once pipelined.
+    """
+    page_count = 200
+    chunks_per_page = 10
+    batch_size = 20
+    concurrency = 4
+
+    def split(page: Document) -> list[Document]:
+        time.sleep(0.002)
+        return _split(page)
+
+    embedding = StubEmbedding(round_trip=0.02)
+    vector_store = StubVectorStore(round_trip=0.01)
+    start = time.perf_counter()
+    documents = [document for page in _pages(page_count, chunks_per_page) for document in split(page)]
+    batches = [documents[i : i + batch_size] for i in range(0, len(documents), batch_size)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda batch: vector_store.write(batch, embedding.embed(batch)), batches))
+    sequential_elapsed = time.perf_counter() - start
+
+    embedding = StubEmbedding(round_trip=0.02)
+    vector_store = StubVectorStore(round_trip=0.01)
+    pipeline = IndexingPipeline(
+        split=split,
+        save=lambda batch: None,
+        embed=embedding.embed,
+        write=vector_store.write,
+        batch_size=batch_size,
+        embedding_concurrency=concurrency,
+        write_concurrency=concurrency,
+    )
+    pipeline.run(_pages(page_count, chunks_per_page))
+
+    assert len(vector_store.texts) == page_count * chunks_per_page
+    record_property("sequential_seconds", sequential_elapsed)
+    record_property("pipelined_seconds", pipeline.elapsed)
+    for stage, metrics in pipeline.metrics.items():
+        record_property(f"{stage}_metrics", str(metrics))
@@ -0,0 +1,145 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs import dify_config
+from core.indexing_runner import DocumentIsPausedError, IndexingRunner
+from core.rag.index_processor.constant.index_type import IndexType
+from core.rag.models.document import Document
+from models.dataset import Document as DatasetDocument
+
+
+class StubIndexProcessor:
+    """Index processor extracting one page per line of text and splitting pages into one chunk per word."""
+
+    def __init__(self, pages: list[str]):
+        self.pages = pages
+
+    def extract(self, extract_setting, **kwargs) -> list[Document]:
+        return [Document(page_content=page, metadata={}) for page in self.pages]
+
+    def transform(self, documents: list[Document], **kwargs) -> list[Document]:
+        return [
+            Document(page_content=word, metadata={"doc_id": word})
+            for document in documents
+            for word in document.page_content.split()
+        ]
+
+
+class StubVector:
+    """Vector store embedding every chunk as its length, shared by the instances of a test."""
+
+    written: list[str]
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def embed_documents(self, documents: list[Document]) -> list[list[float]]:
+        return [[float(len(document.page_content))] for document in documents]
+
+    def create_with_embeddings(self, documents: list[Document], embeddings: list[list[float]]) -> None:
+        self.written.extend(document.page_content for document in documents)
+
+
+class StubDocumentStore:
+    saved: list[str]
+
+    def __init__(self, dataset, user_id, document_id):
+        self.document_id = document_id
+
+    def add_documents(self, docs: list[Document], save_child: bool = False) -> None:
+        self.saved.extend(document.page_content for document in docs)
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setattr(dify_config, "INDEXING_PIPELINE_ENABLED", True)
+    monkeypatch.setattr(dify_config, "INDEXING_PIPELINE_BATCH_SIZE", 3)
+    monkeypatch.setattr("core.indexing_runner.db", MagicMock())
+    monkeypatch.setattr("core.indexing_runner.Keyword", MagicMock())
+    monkeypatch.setattr("core.indexing_runner.redis_client", MagicMock(**{"get.return_value": None}))
+    token_counter = MagicMock()
+    token_counter.get_text_embedding_num_tokens.side_effect = lambda model_instance, texts: [len(t) for t in texts]
+    monkeypatch.setattr("core.indexing_runner.token_counter", token_counter)
+    monkeypatch.setattr(StubVector, "written", [], raising=False)
+    monkeypatch.setattr("core.indexing_runner.Vector", StubVector)
+    monkeypatch.setattr(StubDocumentStore, "saved", [], raising=False)
+    monkeypatch.setattr("core.indexing_runner.DatasetDocumentStore", StubDocumentStore)
+
+    runner = IndexingRunner()
+    runner.model_manager = MagicMock()
+    # the document and segment updates go to the database, record them instead
+    runner.statuses = []
+    runner.completed = []
+    lock = threading.Lock()
+
+    def update_document_index_status(document_id, after_indexing_status, extra_update_params=None):
+        with lock:
+            runner.statuses.append((after_indexing_status, extra_update_params or {}))
+
+    def complete_segments(dataset_id, document_id, documents):
+        with lock:
+            runner.completed.extend(document.metadata["doc_id"] for document in documents)
+
+    monkeypatch.setattr(runner, "_update_document_index_status", update_document_index_status)
+    monkeypatch.setattr(runner, "_complete_segments", complete_segments)
+    return runner
+
+
+def _run(monkeypatch, runner: IndexingRunner, pages: list[str]) -> None:
+    dataset = MagicMock(
+        id="dataset-id",
+        tenant_id="tenant-id",
+        indexing_technique="high_quality",
+        embedding_model_provider="openai",
+        embedding_model="text-embedding-3-small",
+    )
+    dataset_model = MagicMock()
+    dataset_model.query.filter_by.return_value.first.return_value = dataset
+    monkeypatch.setattr("core.indexing_runner.Dataset", dataset_model)
+    index_processor_factory = MagicMock()
+    index_processor_factory.return_value.init_index_processor.return_value = StubIndexProcessor(pages)
+    monkeypatch.setattr("core.indexing_runner.IndexProcessorFactory", index_processor_factory)
+
+    dataset_document = MagicMock(
+        id="document-id",
+        dataset_id="dataset-id",
+        tenant_id="tenant-id",
+        doc_form=IndexType.PARAGRAPH_INDEX,
+        doc_language="English",
+        data_source_type="website_crawl",
+        data_source_info_dict={
+            "provider": "firecrawl",
+            "url": "https://dify.ai",
+            "job_id": "job-id",
+            "mode": "crawl",
+            "only_main_content": True,
+        },
+    )
+    runner.run([dataset_document])
+
+
+def test_pipeline_indexes_document(monkeypatch, runner):
+    pages = ["alpha beta gamma", "delta epsilon", "zeta eta theta iota"]
+    words = " ".join(pages).split()
+
+    _run(monkeypatch, runner, pages)
+
+    assert [status for status, _ in runner.statuses] == ["splitting", "indexing", "completed"]
+    assert runner.statuses[0][1][DatasetDocument.word_count] == sum(len(page) for page in pages)
+    assert runner.statuses[-1][1][DatasetDocument.tokens] == sum(len(word) for word in words)
+    assert StubDocumentStore.saved == words
+    assert sorted(StubVector.written) == sorted(words)
+    assert sorted(runner.completed) == sorted(words)
+
+
+def test_pause_in_stage_thread_stops_indexing(monkeypatch, runner):
+    monkeypatch.setattr("core.indexing_runner.redis_client", MagicMock(**{"get.return_value": b"1"}))
+
+    with pytest.raises(DocumentIsPausedError, match="document-id"):
+        _run(monkeypatch, runner, ["alpha beta gamma", "delta epsilon"])
+
+    assert [status for status, _ in runner.statuses] == ["splitting"]
+    assert StubVector.written == []
+    assert runner.completed == []
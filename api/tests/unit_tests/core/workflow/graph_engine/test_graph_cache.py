@@ -0,0 +1,198 @@
+import json
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from core.workflow.entities.variable_pool import VariablePool
+from core.workflow.graph_engine.entities.event import NodeRunStartedEvent, NodeRunStreamChunkEvent
+from core.workflow.graph_engine.entities.graph import Graph
+from core.workflow.graph_engine.entities.runtime_route_state import RouteNodeState
+from core.workflow.graph_engine.graph_cache import GraphCache
+from core.workflow.nodes.answer.answer_stream_processor import AnswerStreamProcessor
+from core.workflow.nodes.enums import NodeType
+from core.workflow.nodes.start.entities import StartNodeData
+from models.workflow import Workflow
+
+
+def _graph_config(branches: int = 3, branch_length: int = 19) -> dict:
+    nodes = [
+        {"id": "start", "data": {"type": "start"}},
+        {"id": "answer", "data": {"type": "answer", "title": "answer", "answer": "1"}},
+    ]
+    edges = []
+    for branch in range(branches):
+        previous = "start"
+        for position in range(branch_length):
+            node_id = f"b{branch}_{position}"
+            nodes.append({"id": node_id, "data": {"type": "llm"}})
+            edges.append({"id": f"{previous}-{node_id}", "source": previous, "target": node_id})
+            previous = node_id
+        edges.append({"id": f"{previous}-answer", "source": previous, "target": "answer"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def _workflow(workflow_id: str = "workflow-1", app_id: str = "app-1", graph_config: dict | None = None) -> Workflow:
+    workflow = Workflow()
+    workflow.id = workflow_id
+    workflow.app_id = app_id
+    workflow.graph = json.dumps(graph_config or _graph_config())
+    return workflow
+
+
+def _init(workflow: Workflow, calls: list[str]):
+    def init() -> Graph:
+        calls.append(workflow.id)
+        return Graph.init(graph_config=workflow.graph_dict)
+
+    return init
+
+
+def test_get_or_init_reuses_compiled_graph():
+    cache = GraphCache(capacity=8)
+    workflow = _workflow()
+    calls: list[str] = []
+
+    first = cache.get_or_init(workflow, _init(workflow, calls))
+    second = cache.get_or_init(workflow, _init(workflow, calls))
+
+    assert calls == ["workflow-1"]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.parallel_mapping is first.parallel_mapping
+    assert second.node_ids == first.node_ids
+
+
+def test_views_do_not_share_runtime_edges():
+    cache = GraphCache(capacity=8)
+    workflow = _workflow()
+
+    first = cache.get_or_init(workflow, _init(workflow, []))
+    first.add_extra_edge("b0_0", "b1_0")
+    second = cache.get_or_init(workflow, _init(workflow, []))
+
+    assert "b1_0" in [edge.target_node_id for edge in first.edge_mapping["b0_0"]]
+    assert "b1_0" not in [edge.target_node_id for edge in second.edge_mapping["b0_0"]]
+
+
+def _fail_branch_graph_config() -> dict:
+    return {
+        "nodes": [
+            {"id": "start", "data": {"type": "start"}},
+            {"id": "llm", "data": {"type": "llm", "error_strategy": "fail-branch"}},
+            {"id": "answer", "data": {"type": "answer", "title": "answer", "answer": "{{#llm.text#}}"}},
+            {"id": "fallback", "data": {"type": "answer", "title": "fallback", "answer": "sorry"}},
+        ],
+        "edges": [
+            {"id": "start-llm", "source": "start", "target": "llm"},
+            {"id": "llm-answer", "source": "llm", "sourceHandle": "source", "target": "answer"},
+            {"id": "llm-fallback", "source": "llm", "sourceHandle": "fail-branch", "target": "fallback"},
+        ],
+    }
+
+
+def _stream_llm_chunk(graph: Graph) -> list:
+    route_node_state = RouteNodeState(node_id="llm", start_at=datetime.now(UTC).replace(tzinfo=None))
+    node_data = StartNodeData(title="llm", variables=[])
+    events = [
+        NodeRunStartedEvent(
+            id="execution",
+            node_id="llm",
+            node_type=NodeType.LLM,
+            node_data=node_data,
+            route_node_state=route_node_state,
+        ),
+        NodeRunStreamChunkEvent(
+            id="execution",
+            node_id="llm",
+            node_type=NodeType.LLM,
+            node_data=node_data,
+            chunk_content="hi",
+            from_variable_selector=["llm", "text"],
+            route_node_state=route_node_state,
+        ),
+    ]
+    processor = AnswerStreamProcessor(graph=graph, variable_pool=VariablePool(system_variables={}, user_inputs={}))
+    return [event for event in processor.process(iter(events)) if isinstance(event, NodeRunStreamChunkEvent)]
+
+
+def test_answer_streaming_runs_do_not_change_the_cached_graph():
+    cache = GraphCache(capacity=8)
+    workflow = _workflow(graph_config=_fail_branch_graph_config())
+
+    first = cache.get_or_init(workflow, _init(workflow, []))
+    second = cache.get_or_init(workflow, _init(workflow, []))
+    assert first.answer_stream_generate_routes.answer_dependencies["answer"] == ["llm"]
+
+    # the success branch of the llm node streams into the answer, which drops llm from its dependencies
+    assert [event.chunk_content for event in _stream_llm_chunk(first)] == ["hi"]
+    assert [event.chunk_content for event in _stream_llm_chunk(second)] == ["hi"]
+
+    assert first.answer_stream_generate_routes.answer_dependencies["answer"] == []
+    assert second.answer_stream_generate_routes.answer_dependencies["answer"] == []
+    third = cache.get_or_init(workflow, _init(workflow, []))
+    assert third.answer_stream_generate_routes.answer_dependencies["answer"] == ["llm"]
+
+
+def test_edited_graph_is_recompiled():
+    cache = GraphCache(capacity=8)
+    workflow = _workflow()
+    calls: list[str] = []
+
+    cache.get_or_init(workflow, _init(workflow, calls))
+    workflow.graph = json.dumps(_graph_config(branches=2))
+    graph = cache.get_or_init(workflow, _init(workflow, calls))
+
+    assert len(calls) == 2
+    assert "b2_0" not in graph.node_ids
+
+
+def test_invalidate():
+    cache = GraphCache(capacity=8)
+    workflows = [_workflow("workflow-1"), _workflow("workflow-2"), _workflow("workflow-3", app_id="app-2")]
+    for workflow in workflows:
+        cache.get_or_init(workflow, _init(workflow, []))
+
+    cache.invalidate_workflow("workflow-1")
+    assert len(cache) == 2
+
+    cache.invalidate_app("app-1")
+    assert len(cache) == 1
+
+
+def test_capacity():
+    cache = GraphCache(capacity=1)
+    first, second = _workflow("workflow-1"), _workflow("workflow-2")
+    calls: list[str] = []
+
+    cache.get_or_init(first, _init(first, calls))
+    cache.get_or_init(second, _init(second, calls))
+    cache.get_or_init(first, _init(first, calls))
+
+    assert calls == ["workflow-1", "workflow-2", "workflow-1"]
+    assert len(cache) == 1
+
+    disabled = GraphCache(capacity=0)
+    disabled.get_or_init(first, _init(first, []))
+    assert len(disabled) == 0
+
+
+@pytest.mark.benchmark
+def test_graph_cache_benchmark(record_property):
+    cache = GraphCache(capacity=8)
+    workflow = _workflow()
+    rounds = 50
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        Graph.init(graph_config=workflow.graph_dict)
+    init_elapsed = (time.perf_counter() - start) / rounds
+
+    cache.get_or_init(workflow, _init(workflow, []))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        cache.get_or_init(workflow, _init(workflow, []))
+    cached_elapsed = (time.perf_counter() - start) / rounds
+
+    record_property("graph_init_ms", init_elapsed * 1000)
+    record_property("cached_lookup_ms", cached_elapsed * 1000)
+    assert cache.hits == rounds
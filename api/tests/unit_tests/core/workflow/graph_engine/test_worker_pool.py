@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+
+from core.workflow.graph_engine.worker_pool import GraphEngineWorkerPool
+
+
+def _pool(**kwargs) -> GraphEngineWorkerPool:
+    options = {
+        "max_workers": 4,
+        "max_workers_per_tenant": 4,
+        "max_workers_per_run": 4,
+        "max_submit_count_per_group": 100,
+        "max_queue_size": 100,
+        "queue_timeout": 1.0,
+    }
+    options.update(kwargs)
+    return GraphEngineWorkerPool(**options)
+
+
+def test_run_quota_queues_tasks():
+    pool = _pool(max_workers_per_run=2)
+    release = threading.Event()
+
+    futures = [pool.submit(release.wait, run_id="run", tenant_id="tenant") for _ in range(5)]
+    stats = pool.stats()
+    assert stats.active_workers == 2
+    assert stats.queue_depth == 3
+
+    release.set()
+    for future in futures:
+        assert future.result(timeout=5) is True
+    stats = pool.stats()
+    assert (stats.active_workers, stats.queue_depth, stats.started_count) == (0, 0, 5)
+
+
+def test_queued_runs_are_served_round_robin():
+    pool = _pool(max_workers=1)
+    release = threading.Event()
+    order = []
+
+    blocker = pool.submit(release.wait, run_id="blocker", tenant_id="tenant")
+    futures = [pool.submit(lambda i=i: order.append(f"a{i}"), run_id="a", tenant_id="tenant") for i in range(3)]
+    futures += [pool.submit(lambda i=i: order.append(f"b{i}"), run_id="b", tenant_id="tenant") for i in range(2)]
+    release.set()
+    blocker.result(timeout=5)
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["a0", "b0", "a1", "b1", "a2"]
+
+
+def test_group_limit():
+    pool = _pool()
+    release = threading.Event()
+
+    futures = [
+        pool.submit(release.wait, run_id="run", tenant_id="tenant", group_id="iteration", group_limit=1)
+        for _ in range(3)
+    ]
+    other = pool.submit(release.wait, run_id="run", tenant_id="tenant")
+    stats = pool.stats()
+    assert (stats.active_workers, stats.queue_depth) == (1, 3)
+
+    release.set()
+    for future in [*futures, other]:
+        future.result(timeout=5)
+
+
+def test_nested_tasks_run_inline_when_pool_is_saturated():
+    pool = _pool(max_workers=1)
+
+    def parent():
+        return pool.submit(lambda: threading.current_thread().name, run_id="run", tenant_id="tenant").result()
+
+    thread_name = pool.submit(parent, run_id="run", tenant_id="tenant").result(timeout=5)
+
+    assert thread_name.startswith("graph_engine_worker")
+    assert pool.stats().inline_count == 1
+
+
+def test_full_queue_rejects_after_timeout():
+    pool = _pool(max_workers=1, max_queue_size=1, queue_timeout=0.1)
+    release = threading.Event()
+    pool.submit(release.wait, run_id="run", tenant_id="tenant")
+    pool.submit(release.wait, run_id="run", tenant_id="tenant")
+
+    with pytest.raises(ValueError, match="queue"):
+        pool.submit(release.wait, run_id="run", tenant_id="tenant")
+    release.set()
+
+
+def test_max_submit_count_per_group():
+    pool = _pool(max_submit_count_per_group=2)
+    release = threading.Event()
+    pool.submit(release.wait, run_id="run", tenant_id="tenant")
+    pool.submit(release.wait, run_id="run", tenant_id="tenant")
+
+    with pytest.raises(ValueError, match="Max submit count"):
+        pool.submit(release.wait, run_id="run", tenant_id="tenant")
+    pool.submit(release.wait, run_id="other", tenant_id="tenant")
+    release.set()
+
+
+def test_max_submit_count_is_scoped_to_each_group_of_a_run():
+    pool = _pool(max_workers=1, max_submit_count_per_group=2)
+    release = threading.Event()
+    futures = [
+        pool.submit(release.wait, run_id="run", tenant_id="tenant", group_id=group_id)
+        for group_id in ("iteration-1", "iteration-1", "iteration-2", "iteration-2", None, None)
+    ]
+
+    with pytest.raises(ValueError, match="Max submit count"):
+        pool.submit(release.wait, run_id="run", tenant_id="tenant", group_id="iteration-1")
+    release.set()
+    assert all(future.result(timeout=5) for future in futures)
+
+    # finished tasks no longer count against their group
+    assert pool.submit(lambda: True, run_id="run", tenant_id="tenant", group_id="iteration-1").result(timeout=5)
+
+
+def test_cancel_pending():
+    pool = _pool(max_workers=1)
+    release = threading.Event()
+    running = pool.submit(release.wait, run_id="run", tenant_id="tenant")
+    queued = pool.submit(release.wait, run_id="run", tenant_id="tenant")
+
+    pool.cancel_pending("run")
+    release.set()
+
+    assert running.result(timeout=5) is True
+    assert queued.cancelled()
+    assert pool.stats().queue_depth == 0
+
+
+def test_task_exception_is_set_on_future():
+    pool = _pool()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pool.submit(fail, run_id="run", tenant_id="tenant").result(timeout=5)
@@ -1,3 +1,10 @@
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from configs import dify_config
 from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.nodes.http_request import (
     BodyData,
@@ -6,6 +13,7 @@ from core.workflow.nodes.http_request import (
     HttpRequestNodeData,
 )
 from core.workflow.nodes.http_request.entities import HttpRequestNodeTimeout
+from core.workflow.nodes.http_request.exc import ResponseSizeError
 from core.workflow.nodes.http_request.executor import Executor
 
 
@@ -334,3 +342,96 @@ def test_init_params():
     executor = create_executor("key1:value1\n\nkey2:value2\n\n")
     executor._init_params()
     assert executor.params == [("key1", "value1"), ("key2", "value2")]
+
+
+_STREAM_CHUNK = b"\x00\xff" * 32 * 1024
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """Serves /binary/<size> and /text/<size> bodies in 64 KB chunks."""
+
+    def do_GET(self):  # noqa: N802
+        _, kind, size = self.path.split("/")
+        content_type = "application/octet-stream" if kind == "binary" else "text/plain"
+        chunk = _STREAM_CHUNK if kind == "binary" else b"a" * len(_STREAM_CHUNK)
+        remaining = int(size)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(remaining))
+        self.end_headers()
+        try:
+            while remaining > 0:
+                self.wfile.write(chunk[:remaining])
+                remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stream_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def _stream_executor(url: str) -> Executor:
+    node_data = HttpRequestNodeData(
+        title="test",
+        method="get",
+        url=url,
+        headers="",
+        params="",
+        authorization=HttpRequestNodeAuthorization(type="no-auth"),
+    )
+    timeout = HttpRequestNodeTimeout(connect=10, read=30, write=30)
+    return Executor(node_data=node_data, timeout=timeout, variable_pool=VariablePool(), max_retries=0)
+
+
+def test_invoke_stream_file_response_is_not_buffered(stream_server, monkeypatch):
+    size = 32 * 1024 * 1024
+    monkeypatch.setattr(dify_config, "HTTP_REQUEST_NODE_MAX_BINARY_SIZE", 64 * 1024 * 1024)
+    executor = _stream_executor(f"{stream_server}/binary/{size}")
+
+    tracemalloc.start()
+    try:
+        with executor.invoke_stream() as response:
+            assert response.is_file
+            received = sum(len(chunk) for chunk in response.iter_bytes())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert received == size
+    assert response.size == size
+    assert peak < 8 * 1024 * 1024
+
+
+def test_invoke_stream_file_response_size_limit(stream_server, monkeypatch):
+    monkeypatch.setattr(dify_config, "HTTP_REQUEST_NODE_MAX_BINARY_SIZE", 1024 * 1024)
+    executor = _stream_executor(f"{stream_server}/binary/{8 * 1024 * 1024}")
+
+    def read():
+        with executor.invoke_stream() as response:
+            for _ in response.iter_bytes():
+                pass
+
+    with pytest.raises(ResponseSizeError, match="File size is too large"):
+        read()
+
+
+def test_invoke_stream_text_response(stream_server, monkeypatch):
+    monkeypatch.setattr(dify_config, "HTTP_REQUEST_NODE_MAX_TEXT_SIZE", 1024 * 1024)
+
+    with _stream_executor(f"{stream_server}/text/{100 * 1024}").invoke_stream() as response:
+        assert not response.is_file
+    assert response.text == "a" * 100 * 1024
+
+    with pytest.raises(ResponseSizeError, match="Text size is too large"):
+        with _stream_executor(f"{stream_server}/text/{4 * 1024 * 1024}").invoke_stream():
+            pass
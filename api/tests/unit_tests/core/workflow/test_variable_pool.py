@@ -1,3 +1,6 @@
+import tracemalloc
+from copy import deepcopy
+
 import pytest
 
 from core.file import File, FileTransferMethod, FileType
@@ -44,3 +47,86 @@ def test_use_long_selector(pool):
     result = pool.get(("node_1", "part_1", "part_2"))
     assert result is not None
     assert result.value == "test_value"
+
+
+def test_fork_shares_node_variables_until_written(pool):
+    pool.add(("node_1", "text"), "parent")
+    child = pool.fork()
+
+    assert child.get(("node_1", "text")).value == "parent"
+    assert child.get(("node_2", "text")) is None
+    assert child.variable_dictionary["node_1"] is pool.variable_dictionary["node_1"]
+
+
+def test_parent_writes_after_fork_stay_in_parent(pool):
+    pool.add(("node_1", "text"), "before")
+    pool.add(("node_1", "other"), "kept")
+    child = pool.fork()
+
+    pool.add(("node_1", "text"), "after")
+    pool.add(("node_2", "text"), "new")
+    pool.remove(("node_1", "other"))
+
+    assert child.get(("node_1", "text")).value == "before"
+    assert child.get(("node_1", "other")).value == "kept"
+    assert child.get(("node_2", "text")) is None
+    assert pool.get(("node_1", "text")).value == "after"
+    assert pool.get(("node_1", "other")) is None
+
+
+def test_fork_writes_stay_in_child(pool):
+    pool.add(("node_1", "text"), "parent")
+    pool.add(("node_1", "other"), "kept")
+    child = pool.fork()
+
+    child.add(("node_1", "text"), "child")
+    child.add(("node_2", "text"), "new")
+
+    assert child.get(("node_1", "text")).value == "child"
+    assert child.get(("node_1", "other")).value == "kept"
+    assert pool.get(("node_1", "text")).value == "parent"
+    assert pool.get(("node_2", "text")) is None
+
+    child.remove(("node_1", "other"))
+    child.remove(["node_2"])
+
+    assert child.get(("node_1", "other")) is None
+    assert child.get(("node_2", "text")) is None
+    assert pool.get(("node_1", "other")).value == "kept"
+
+
+def test_nested_fork(pool):
+    pool.add(("node_1", "text"), "root")
+    child = pool.fork()
+    child.add(("node_2", "text"), "child")
+    grandchild = child.fork()
+
+    assert grandchild.get(("node_1", "text")).value == "root"
+    assert grandchild.get(("node_2", "text")).value == "child"
+
+    grandchild.remove(["node_1"])
+    assert grandchild.get(("node_1", "text")) is None
+    assert child.get(("node_1", "text")).value == "root"
+
+
+@pytest.mark.parametrize("items", [10, 100])
+def test_fork_uses_less_memory_than_deepcopy(items):
+    pool = VariablePool(system_variables={}, user_inputs={})
+    for node in range(20):
+        pool.add((f"node_{node}", "text"), "x" * 50_000)
+        pool.add((f"node_{node}", "chunks"), [f"chunk {i}" for i in range(200)])
+
+    def run(copy_pool):
+        tracemalloc.start()
+        branches = []
+        for index in range(items):
+            branch = copy_pool(pool)
+            branch.add(("iteration", "index"), index)
+            branch.add(("iteration", "item"), f"item {index}")
+            branch.add(("llm", "text"), f"answer {index}")
+            branches.append(branch)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    assert run(VariablePool.fork) < run(deepcopy)
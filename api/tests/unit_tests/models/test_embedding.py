@@ -0,0 +1,43 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from models.dataset import Embedding
+
+
+def test_compact_embedding_round_trip():
+    vector = list(np.random.rand(1536))
+    embedding = Embedding()
+    embedding.set_embedding(vector)
+
+    assert embedding.is_compact
+    assert len(embedding.embedding) < len(pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL)) / 1.8
+    np.testing.assert_allclose(embedding.get_embedding(), vector, rtol=1e-6)
+    assert embedding.get_embedding_array().dtype == np.float32
+
+
+def test_compact_embedding_float16():
+    vector = [0.5, -0.25, 0.125]
+    embedding = Embedding()
+    embedding.set_embedding(vector, "float16")
+
+    assert embedding.get_embedding_array().dtype == np.float16
+    assert embedding.get_embedding() == vector
+
+
+def test_legacy_pickled_embedding_is_readable():
+    vector = [0.1, 0.2, 0.3]
+    embedding = Embedding(embedding=pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL))
+
+    assert not embedding.is_compact
+    assert embedding.get_embedding() == vector
+
+
+def test_unsupported_embedding_format():
+    with pytest.raises(ValueError):
+        Embedding.encode_embedding([0.1], "float64")
+
+    data = Embedding._COMPACT_HEADER.pack(Embedding.COMPACT_MAGIC, Embedding.COMPACT_VERSION + 1, 1)
+    with pytest.raises(ValueError):
+        Embedding.decode_embedding(data)
@@ -0,0 +1,161 @@
+"""
+Unit tests for the write-behind implementation of WorkflowNodeExecutionRepository.
+"""
+
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from models.workflow import WorkflowNodeExecution, WorkflowNodeExecutionStatus
+from repositories.workflow_node_execution.write_behind_repository import (
+    WriteBehindFlusher,
+    WriteBehindWorkflowNodeExecutionRepository,
+)
+
+
+@pytest.fixture
+def session():
+    """Create a mock SQLAlchemy session."""
+    session = MagicMock(spec=Session)
+    session.__enter__ = MagicMock(return_value=session)
+    session.__exit__ = MagicMock(return_value=None)
+
+    session_factory = MagicMock(spec=sessionmaker)
+    session_factory.return_value = session
+    return session, session_factory
+
+
+@pytest.fixture
+def flusher(mocker: MockerFixture):
+    """Replace the background flusher, so tests decide when buffers are written."""
+    return mocker.patch("repositories.workflow_node_execution.write_behind_repository.write_behind_flusher")
+
+
+@pytest.fixture
+def repository(session, flusher):
+    _, session_factory = session
+    return WriteBehindWorkflowNodeExecutionRepository(
+        session_factory=session_factory, tenant_id="test-tenant", app_id="test-app", batch_size=2
+    )
+
+
+def _execution(index: int) -> WorkflowNodeExecution:
+    execution = WorkflowNodeExecution()
+    execution.id = f"execution-{index}"
+    execution.workflow_id = "workflow"
+    execution.triggered_from = "workflow-run"
+    execution.workflow_run_id = "run"
+    execution.index = index
+    execution.node_execution_id = f"node-execution-{index}"
+    execution.node_id = f"node-{index}"
+    execution.node_type = "code"
+    execution.title = "Code"
+    execution.status = WorkflowNodeExecutionStatus.RUNNING.value
+    execution.created_by_role = "account"
+    execution.created_by = "user"
+    execution.created_at = datetime(2025, 1, 1)
+    return execution
+
+
+def test_save_and_update_are_buffered(repository, session, flusher):
+    session_obj, _ = session
+    execution = _execution(1)
+
+    repository.save(execution)
+    execution.status = WorkflowNodeExecutionStatus.SUCCEEDED.value
+    repository.update(execution)
+
+    session_obj.execute.assert_not_called()
+    flusher.schedule.assert_called_with(repository, immediately=False)
+    assert execution.tenant_id == "test-tenant"
+    assert execution.app_id == "test-app"
+    assert repository.buffered_count == 1
+
+
+def test_flush_writes_latest_values_in_one_statement(repository, session, mocker: MockerFixture):
+    session_obj, _ = session
+    write_rows = mocker.spy(repository, "_write_rows")
+    execution = _execution(1)
+    repository.save(execution)
+    execution.status = WorkflowNodeExecutionStatus.SUCCEEDED.value
+    repository.update(execution)
+
+    repository.flush()
+
+    session_obj.execute.assert_called_once()
+    stmt = session_obj.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (id) DO UPDATE" in sql
+    (rows,) = write_rows.call_args.args
+    assert len(rows) == 1
+    assert rows[0]["status"] == WorkflowNodeExecutionStatus.SUCCEEDED.value
+    assert rows[0]["elapsed_time"] == 0
+    session_obj.commit.assert_called_once()
+    assert repository.buffered_count == 0
+
+
+def test_buffered_values_are_copied(repository, mocker: MockerFixture):
+    write_rows = mocker.spy(repository, "_write_rows")
+    execution = _execution(1)
+    repository.save(execution)
+
+    execution.status = WorkflowNodeExecutionStatus.SUCCEEDED.value
+    repository.flush()
+
+    assert write_rows.call_args.args[0][0]["status"] == WorkflowNodeExecutionStatus.RUNNING.value
+
+
+def test_full_buffer_requests_flush(repository, session, flusher):
+    session_obj, _ = session
+
+    repository.save(_execution(1))
+    repository.save(_execution(2))
+    flusher.schedule.assert_called_with(repository, immediately=True)
+    session_obj.execute.assert_not_called()
+
+    repository.save(_execution(3))
+    repository.save(_execution(4))
+    # twice the batch size is buffered, the caller writes two batches itself
+    assert session_obj.execute.call_count == 2
+    assert repository.buffered_count == 0
+
+
+def test_reads_flush_first(repository, session):
+    session_obj, _ = session
+    session_obj.scalars.return_value.all.return_value = []
+    repository.save(_execution(1))
+
+    repository.get_running_executions("run")
+
+    session_obj.execute.assert_called_once()
+    session_obj.scalars.assert_called_once()
+
+
+def test_failed_flush_keeps_rows(repository, session):
+    session_obj, _ = session
+    session_obj.execute.side_effect = RuntimeError("database unavailable")
+    repository.save(_execution(1))
+
+    with pytest.raises(RuntimeError):
+        repository.flush()
+
+    assert repository.buffered_count == 1
+    session_obj.execute.side_effect = None
+    repository.flush()
+    assert repository.buffered_count == 0
+
+
+def test_flusher_flushes_scheduled_repositories():
+    flusher = WriteBehindFlusher(flush_interval=0.01)
+    flushed = threading.Event()
+    repository = MagicMock(buffered_count=0)
+    repository.flush.side_effect = flushed.set
+
+    flusher.schedule(repository)
+
+    assert flushed.wait(timeout=5)